@@ -4,6 +4,7 @@ import logging
 from discord.ext import commands
 from utils import BOT_OWNER_ID
 
+from core.async_db import run_db
 from core.task_engine import regenerate_daily_tasks
 from core.presence import get_active_profile
 from core.task_sender import send_tasks_to_user
@@ -100,6 +101,22 @@ class AdminCog(commands.Cog):
                 ctx.author.id,
             )
 
+    @commands.command(name="repair_streaks")
+    @owner_only()
+    async def repair_streaks(self, ctx):
+        ok = await self._safe_call("repair_streaks")
+        if ok:
+            await ctx.send("🔥 All streaks rebuilt from history.")
+            logger.critical("ADMIN repair_streaks by %s", ctx.author.id)
+
+    @commands.command(name="backfill_stats")
+    @owner_only()
+    async def backfill_stats(self, ctx):
+        ok = await self._safe_call("backfill_stats")
+        if ok:
+            await ctx.send("📊 Stats rollups rebuilt from history.")
+            logger.critical("ADMIN backfill_stats by %s", ctx.author.id)
+
     # ─────────────────────────────────────────────────────────────
     # TOKEN ECONOMY
     # ─────────────────────────────────────────────────────────────
@@ -137,6 +154,53 @@ class AdminCog(commands.Cog):
                 ctx.author.id,
             )
 
+    @commands.command(name="ledger")
+    @owner_only()
+    async def ledger(self, ctx, user_id: int, limit: int = 10):
+        fn = getattr(self.bot, "token_history", None)
+        if not fn:
+            logger.error("ADMIN attempted missing fn: token_history")
+            return
+
+        rows = await fn(user_id, limit)
+        if not rows:
+            await ctx.send(f"📒 No ledger entries for `{user_id}`.")
+            return
+
+        lines = [
+            f"`{r['created_at']}` {r['delta']:+d} ({r['reason']}) → {r['balance']}"
+            for r in rows
+        ]
+        await ctx.send(f"📒 Ledger for `{user_id}`\n" + "\n".join(lines))
+
+    # ─────────────────────────────────────────────────────────────
+    # JOB PROGRESS
+    # ─────────────────────────────────────────────────────────────
+    @commands.command(name="jobs")
+    @owner_only()
+    async def jobs(self, ctx, job_name: str = None, limit: int = 7):
+        fn = getattr(self.bot, "job_runs", None)
+        if not fn:
+            logger.error("ADMIN attempted missing fn: job_runs")
+            return
+
+        rows = await fn(job_name, limit)
+        if not rows:
+            await ctx.send("🗂 No job runs recorded.")
+            return
+
+        lines = []
+        for r in rows:
+            if r["finished_at"]:
+                state = f"done {r['finished_at']}"
+            elif r["started_at"]:
+                state = f"running since {r['started_at']}"
+            else:
+                state = "claimed"
+            progress = f"{r['processed']}/{r['total'] if r['total'] is not None else '?'}"
+            lines.append(f"`{r['job_name']}` {r['scheduled_for']} — {progress}, {state}")
+        await ctx.send("🗂 Recent job runs\n" + "\n".join(lines))
+
     # ─────────────────────────────────────────────────────────────
     # RESYNC SLASH COMMANDS
     # ─────────────────────────────────────────────────────────────
@@ -167,12 +231,12 @@ class AdminCog(commands.Cog):
         Force-regenerate today's tasks for a single user.
         """
 
-        profile = get_active_profile(str(user_id))
+        profile = await run_db(get_active_profile, str(user_id))
         if not profile:
             await ctx.send("❌ User has no active profile.")
             return
 
-        regenerate_daily_tasks(profile["profile_id"])
+        await run_db(regenerate_daily_tasks, profile["profile_id"])
 
         if send:
             await send_tasks_to_user(
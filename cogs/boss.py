@@ -1,133 +1,45 @@
 # cogs/boss.py
 
-import discord
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+import logging
 
-from core.db import get_connection
-from core.users import add_tokens
+from discord.ext import commands, tasks
 
+from core.async_db import run_db
+from core.boss_engine import prune_progress, rebuild_progress, seed_bosses
 
-WEEKLY_BOSS = {
-    "name": "The Weight of the Week",
-    "required_tasks": 10,
-    "reward_tokens": 50,
-    "message": (
-        "You pushed through the week and didn’t disappear.\n"
-        "That counts for more than you think."
-    ),
-}
+log = logging.getLogger("tinyregg.boss")
 
 
 class BossCog(commands.Cog):
+    """
+    Bosses are defined in core.boss_engine (data in boss_state) and
+    settled on the completion path, so this cog only does upkeep:
+    - once at startup, seed default definitions and recount
+      current-window progress from history
+    - every few hours, drop progress of windows that have closed
+    """
+
     def __init__(self, bot):
         self.bot = bot
-        self.weekly_check.start()
-
-    @tasks.loop(hours=6)
-    async def weekly_check(self):
-        now = datetime.utcnow()
-        since = (now - timedelta(days=7)).strftime("%Y-%m-%d")
-        week = now.isocalendar().week
-
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # 1️⃣ Find profiles with completed tasks this week
-        cur.execute(
-            """
-            SELECT profile_id, COUNT(*) as completed
-            FROM task_history
-            WHERE completed = 1
-              AND date >= ?
-            GROUP BY profile_id
-            """,
-            (since,),
-        )
-
-        profiles = cur.fetchall()
-
-        for row in profiles:
-            profile_id = row["profile_id"]
-            completed = row["completed"]
-
-            if completed < WEEKLY_BOSS["required_tasks"]:
-                continue
+        self._rebuilt = False
+        self.maintenance.start()
 
-            # 2️⃣ Check if boss already defeated this week
-            cur.execute(
-                """
-                SELECT 1
-                FROM boss_history
-                WHERE profile_id = ?
-                  AND boss_name = ?
-                  AND defeated_at >= ?
-                """,
-                (profile_id, WEEKLY_BOSS["name"], since),
-            )
+    def cog_unload(self):
+        self.maintenance.cancel()
 
-            if cur.fetchone():
-                continue
-
-            # 3️⃣ Record boss defeat
-            cur.execute(
-                """
-                INSERT INTO boss_history (profile_id, boss_name)
-                VALUES (?, ?)
-                """,
-                (profile_id, WEEKLY_BOSS["name"]),
-            )
-
-            # 4️⃣ Update weekly summary
-            cur.execute(
-                """
-                INSERT INTO weekly (profile_id, week, tasks_completed, bosses_defeated)
-                VALUES (?, ?, ?, 1)
-                ON CONFLICT(profile_id, week) DO UPDATE SET
-                    bosses_defeated = bosses_defeated + 1
-                """,
-                (profile_id, week, completed),
-            )
-
-            # 5️⃣ Resolve user + profile name for messaging
-            cur.execute(
-                """
-                SELECT user_id, name
-                FROM profiles
-                WHERE profile_id = ?
-                """,
-                (profile_id,),
-            )
-            profile = cur.fetchone()
-
-            if not profile:
-                continue
-
-            add_tokens(profile["user_id"], WEEKLY_BOSS["reward_tokens"])
-
-            await self._announce_defeat(
-                profile["user_id"],
-                profile["name"],
-            )
-
-        conn.commit()
-        conn.close()
-
-    async def _announce_defeat(self, user_id: str, profile_name: str):
-        try:
-            user = await self.bot.fetch_user(int(user_id))
-            await user.send(
-                f"🏆 **Weekly Boss Defeated**\n\n"
-                f"**{profile_name}** faced *{WEEKLY_BOSS['name']}*.\n\n"
-                f"{WEEKLY_BOSS['message']}\n\n"
-                f"+{WEEKLY_BOSS['reward_tokens']} tokens"
-            )
-        except discord.Forbidden:
-            pass
-        except Exception:
-            logger.exception("Failed to DM boss defeat to user %s", user_id)
-
-    @weekly_check.before_loop
+    @tasks.loop(hours=6)
+    async def maintenance(self):
+        if not self._rebuilt:
+            await run_db(seed_bosses)
+            rebuilt = await run_db(rebuild_progress)
+            self._rebuilt = True
+            log.info("Boss progress rebuilt (%s rows)", rebuilt)
+
+        removed = await run_db(prune_progress)
+        if removed:
+            log.info("Pruned %s closed boss progress rows", removed)
+
+    @maintenance.before_loop
     async def before_loop(self):
         await self.bot.wait_until_ready()
 
@@ -2,7 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
-from core.db import get_connection
+from core import task_catalog
+from core.async_db import run_db, fetch_all
 from core.presence import get_active_profile
 from core.presence import switch_active_person
 
@@ -18,7 +19,7 @@ class HistoryCog(commands.Cog):
     )
     async def history(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        profile = get_active_profile(user_id)
+        profile = await run_db(get_active_profile, user_id)
 
         if not profile:
             await interaction.response.send_message(
@@ -27,12 +28,9 @@ class HistoryCog(commands.Cog):
             )
             return
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(
+        rows = await fetch_all(
             """
-            SELECT date, task_key, completed
+            SELECT date, task_id, completed
             FROM task_history
             WHERE profile_id = ?
             ORDER BY date DESC
@@ -41,9 +39,6 @@ class HistoryCog(commands.Cog):
             (profile["profile_id"],),
         )
 
-        rows = cur.fetchall()
-        conn.close()
-
         if not rows:
             await interaction.response.send_message(
                 f"No history yet for **{profile['name']}**.",
@@ -54,7 +49,8 @@ class HistoryCog(commands.Cog):
         lines = []
         for r in rows:
             status = "✅" if r["completed"] else "❌"
-            lines.append(f"{status} `{r['date']}` — {r['task_key']}")
+            key = task_catalog.task_key(r["task_id"]) or r["task_id"]
+            lines.append(f"{status} `{r['date']}` — {key}")
 
         await interaction.response.send_message(
             f"**Recent activity for {profile['name']}**\n\n" + "\n".join(lines),
@@ -1,9 +1,11 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-from datetime import datetime
+from datetime import date, datetime
 
-from core.db import get_connection
+from core import clock
+from core.async_db import fetch_all, insert
+from core.dm_dispatcher import dm_row
 from utils import BOT_OWNER_ID
 
 
@@ -39,10 +41,7 @@ class MilestonesCog(commands.Cog):
             )
             return
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(
+        await insert(
             """
             INSERT INTO milestones (
                 profile_id,
@@ -60,9 +59,6 @@ class MilestonesCog(commands.Cog):
             ),
         )
 
-        conn.commit()
-        conn.close()
-
         await interaction.response.send_message(
             f"Milestone **{title}** added for {date}.",
             ephemeral=True,
@@ -73,29 +69,24 @@ class MilestonesCog(commands.Cog):
     # ─────────────────────────────────────────────
     @tasks.loop(hours=12)
     async def milestone_loop(self):
-        today = datetime.utcnow().date()
-
-        conn = get_connection()
-        cur = conn.cursor()
+        today = date.fromisoformat(clock.local_today())
 
-        cur.execute(
+        milestones = await fetch_all(
             """
             SELECT milestone_id, name, datetime
             FROM milestones
             """
         )
 
-        milestones = cur.fetchall()
-
-        cur.execute(
-            """
-            SELECT DISTINCT user_id
-            FROM profiles
-            """
-        )
-        users = [row["user_id"] for row in cur.fetchall()]
-
-        conn.close()
+        users = [
+            row["user_id"]
+            for row in await fetch_all(
+                """
+                SELECT DISTINCT user_id
+                FROM profiles
+                """
+            )
+        ]
 
         for m in milestones:
             event_date = datetime.fromisoformat(m["datetime"]).date()
@@ -109,26 +100,31 @@ class MilestonesCog(commands.Cog):
             if days_until in (30, 15, 7, 3, 1):
                 await self._send_countdown(
                     users,
+                    m["milestone_id"],
                     m["name"],
                     days_until,
+                    next_event,
                 )
 
     # ─────────────────────────────────────────────
     # Delivery
     # ─────────────────────────────────────────────
-    async def _send_countdown(self, user_ids, title: str, days: int):
+    async def _send_countdown(self, user_ids, milestone_id: int, title: str, days: int, event_date):
         message = (
             f"💗 **Just a little reminder**\n\n"
             f"{days} days until **{title}**.\n\n"
             "No pressure. Just something sweet on the horizon."
         )
 
-        for uid in user_ids:
-            try:
-                user = await self.bot.fetch_user(int(uid))
-                await user.send(message)
-            except (discord.Forbidden, discord.NotFound):
-                continue
+        # The loop runs twice a day; the dedupe key keeps it to one DM
+        await self.bot.dm_dispatcher.send_many(
+            dm_row(
+                uid,
+                message,
+                dedupe_key=f"milestone:{milestone_id}:{event_date.isoformat()}:{days}:{uid}",
+            )
+            for uid in user_ids
+        )
 
     # ─────────────────────────────────────────────
     # SAFETY
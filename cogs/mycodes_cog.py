@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
-from core.db import get_connection
+from core.async_db import fetch_all
 
 
 class MyCodesCog(commands.Cog):
@@ -16,10 +16,7 @@ class MyCodesCog(commands.Cog):
     async def mycodes(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
 
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(
+        rows = await fetch_all(
             """
             SELECT
                 rh.item_id,
@@ -34,9 +31,6 @@ class MyCodesCog(commands.Cog):
             (user_id,),
         )
 
-        rows = cur.fetchall()
-        conn.close()
-
         if not rows:
             await interaction.response.send_message(
                 "You don’t have any codes yet.",
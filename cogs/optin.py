@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
-from core.db import get_connection
+from core.async_db import run_db, fetch_all
 from core.presence import (
     get_active_profile,
     set_active_profile,
@@ -42,14 +42,10 @@ class PresenceCog(commands.Cog):
     async def p_switch(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
 
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute(
+        profiles = await fetch_all(
             "SELECT profile_id, name FROM profiles WHERE user_id = ?",
             (user_id,),
         )
-        profiles = cur.fetchall()
-        conn.close()
 
         if not profiles:
             await interaction.response.send_message(
@@ -73,7 +69,7 @@ class PresenceCog(commands.Cog):
 
         async def on_select(interact: discord.Interaction):
             profile_id = int(select.values[0])
-            set_active_profile(user_id, profile_id)
+            await run_db(set_active_profile, user_id, profile_id)
             await interact.response.send_message(
                 "Okay. I’m with you now.",
                 ephemeral=True,
@@ -99,7 +95,7 @@ class PresenceCog(commands.Cog):
     )
     async def p_cloudy(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        set_cloudy_mode(user_id)
+        await run_db(set_cloudy_mode, user_id)
 
         await interaction.response.send_message(
             "Okay. We’ll keep things gentle and simple today.",
@@ -115,7 +111,7 @@ class PresenceCog(commands.Cog):
     )
     async def p_edit(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        profile = get_active_profile(user_id)
+        profile = await run_db(get_active_profile, user_id)
 
         if not profile:
             await interaction.response.send_message(
@@ -3,6 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 
 from core.db import get_connection
+from core.async_db import run_db
 from core.users import ensure_user
 from core.presence import (
     emit_presence_changed,
@@ -160,8 +161,8 @@ class IntroduceFlow:
             self.data["nickname"] = nickname
 
         # Persist + activate
-        profile_id = create_person(self.user_id, self.data)
-        switch_active_person(self.user_id, profile_id)
+        profile_id = await run_db(create_person, self.user_id, self.data)
+        await run_db(switch_active_person, self.user_id, profile_id)
         await emit_presence_changed(self.bot, self.user_id, profile_id)
 
         await self.interaction.followup.send(
@@ -186,7 +187,7 @@ class Introduce(commands.Cog):
     )
     async def introduce(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        ensure_user(user_id)
+        await run_db(ensure_user, user_id)
 
         await interaction.response.defer(ephemeral=True)
 
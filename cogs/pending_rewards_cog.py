@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
-from core.db import get_connection
+from core.async_db import fetch_all
 
 
 class PendingRewardsCog(commands.Cog):
@@ -19,10 +19,7 @@ class PendingRewardsCog(commands.Cog):
     )
     @app_commands.checks.has_permissions(administrator=True)
     async def pending_rewards(self, interaction: discord.Interaction):
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(
+        rows = await fetch_all(
             """
             SELECT
                 rh.id,
@@ -39,9 +36,6 @@ class PendingRewardsCog(commands.Cog):
             """
         )
 
-        rows = cur.fetchall()
-        conn.close()
-
         if not rows:
             await interaction.response.send_message(
                 "No pending rewards 🎉",
@@ -2,8 +2,11 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
+from core.async_db import run_db
 from core.presence import get_active_profile
 from core.reward_engine import generate_reward
+from core.streaks import current_streaks
+from core.token_ledger import get_balance
 from shop.rewards import REWARDS
 
 
@@ -20,7 +23,7 @@ class ShopCog(commands.Cog):
     )
     async def shop(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        profile = get_active_profile(user_id)
+        profile = await run_db(get_active_profile, user_id)
 
         if not profile:
             await interaction.response.send_message(
@@ -30,10 +33,12 @@ class ShopCog(commands.Cog):
             )
             return
 
+        streak = (await run_db(current_streaks, profile["profile_id"]))["required"]
+        balance = await run_db(get_balance, user_id)
         available = []
 
         for key, reward in REWARDS.items():
-            if self._reward_allowed(profile, reward):
+            if self._reward_allowed(profile, reward, streak):
                 available.append((key, reward))
 
         if not available:
@@ -43,7 +48,11 @@ class ShopCog(commands.Cog):
             )
             return
 
-        lines = [f"**Available rewards for {profile['name']}**\n"]
+        lines = [
+            f"**Available rewards for {profile['name']}**\n"
+            f"Your current streak: **{streak} days**\n"
+            f"Your tokens: **{balance}**\n"
+        ]
 
         for key, reward in available:
             lines.append(
@@ -65,7 +74,7 @@ class ShopCog(commands.Cog):
     )
     async def buy(self, interaction: discord.Interaction, item_key: str):
         user_id = str(interaction.user.id)
-        profile = get_active_profile(user_id)
+        profile = await run_db(get_active_profile, user_id)
 
         if not profile:
             await interaction.response.send_message(
@@ -81,7 +90,8 @@ class ShopCog(commands.Cog):
             )
             return
 
-        result = generate_reward(
+        result = await run_db(
+            generate_reward,
             user_id=user_id,
             profile_id=profile["profile_id"],
             item_key=item_key,
@@ -103,7 +113,7 @@ class ShopCog(commands.Cog):
     # ─────────────────────────────────────────────
     # Internal helper
     # ─────────────────────────────────────────────
-    def _reward_allowed(self, profile: dict, reward: dict) -> bool:
+    def _reward_allowed(self, profile: dict, reward: dict, streak: int) -> bool:
         """
         Local filtering for shop display.
         Final validation happens in reward_engine.
@@ -130,6 +140,10 @@ class ShopCog(commands.Cog):
         if reward.get("requires_explicit") and not profile["explicit_opt_in"]:
             return False
 
+        # Streak lock
+        if streak < reward.get("min_streak", 0):
+            return False
+
         return True
 
 
@@ -2,8 +2,11 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from core import clock
 from core.users import ensure_user
 from core.db import get_connection
+from core.async_db import run_db
+from core.task_board import clear_boards
 
 
 class StartCog(commands.Cog):
@@ -51,10 +54,10 @@ class StartCog(commands.Cog):
         user_id = str(interaction.user.id)
 
         # Ensure base user exists
-        ensure_user(user_id)
+        await run_db(ensure_user, user_id)
 
         # Prevent re-running onboarding
-        if self._has_started(user_id):
+        if await run_db(self._has_started, user_id):
             await interaction.response.send_message(
                 "You’ve already started 💜\n\n"
                 "If you want to switch who’s here or make changes, use `/p help`.",
@@ -62,7 +65,7 @@ class StartCog(commands.Cog):
             )
             return
 
-        self._mark_started(user_id)
+        await run_db(self._mark_started, user_id)
 
         # --------------------------------------------------------
         # WELCOME MESSAGE
@@ -139,6 +142,48 @@ class StartCog(commands.Cog):
             ephemeral=True,
         )
 
+    # ------------------------------------------------------------
+    # /timezone COMMAND
+    # ------------------------------------------------------------
+
+    @app_commands.command(
+        name="timezone",
+        description="Set your timezone so your day starts when yours does"
+    )
+    @app_commands.describe(name="IANA timezone, e.g. Europe/London")
+    async def timezone(self, interaction: discord.Interaction, name: str):
+        user_id = str(interaction.user.id)
+
+        if not clock.is_valid_timezone(name):
+            await interaction.response.send_message(
+                "I don’t recognise that timezone. Pick one from the list 💜",
+                ephemeral=True,
+            )
+            return
+
+        await run_db(ensure_user, user_id)
+        await run_db(clock.set_user_timezone, user_id, name)
+
+        # Today's board may now be a different date
+        clear_boards()
+
+        reminders = self.bot.get_cog("DeadlineReminderCog")
+        if reminders:
+            await reminders.scheduler.reload_user(user_id)
+
+        local_time = clock.local_now(name).strftime("%H:%M")
+        await interaction.response.send_message(
+            f"Timezone set to **{name}** (it’s {local_time} there).\n"
+            "Your daily tasks will now arrive in your morning.",
+            ephemeral=True,
+        )
+
+    @timezone.autocomplete("name")
+    async def timezone_autocomplete(self, interaction: discord.Interaction, current: str):
+        current = current.lower()
+        matches = [n for n in clock.timezone_names() if current in n.lower()]
+        return [app_commands.Choice(name=n, value=n) for n in matches[:25]]
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(StartCog(bot))
@@ -1,10 +1,12 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 
-from core.db import get_connection
+from core import clock
+from core.async_db import run_db
 from core.presence import get_active_profile
+from core.stats import stats_since, week_summary
 
 
 class StatsCog(commands.Cog):
@@ -36,7 +38,7 @@ class StatsCog(commands.Cog):
     # ─────────────────────────────────────────────
     async def _send_stats(self, interaction: discord.Interaction, days: int):
         user_id = str(interaction.user.id)
-        profile = get_active_profile(user_id)
+        profile = await run_db(get_active_profile, user_id)
 
         if not profile:
             await interaction.response.send_message(
@@ -45,25 +47,11 @@ class StatsCog(commands.Cog):
             )
             return
 
-        since = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
-
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(
-            """
-            SELECT category, COUNT(*) AS count
-            FROM task_history
-            WHERE profile_id = ?
-              AND completed = 1
-              AND date >= ?
-            GROUP BY category
-            """,
-            (profile["profile_id"], since),
-        )
+        # Days are the profile's own calendar days, today included
+        today = await run_db(clock.profile_today, profile["profile_id"])
+        since = (date.fromisoformat(today) - timedelta(days=days - 1)).isoformat()
 
-        rows = cur.fetchall()
-        conn.close()
+        rows = await run_db(stats_since, profile["profile_id"], since)
 
         if not rows:
             await interaction.response.send_message(
@@ -77,6 +65,13 @@ class StatsCog(commands.Cog):
         for r in rows:
             lines.append(f"• **{r['category']}** — {r['count']}")
 
+        lines.append(f"\n🪙 {sum(r['tokens'] for r in rows)} tokens earned")
+
+        if days > 1:
+            week = await run_db(week_summary, profile["profile_id"], today)
+            if week and week["bosses_defeated"]:
+                lines.append(f"🏆 {week['bosses_defeated']} bosses defeated this week")
+
         await interaction.response.send_message(
             "\n".join(lines),
             ephemeral=True,
@@ -1,17 +1,21 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import date
 
 from core.db import get_connection
+from core.async_db import run_db
+from core.clock import profile_today
 from core.task_engine import (
-    generate_daily_tasks,
-    get_tasks_for_profile,
+    ensure_daily_tasks,
     complete_task_for_profile,
 )
-from core.theming import inject_names
+from core.task_rewards import NOT_ASSIGNED
+from core.task_board import TaskBoard, OPTIONAL_SECTIONS, get_board
+from core.task_buttons import build_task_buttons
+from core.theming import ProfileContext
+from core.templates import render
 from core.users import ensure_user
-from core.presence import get_active_profile
+from core.presence import get_profile_context
 
 
 def has_started(user_id: str) -> bool:
@@ -23,31 +27,69 @@ def has_started(user_id: str) -> bool:
     return bool(row and row["has_started"])
 
 
-class TaskButton(discord.ui.Button):
-    def __init__(self, profile_id: int, task_key: str):
-        super().__init__(label="Complete", style=discord.ButtonStyle.primary)
-        self.profile_id = profile_id
-        self.task_key = task_key
+def load_board(context: ProfileContext) -> TaskBoard:
+    """
+    Today's task board with names already injected (cached).
+    Sync (DB-bound on a miss) — call through run_db from async code.
+    """
+    return get_board(context.profile_id, profile_today(context.profile_id), context.names)
 
-    async def callback(self, interaction: discord.Interaction):
-        complete_task_for_profile(self.profile_id, self.task_key)
 
-        profile = get_active_profile(str(interaction.user.id))
-        tasks = get_tasks_for_profile(
-            profile["profile_id"],
-            date.today().isoformat(),
-        )
+def complete_and_reload(user_id: str, profile_id: int, task_key: str):
+    """
+    Returns (profile, board, message) — message is the rendered
+    completion text, or None if nothing was completed. board is None
+    if the button belongs to a profile that isn't the user's active one.
 
-        embed, view = build_tasks_embed_and_view(
-            interaction.user.id,
-            profile,
-            tasks,
+    The board is updated in place; only the completion itself
+    touches the DB on a warm cache.
+    """
+    context = get_profile_context(user_id)
+    if not context:
+        return None, None, None
+
+    # Owner check: only the fronting profile's own buttons count
+    if context.profile_id != profile_id:
+        return context.profile, None, None
+
+    completion = complete_task_for_profile(profile_id, task_key)
+
+    board = load_board(context)
+    if completion.status != NOT_ASSIGNED:
+        board.mark_done(task_key)
+
+    message = None
+    if completion.completed:
+        message = render(
+            completion.message,
+            {**context.names, "tokens": completion.tokens},
         )
+        for boss in completion.bosses:
+            message += f"\n\n🏆 You defeated **{boss['name']}**! +{boss['reward_tokens']} tokens"
+
+    return context.profile, board, message
 
-        await interaction.response.edit_message(embed=embed, view=view)
 
+def _open_task_list(user_id: str):
+    ensure_user(user_id)
 
-def build_tasks_embed_and_view(user_id: int, profile: dict, tasks: dict):
+    if not has_started(user_id):
+        return "not_started", None, None
+
+    context = get_profile_context(user_id)
+    if not context:
+        return "no_profile", None, None
+
+    # Normally pre-generated by the morning batch; this is the miss path
+    ensure_daily_tasks(context.profile_id)
+    return "ok", context.profile, load_board(context)
+
+
+def build_tasks_embed_and_view(user_id: int, profile: dict, board: TaskBoard):
+    """
+    Pure UI assembly — serializes a TaskBoard (no DB access).
+    Must run on the event loop (discord.ui.View needs it).
+    """
     title_name = profile["nickname"] or profile["name"]
 
     embed = discord.Embed(
@@ -59,34 +101,24 @@ def build_tasks_embed_and_view(user_id: int, profile: dict, tasks: dict):
         if not items:
             return "✔ Nothing left here."
         return "\n".join(
-            f"• {inject_names(text, user_id)}"
+            f"• {text}"
             for text in items.values()
         )
 
-    embed.add_field("Required", section(tasks.get("required", {})), inline=False)
-    embed.add_field("Core", section(tasks.get("core", {})), inline=False)
+    embed.add_field(name="Required", value=section(board.pending("required")), inline=False)
+    embed.add_field(name="Core", value=section(board.pending("core")), inline=False)
 
-    for optional in ("intimacy", "kink", "explicit"):
-        if tasks.get(optional):
+    for optional in OPTIONAL_SECTIONS:
+        if board.sections.get(optional):
             embed.add_field(
                 name=optional.capitalize(),
-                value=section(tasks[optional]),
+                value=section(board.pending(optional)),
                 inline=False,
             )
 
     embed.set_footer(text="Tasks update as you complete them.")
 
-    view = discord.ui.View(timeout=None)
-    seen = set()
-
-    for category in tasks.values():
-        for task_key in category:
-            if task_key in seen:
-                continue
-            seen.add(task_key)
-            view.add_item(TaskButton(profile["profile_id"], task_key))
-
-    return embed, view
+    return embed, build_task_buttons(board)
 
 
 class Tasks(commands.Cog):
@@ -96,34 +128,26 @@ class Tasks(commands.Cog):
     @app_commands.command(name="tasks", description="Show today’s tasks")
     async def tasks(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        ensure_user(user_id)
+        status, profile, board = await run_db(_open_task_list, user_id)
 
-        if not has_started(user_id):
+        if status == "not_started":
             await interaction.response.send_message(
                 "Let’s start first 💜 Use `/start`.",
                 ephemeral=True,
             )
             return
 
-        profile = get_active_profile(user_id)
-        if not profile:
+        if status == "no_profile":
             await interaction.response.send_message(
                 "I’m not sure who’s here yet.",
                 ephemeral=True,
             )
             return
 
-        generate_daily_tasks(profile["profile_id"])
-
-        tasks = get_tasks_for_profile(
-            profile["profile_id"],
-            date.today().isoformat(),
-        )
-
         embed, view = build_tasks_embed_and_view(
             interaction.user.id,
             profile,
-            tasks,
+            board,
         )
 
         await interaction.response.send_message(
@@ -1,6 +1,12 @@
 import logging
-from datetime import date
+from core import clock, token_ledger
 from core.db import get_connection
+from core.async_db import run_db
+from core.jobs import recent_runs
+from core.retention import archive_all
+from core.stats import backfill_rollups
+from core.streaks import rebuild_streaks
+from core.task_board import clear_boards
 
 log = logging.getLogger("tinyregg.admin_services")
 
@@ -13,11 +19,15 @@ async def dispatch_daily_tasks():
     """
     Re-dispatch daily tasks for all active profiles.
     """
+    await run_db(_dispatch_daily_tasks)
+
+    log.warning("Admin dispatched daily tasks")
+
+
+def _dispatch_daily_tasks():
     conn = get_connection()
     cur = conn.cursor()
 
-    today = date.today().isoformat()
-
     cur.execute(
         "SELECT profile_id FROM profiles WHERE is_active = 1"
     )
@@ -31,39 +41,43 @@ async def dispatch_daily_tasks():
             DELETE FROM assigned_tasks
             WHERE profile_id = ? AND date = ?
             """,
-            (profile_id, today),
+            (profile_id, clock.profile_today(profile_id)),
         )
 
         # Task regeneration is handled elsewhere (task_engine)
 
     conn.commit()
     conn.close()
-
-    log.warning("Admin dispatched daily tasks")
+    clear_boards()
 
 
 async def force_daily_reset():
     """
-    Force a global daily reset.
+    Force a global daily reset. Every day's tasks, today's included,
+    move to the archive tier, so nothing is lost.
     """
+    await run_db(_force_daily_reset)
+
+    log.critical("Admin forced daily reset")
+
+
+def _force_daily_reset():
+    archive_all()
+
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("DELETE FROM task_history")
-    cur.execute("DELETE FROM assigned_tasks")
-
     cur.execute(
         """
         INSERT OR REPLACE INTO task_reset_state (id, last_reset_date)
         VALUES (1, ?)
         """,
-        (date.today().isoformat(),),
+        (clock.local_today(),),
     )
 
     conn.commit()
     conn.close()
-
-    log.critical("Admin forced daily reset")
+    clear_boards()
 
 
 # ─────────────────────────────────────────────────────────────
@@ -71,6 +85,14 @@ async def force_daily_reset():
 # ─────────────────────────────────────────────────────────────
 
 async def reset_user_state(user_id: int):
+    if not await run_db(_reset_user_state, user_id):
+        return False
+
+    log.warning("Admin reset user state: %s", user_id)
+    return True
+
+
+def _reset_user_state(user_id: int) -> bool:
     conn = get_connection()
     cur = conn.cursor()
 
@@ -99,15 +121,38 @@ async def reset_user_state(user_id: int):
             "DELETE FROM boss_history WHERE profile_id = ?",
             (profile_id,),
         )
+        cur.execute(
+            "DELETE FROM boss_progress WHERE profile_id = ?",
+            (profile_id,),
+        )
+        cur.execute(
+            "DELETE FROM daily_stats WHERE profile_id = ?",
+            (profile_id,),
+        )
+        cur.execute(
+            "DELETE FROM weekly WHERE profile_id = ?",
+            (profile_id,),
+        )
+        cur.execute(
+            "DELETE FROM task_archive WHERE profile_id = ?",
+            (profile_id,),
+        )
 
     conn.commit()
     conn.close()
-
-    log.warning("Admin reset user state: %s", user_id)
+    clear_boards()
     return True
 
 
 async def set_user_streak(user_id: int, value: int):
+    if not await run_db(_set_user_streak, user_id, value):
+        return False
+
+    log.critical("Admin set streaks for user %s → %s", user_id, value)
+    return True
+
+
+def _set_user_streak(user_id: int, value: int) -> bool:
     conn = get_connection()
     cur = conn.cursor()
 
@@ -124,68 +169,100 @@ async def set_user_streak(user_id: int, value: int):
     for row in profiles:
         profile_id = row["profile_id"]
 
+        # Counted through today, so the value holds until a day is missed
+        today = clock.profile_today(profile_id) if value else None
+
         cur.execute(
             """
             INSERT OR REPLACE INTO profile_streaks (
                 profile_id,
-                required_streak,
-                intimacy_streak,
-                kink_streak,
-                explicit_streak,
-                regression_streak
+                required_streak, last_required_day,
+                intimacy_streak, last_intimacy_day,
+                kink_streak, last_kink_day,
+                explicit_streak, last_explicit_day,
+                regression_streak, last_regression_day
             )
-            VALUES (?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (profile_id, value, value, value, value, value),
+            (profile_id, *(value, today) * 5),
         )
 
     conn.commit()
     conn.close()
-
-    log.critical("Admin set streaks for user %s → %s", user_id, value)
     return True
 
 
+async def repair_streaks():
+    """
+    Recompute every streak from task_history (see core.streaks).
+    """
+    await run_db(rebuild_streaks)
+
+    log.critical("Admin rebuilt all streaks")
+
+
+async def backfill_stats():
+    """
+    Recount the daily_stats / weekly rollups from history (see core.stats).
+    """
+    await run_db(backfill_rollups)
+
+    log.critical("Admin backfilled stats rollups")
+
+
 # ─────────────────────────────────────────────────────────────
 # TOKENS
 # ─────────────────────────────────────────────────────────────
 
 async def add_tokens(user_id: int, amount: int):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO users (user_id, tokens)
-        VALUES (?, ?)
-        ON CONFLICT(user_id) DO UPDATE SET
-            tokens = tokens + ?
-        """,
-        (str(user_id), amount, amount),
-    )
-
-    conn.commit()
-    conn.close()
+    await run_db(_add_tokens, user_id, amount)
 
     log.warning("Admin added %s tokens to %s", amount, user_id)
     return True
 
 
-async def remove_tokens(user_id: int, amount: int):
+def _add_tokens(user_id: int, amount: int):
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute(
-        """
-        UPDATE users
-        SET tokens = MAX(tokens - ?, 0)
-        WHERE user_id = ?
-        """,
-        (amount, str(user_id)),
-    )
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (str(user_id),))
+        balance = token_ledger.credit_with(cur, str(user_id), amount, token_ledger.ADMIN_ADD)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
-    conn.commit()
-    conn.close()
+    token_ledger.remember(str(user_id), balance)
+
+
+async def remove_tokens(user_id: int, amount: int):
+    await run_db(_remove_tokens, user_id, amount)
 
     log.warning("Admin removed %s tokens from %s", amount, user_id)
     return True
+
+
+def _remove_tokens(user_id: int, amount: int):
+    token_ledger.debit(str(user_id), amount, token_ledger.ADMIN_REMOVE, clamp=True)
+
+
+async def token_history(user_id: int, limit: int = 10):
+    """
+    Newest token_ledger rows for a user (audit).
+    """
+    return await run_db(token_ledger.recent_entries, str(user_id), limit)
+
+
+# ─────────────────────────────────────────────────────────────
+# JOBS
+# ─────────────────────────────────────────────────────────────
+
+async def job_runs(job_name: str = None, limit: int = 7):
+    """
+    Newest job_runs rows with their progress (see core.jobs).
+    """
+    return await run_db(recent_runs, job_name, limit)
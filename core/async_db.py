@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core import db
+
+log = logging.getLogger("tinyregg.async_db")
+
+# SQLite serializes writers anyway; a few workers is plenty for
+# overlapping reads while one write is in flight.
+DB_WORKERS = int(os.getenv("TINYREGG_DB_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=DB_WORKERS,
+    thread_name_prefix="tinyregg-db",
+)
+
+
+# ─────────────────────────────────────────────
+# CORE ENTRY POINT
+# ─────────────────────────────────────────────
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Runs a synchronous core/db function on the DB executor.
+
+    This is how async code (cogs, loops) should call into core/:
+    the gateway loop awaits the result instead of waiting on disk.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        functools.partial(fn, *args, **kwargs),
+    )
+
+
+# ─────────────────────────────────────────────
+# QUERY HELPERS
+# ─────────────────────────────────────────────
+
+def _fetch_all(sql: str, params):
+    with db.connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _fetch_one(sql: str, params):
+    with db.connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def _execute(sql: str, params):
+    with db.connection() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def _insert(sql: str, params):
+    with db.connection() as conn:
+        return conn.execute(sql, params).lastrowid
+
+
+def _executemany(sql: str, seq_of_params):
+    with db.connection() as conn:
+        return conn.executemany(sql, seq_of_params).rowcount
+
+
+def _transaction(fn, args, kwargs):
+    with db.connection() as conn:
+        return fn(conn, *args, **kwargs)
+
+
+async def fetch_all(sql: str, params=()):
+    return await run_db(_fetch_all, sql, params)
+
+
+async def fetch_one(sql: str, params=()):
+    return await run_db(_fetch_one, sql, params)
+
+
+async def execute(sql: str, params=()) -> int:
+    """
+    Runs a single write and commits.
+    Returns the affected row count.
+    """
+    return await run_db(_execute, sql, params)
+
+
+async def insert(sql: str, params=()) -> int:
+    """
+    Runs a single INSERT and commits.
+    Returns the new row id.
+    """
+    return await run_db(_insert, sql, params)
+
+
+async def executemany(sql: str, seq_of_params):
+    return await run_db(_executemany, sql, list(seq_of_params))
+
+
+async def transaction(fn, *args, **kwargs):
+    """
+    Runs fn(conn, *args, **kwargs) on one pooled connection.
+
+    Everything fn does is committed together, or rolled back
+    together if it raises.
+    """
+    return await run_db(_transaction, fn, args, kwargs)
+
+
+# ─────────────────────────────────────────────
+# LIFECYCLE
+# ─────────────────────────────────────────────
+
+def shutdown():
+    _executor.shutdown(wait=True)
+    db.get_pool().close_all()
@@ -0,0 +1,382 @@
+import json
+import logging
+import threading
+from datetime import date, timedelta
+
+from core import clock, task_catalog, token_ledger
+from core.db import get_connection
+from core.dm_dispatcher import queue_dm
+from core.stats import week_key
+
+log = logging.getLogger("tinyregg.boss_engine")
+
+
+# ─────────────────────────────────────────────
+# DEFINITIONS (data, stored in boss_state)
+# ─────────────────────────────────────────────
+# Each boss is one boss_state row: key "boss:<key>", value JSON.
+# The defaults below are only seeded when missing (seed_bosses), so a
+# boss can be tuned or added in the table without a deploy (then
+# reload_bosses()). A default that isn't seeded yet is still served.
+#
+# - window: "week" (ISO week) or "day", in the profile's own timezone
+# - requirements: category -> completions needed; "*" counts any task
+
+DEFAULT_BOSSES = (
+    {
+        "key": "weight_of_the_week",
+        "name": "The Weight of the Week",
+        "window": "week",
+        "requirements": {"*": 10},
+        "reward_tokens": 50,
+        "message": (
+            "You pushed through the week and didn’t disappear.\n"
+            "That counts for more than you think."
+        ),
+    },
+    {
+        "key": "clutter_goblin",
+        "name": "The Clutter Goblin",
+        "window": "week",
+        "requirements": {"small_clean": 3, "medium_clean": 2},
+        "reward_tokens": 25,
+        "message": (
+            "Little by little, your space got lighter.\n"
+            "The goblin has nowhere left to hide."
+        ),
+    },
+)
+
+BOSS_STATE_PREFIX = "boss:"
+ANY_CATEGORY = "*"
+DEFEATED = "defeated"
+
+_bosses = None
+_bosses_lock = threading.Lock()
+
+
+def seed_bosses():
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT OR IGNORE INTO boss_state (key, value) VALUES (?, ?)",
+        [
+            (BOSS_STATE_PREFIX + boss["key"], json.dumps(boss))
+            for boss in DEFAULT_BOSSES
+        ],
+    )
+    conn.commit()
+    conn.close()
+    reload_bosses()
+
+
+def _load_bosses():
+    # Read-only: this runs lazily inside completion transactions
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT key, value FROM boss_state WHERE key LIKE ? ORDER BY key",
+        (BOSS_STATE_PREFIX + "%",),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    bosses = {boss["key"]: boss for boss in DEFAULT_BOSSES}
+    for row in rows:
+        key = row["key"][len(BOSS_STATE_PREFIX):]
+        try:
+            boss = json.loads(row["value"])
+            boss["key"] = key
+            if boss["window"] not in WINDOWS or not boss["requirements"]:
+                raise ValueError(boss["window"])
+        except (ValueError, KeyError, TypeError):
+            log.error("Ignoring malformed boss definition %s", row["key"])
+            bosses.pop(key, None)
+            continue
+        bosses[key] = boss
+    return tuple(bosses[key] for key in sorted(bosses))
+
+
+def get_bosses():
+    """
+    All boss definitions (loaded once, then served from memory).
+    """
+    global _bosses
+    if _bosses is None:
+        with _bosses_lock:
+            if _bosses is None:
+                _bosses = _load_bosses()
+    return _bosses
+
+
+def reload_bosses():
+    global _bosses
+    with _bosses_lock:
+        _bosses = None
+
+
+# ─────────────────────────────────────────────
+# WINDOWS
+# ─────────────────────────────────────────────
+
+def _week(day: date):
+    year, week, _ = day.isocalendar()
+    start = day - timedelta(days=day.weekday())
+    return f"{year}-W{week:02d}", start, start + timedelta(days=6)
+
+
+def _day(day: date):
+    return day.isoformat(), day, day
+
+
+WINDOWS = {"week": _week, "day": _day}
+
+
+def window_for(boss, day: str):
+    """
+    (window_id, first_day, last_day) of the boss window containing day.
+    Window ids sort in time order, which prune_progress relies on.
+    """
+    return WINDOWS[boss["window"]](date.fromisoformat(day))
+
+
+def progress_key(boss, window_id: str, requirement: str) -> str:
+    return f"{boss['key']}:{window_id}:{requirement}"
+
+
+# ─────────────────────────────────────────────
+# COMPLETION PATH (inside the completion transaction)
+# ─────────────────────────────────────────────
+
+_BUMP_SQL = """
+    INSERT INTO boss_progress (profile_id, requirement_key, count)
+    VALUES (?, ?, 1)
+    ON CONFLICT (profile_id, requirement_key) DO UPDATE SET
+        count = count + 1
+"""
+
+
+def record_progress(cur, profile_id: int, category: str, today: str) -> list:
+    """
+    Counts one completion towards every boss it applies to and
+    settles any boss that is now beaten. Returns the defeated bosses.
+
+    Assumes an open transaction and never commits. Costs one UPSERT
+    per matching requirement plus a primary-key read per touched
+    boss — independent of how much history the profile has.
+    """
+    defeated = []
+
+    for boss in get_bosses():
+        requirements = boss["requirements"]
+        matched = [r for r in (category, ANY_CATEGORY) if r in requirements]
+        if not matched:
+            continue
+
+        window_id, _, _ = window_for(boss, today)
+        keys = {r: progress_key(boss, window_id, r) for r in requirements}
+
+        cur.executemany(_BUMP_SQL, [(profile_id, keys[r]) for r in matched])
+
+        placeholders = ",".join("?" * len(keys))
+        cur.execute(
+            f"""
+            SELECT requirement_key, count
+            FROM boss_progress
+            WHERE profile_id = ?
+              AND requirement_key IN ({placeholders})
+            """,
+            (profile_id, *keys.values()),
+        )
+        counts = {row["requirement_key"]: row["count"] for row in cur.fetchall()}
+
+        if any(counts.get(keys[r], 0) < needed for r, needed in requirements.items()):
+            continue
+
+        # The marker row makes the defeat happen once per window
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO boss_progress (profile_id, requirement_key, count)
+            VALUES (?, ?, 1)
+            """,
+            (profile_id, progress_key(boss, window_id, DEFEATED)),
+        )
+        if cur.rowcount:
+            _settle_defeat(cur, profile_id, boss, today)
+            defeated.append(boss)
+
+    return defeated
+
+
+def defeat_message(boss, profile_name: str) -> str:
+    return (
+        f"🏆 **Boss Defeated**\n\n"
+        f"**{profile_name}** faced *{boss['name']}*.\n\n"
+        f"{boss['message']}\n\n"
+        f"+{boss['reward_tokens']} tokens"
+    )
+
+
+def _settle_defeat(cur, profile_id: int, boss, today: str):
+    cur.execute(
+        "SELECT user_id, name FROM profiles WHERE profile_id = ?",
+        (profile_id,),
+    )
+    profile = cur.fetchone()
+
+    cur.execute(
+        "INSERT INTO boss_history (profile_id, boss_name) VALUES (?, ?)",
+        (profile_id, boss["name"]),
+    )
+    cur.execute(
+        """
+        INSERT INTO weekly (profile_id, week, bosses_defeated)
+        VALUES (?, ?, 1)
+        ON CONFLICT(profile_id, week) DO UPDATE SET
+            bosses_defeated = bosses_defeated + 1
+        """,
+        (profile_id, week_key(today)),
+    )
+    token_ledger.credit_with(
+        cur, profile["user_id"], boss["reward_tokens"], token_ledger.BOSS, ref=boss["key"]
+    )
+    queue_dm(
+        cur,
+        profile["user_id"],
+        defeat_message(boss, profile["name"]),
+        profile_id=profile_id,
+    )
+
+
+# ─────────────────────────────────────────────
+# MAINTENANCE
+# ─────────────────────────────────────────────
+
+def prune_progress() -> int:
+    """
+    Drops progress rows of windows that have closed everywhere.
+    A window only closes once the day before (UTC) has left it,
+    so no timezone still in that window loses its progress.
+    """
+    cutoff_day = (clock.now_utc().date() - timedelta(days=1)).isoformat()
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    removed = 0
+    for boss in get_bosses():
+        window_id, _, _ = window_for(boss, cutoff_day)
+        prefix = f"{boss['key']}:"
+        cur.execute(
+            """
+            DELETE FROM boss_progress
+            WHERE requirement_key >= ?
+              AND requirement_key < ?
+            """,
+            (prefix, prefix + window_id),
+        )
+        removed += cur.rowcount
+
+    conn.commit()
+    conn.close()
+    return removed
+
+
+def rebuild_progress() -> int:
+    """
+    Recounts every profile's current-window progress from task_history
+    (set-based, one statement per boss requirement and timezone).
+
+    Idempotent; run at startup so counts survive the switch from
+    periodic scans and any manual history edits. Defeats already in
+    boss_history for the window are marked so they aren't paid twice.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT DISTINCT {clock.USER_TIMEZONE_SQL} AS timezone
+        FROM users u
+        """,
+        (clock.DEFAULT_TIMEZONE,),
+    )
+    timezones = [row["timezone"] for row in cur.fetchall()]
+
+    # Same bucket rule as clock.USER_TIMEZONE_SQL, with named parameters
+    bucket = """
+        FROM task_history th
+        JOIN profiles p ON p.profile_id = th.profile_id
+        JOIN users u ON u.user_id = p.user_id
+        WHERE COALESCE(u.timezone, :default) = :timezone
+          AND th.completed = 1
+          AND th.date BETWEEN :first AND :last
+    """
+
+    rebuilt = 0
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        for timezone in timezones:
+            today = clock.local_today(timezone)
+
+            for boss in get_bosses():
+                window_id, first, last = window_for(boss, today)
+                params = {
+                    "default": clock.DEFAULT_TIMEZONE,
+                    "timezone": timezone,
+                    "first": first.isoformat(),
+                    "last": last.isoformat(),
+                }
+
+                for requirement in boss["requirements"]:
+                    category_filter = (
+                        "" if requirement == ANY_CATEGORY else "AND th.category_id = :category"
+                    )
+                    cur.execute(
+                        f"""
+                        INSERT INTO boss_progress (profile_id, requirement_key, count)
+                        SELECT th.profile_id, :key, COUNT(*)
+                        {bucket}
+                        {category_filter}
+                        GROUP BY th.profile_id
+                        ON CONFLICT (profile_id, requirement_key) DO UPDATE SET
+                            count = excluded.count
+                        """,
+                        {
+                            **params,
+                            "key": progress_key(boss, window_id, requirement),
+                            "category": task_catalog.category_code(requirement),
+                        },
+                    )
+                    rebuilt += cur.rowcount
+
+                # defeated_at is UTC: compare against the UTC instants
+                # the local window starts and ends at
+                cur.execute(
+                    """
+                    INSERT OR IGNORE INTO boss_progress (profile_id, requirement_key, count)
+                    SELECT bh.profile_id, :key, 1
+                    FROM boss_history bh
+                    JOIN profiles p ON p.profile_id = bh.profile_id
+                    JOIN users u ON u.user_id = p.user_id
+                    WHERE COALESCE(u.timezone, :default) = :timezone
+                      AND bh.boss_name = :name
+                      AND bh.defeated_at >= :starts
+                      AND bh.defeated_at < :ends
+                    """,
+                    {
+                        **params,
+                        "key": progress_key(boss, window_id, DEFEATED),
+                        "name": boss["name"],
+                        "starts": clock.day_start_stamp(first, timezone),
+                        "ends": clock.day_start_stamp(last + timedelta(days=1), timezone),
+                    },
+                )
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return rebuilt
@@ -0,0 +1,164 @@
+import threading
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+from core.db import get_connection
+
+# Users who never set a timezone keep the bot's original schedule
+DEFAULT_TIMEZONE = "America/Chicago"
+
+# SQL for "this user's timezone bucket"; bind DEFAULT_TIMEZONE first
+USER_TIMEZONE_SQL = "COALESCE(u.timezone, ?)"
+
+
+# ─────────────────────────────────────────────
+# ZONES
+# ─────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def zone(name: str | None) -> ZoneInfo:
+    """
+    ZoneInfo for an IANA name; unknown or empty names fall back to
+    DEFAULT_TIMEZONE instead of raising on a hot path.
+    """
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def is_valid_timezone(name: str) -> bool:
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=1)
+def timezone_names() -> tuple[str, ...]:
+    return tuple(sorted(available_timezones()))
+
+
+# ─────────────────────────────────────────────
+# NOW / TODAY (single source of truth)
+# ─────────────────────────────────────────────
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def local_now(tz_name: str | None = None) -> datetime:
+    return datetime.now(zone(tz_name))
+
+
+def local_today(tz_name: str | None = None) -> str:
+    return local_now(tz_name).date().isoformat()
+
+
+# ─────────────────────────────────────────────
+# UTC STAMPS <-> LOCAL DAYS
+# ─────────────────────────────────────────────
+# Columns filled by CURRENT_TIMESTAMP hold naive UTC
+# ("YYYY-MM-DD HH:MM:SS"); windows and rollups key on local days.
+
+def local_date(stamp: str, tz_name: str | None = None) -> str:
+    """
+    The local day (YYYY-MM-DD) a UTC timestamp falls on.
+    """
+    moment = datetime.fromisoformat(stamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(zone(tz_name)).date().isoformat()
+
+
+def day_start_stamp(day: date, tz_name: str | None = None) -> str:
+    """
+    The UTC timestamp (CURRENT_TIMESTAMP format) at which a local day
+    begins, so local-day bounds can be compared against UTC columns.
+    """
+    start = datetime.combine(day, time.min, tzinfo=zone(tz_name))
+    return start.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ─────────────────────────────────────────────
+# PER-PROFILE TIMEZONE (cached)
+# ─────────────────────────────────────────────
+
+_profile_timezones: dict[int, str] = {}
+_profile_lock = threading.Lock()
+
+
+def profile_timezone(profile_id: int) -> str:
+    with _profile_lock:
+        tz_name = _profile_timezones.get(profile_id)
+    if tz_name is not None:
+        return tz_name
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT {USER_TIMEZONE_SQL} AS timezone
+        FROM profiles p
+        JOIN users u ON u.user_id = p.user_id
+        WHERE p.profile_id = ?
+        """,
+        (DEFAULT_TIMEZONE, profile_id),
+    )
+    row = cur.fetchone()
+    conn.close()
+
+    tz_name = row["timezone"] if row else DEFAULT_TIMEZONE
+    with _profile_lock:
+        _profile_timezones[profile_id] = tz_name
+    return tz_name
+
+
+def profile_today(profile_id: int) -> str:
+    """
+    "Today" as the profile's owner sees it. Task dates, completions
+    and boards all key on this.
+    """
+    return local_today(profile_timezone(profile_id))
+
+
+def set_user_timezone(user_id: str, tz_name: str):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE users SET timezone = ? WHERE user_id = ?",
+        (tz_name, user_id),
+    )
+    conn.commit()
+    conn.close()
+
+    with _profile_lock:
+        _profile_timezones.clear()
+
+
+# ─────────────────────────────────────────────
+# BUCKETS
+# ─────────────────────────────────────────────
+
+def timezone_buckets() -> list[tuple[str, int]]:
+    """
+    (timezone, started users) for every timezone in use. Scheduled
+    jobs run per bucket at that bucket's local time, which spreads
+    the daily fan-out across the day.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT {USER_TIMEZONE_SQL} AS timezone, COUNT(*) AS users
+        FROM users u
+        WHERE u.has_started = 1
+        GROUP BY 1
+        """,
+        (DEFAULT_TIMEZONE,),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return [(r["timezone"], r["users"]) for r in rows]
@@ -1,5 +1,7 @@
 import random
 
+from core.templates import precompile
+
 # ─────────────────────────────────────────────
 # REQUIRED / CARE (All modes, grounding)
 # ─────────────────────────────────────────────
@@ -72,6 +74,20 @@ EXPLICIT_MESSAGES = [
 ]
 
 
+DEFAULT_MESSAGE = "Task completed. (+{tokens} tokens)"
+
+# Validated at import; rendering later is a cache hit
+precompile([
+    *REQUIRED_MESSAGES,
+    *CORE_MESSAGES,
+    *REGRESSIVE_MESSAGES,
+    *INTIMACY_MESSAGES,
+    *KINK_MESSAGES,
+    *EXPLICIT_MESSAGES,
+    DEFAULT_MESSAGE,
+])
+
+
 # ─────────────────────────────────────────────
 # PUBLIC API
 # ─────────────────────────────────────────────
@@ -97,4 +113,4 @@ def get_completion_message(category: str, is_required: bool = False) -> str:
         case "explicit":
             return random.choice(EXPLICIT_MESSAGES)
         case _:
-            return "Task completed. (+{tokens} tokens)"
+            return DEFAULT_MESSAGE
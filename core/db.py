@@ -1,28 +1,318 @@
+import asyncio
+import logging
 import sqlite3
 import os
+import sys
+import threading
+import traceback
+from contextlib import contextmanager
+
+log = logging.getLogger("tinyregg.db")
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "tinyregg.db")
 
+# How many idle connections the pool keeps warm. Checkouts beyond this
+# still succeed (an extra connection is opened), they just aren't kept.
+POOL_SIZE = int(os.getenv("TINYREGG_DB_POOL_SIZE", "4"))
 
 # ─────────────────────────────────────────────────────────────
-# Connection helper
+# Storage profile
 # ─────────────────────────────────────────────────────────────
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+# Every knob is overridable from the environment. journal_mode is
+# persistent in the file (set once by initialize_db); the rest are
+# per-connection and applied when the pool opens a connection.
+STORAGE_PROFILE = {
+    "journal_mode": os.getenv("TINYREGG_DB_JOURNAL_MODE", "wal"),
+    "synchronous": os.getenv("TINYREGG_DB_SYNCHRONOUS", "normal"),
+    "cache_size": int(os.getenv("TINYREGG_DB_CACHE_SIZE", "-16000")),  # negative = KiB
+    "mmap_size": int(os.getenv("TINYREGG_DB_MMAP_SIZE", str(64 * 1024 * 1024))),
+    "temp_store": os.getenv("TINYREGG_DB_TEMP_STORE", "memory"),
+    "busy_timeout": int(os.getenv("TINYREGG_DB_BUSY_TIMEOUT_MS", "5000")),
+}
+
+_JOURNAL_MODES = ("wal", "delete", "truncate", "persist", "memory", "off")
+_SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+_TEMP_STORES = ("default", "file", "memory")
+
+
+def _profile_choice(key: str, allowed: tuple) -> str:
+    # PRAGMA values can't be bound as parameters, so only known
+    # keywords are ever interpolated.
+    value = str(STORAGE_PROFILE[key]).lower()
+    if value not in allowed:
+        raise ValueError(f"Invalid storage profile {key}={value!r} (expected one of {allowed})")
+    return value
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection):
+    """
+    Per-connection PRAGMAs. Applied once per pooled connection.
+    """
     conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    conn.execute(f"PRAGMA synchronous = {_profile_choice('synchronous', _SYNCHRONOUS_LEVELS)}")
+    conn.execute(f"PRAGMA cache_size = {int(STORAGE_PROFILE['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(STORAGE_PROFILE['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {_profile_choice('temp_store', _TEMP_STORES)}")
+    conn.execute(f"PRAGMA busy_timeout = {int(STORAGE_PROFILE['busy_timeout'])}")
+
+
+def describe_storage(conn) -> dict:
+    """
+    Effective storage settings as SQLite reports them. A setting the
+    build or database doesn't report (mmap_size on :memory: or without
+    mmap support) is None.
+    """
+    def pragma(name):
+        row = conn.execute(f"PRAGMA {name}").fetchone()
+        return row[0] if row else None
+
+    def named(name, levels):
+        value = pragma(name)
+        return levels[value] if value is not None else None
+
+    return {
+        "journal_mode": pragma("journal_mode"),
+        "synchronous": named("synchronous", _SYNCHRONOUS_LEVELS),
+        "cache_size": pragma("cache_size"),
+        "mmap_size": pragma("mmap_size"),
+        "temp_store": named("temp_store", _TEMP_STORES),
+        "busy_timeout": pragma("busy_timeout"),
+        "foreign_keys": bool(pragma("foreign_keys")),
+    }
+
+
+# When enabled, every checkout made directly on an event loop thread is
+# logged (once per call site) so stray blocking calls can be found.
+DETECT_LOOP_BLOCKING = os.getenv("TINYREGG_DB_DETECT_BLOCKING", "0") == "1"
+
+
+# ─────────────────────────────────────────────────────────────
+# Connection pool
+# ─────────────────────────────────────────────────────────────
+
+class PooledConnection:
+    """
+    Proxy around a pooled sqlite3 connection.
+
+    Behaves like sqlite3.Connection for existing callers, except that
+    close() hands the connection back to the pool instead of tearing
+    it down. Any transaction left open is rolled back on return.
+    """
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, conn: sqlite3.Connection, pool: "ConnectionPool"):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+
+    def _raw(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._raw(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw(), name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Same semantics as sqlite3.Connection: commit or roll back,
+        # but do NOT close.
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def close(self):
+        conn = self._conn
+        if conn is None:
+            return
+        object.__setattr__(self, "_conn", None)
+        self._pool.release(conn)
+
+    def __del__(self):
+        # Callers that forget close() (or bail out on an exception)
+        # must not leak a connection that still holds a lock.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Keeps up to `max_idle` warm connections with PRAGMAs applied once.
+
+    acquire() never blocks: when no idle connection is available a new
+    one is opened, and release() only keeps it if there is room.
+    """
+
+    def __init__(self, path: str, max_idle: int = POOL_SIZE):
+        self.path = path
+        self.max_idle = max_idle
+        self._idle: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between threads (one user at a time),
+        # so the same-thread check is disabled.
+        conn = sqlite3.connect(
+            self.path,
+            timeout=STORAGE_PROFILE["busy_timeout"] / 1000,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        apply_connection_pragmas(conn)
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        if DETECT_LOOP_BLOCKING:
+            _report_loop_blocking()
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+
+        if conn is None:
+            conn = self._connect()
+
+        return PooledConnection(conn, self)
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for conn in idle:
+            conn.close()
+
+
+# ─────────────────────────────────────────────────────────────
+# Blocking-call detection
+# ─────────────────────────────────────────────────────────────
+
+_reported_call_sites: set[tuple[str, int]] = set()
+
+
+def _report_loop_blocking():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return  # not on a loop thread (e.g. the DB executor)
+
+    # Walk out of core.db to the first caller outside this module
+    frame = sys._getframe(1)
+    while frame and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return
+
+    site = (frame.f_code.co_filename, frame.f_lineno)
+    if site in _reported_call_sites:
+        return
+    _reported_call_sites.add(site)
+
+    log.warning(
+        "Blocking DB call on the event loop thread at %s:%s\n%s",
+        site[0],
+        site[1],
+        "".join(traceback.format_stack(frame, limit=6)),
+    )
+
+
+def set_loop_blocking_detection(enabled: bool):
+    global DETECT_LOOP_BLOCKING
+    DETECT_LOOP_BLOCKING = enabled
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+
+    # Rebuilt if DB_PATH is repointed (e.g. scripts using a copy).
+    if _pool is None or _pool.path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.path != DB_PATH:
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = ConnectionPool(DB_PATH)
+
+    return _pool
+
+
+# ─────────────────────────────────────────────────────────────
+# Connection helpers
+# ─────────────────────────────────────────────────────────────
+
+def get_connection():
+    """
+    Checks out a pooled connection.
+
+    Drop-in for the old per-call sqlite3.connect(): callers still
+    call conn.close(), which now returns it to the pool.
+    """
+    return get_pool().acquire()
+
+
+@contextmanager
+def connection():
+    """
+    Context-managed checkout for new code.
+
+    Commits on success, rolls back on error, and always returns
+    the connection to the pool.
+    """
+    conn = get_pool().acquire()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
 # ─────────────────────────────────────────────────────────────
 # Initialization
 # ─────────────────────────────────────────────────────────────
 
-def initialize_db():
+def initialize_db() -> dict:
+    """
+    Creates the schema, applies pending migrations and the storage
+    profile. Returns the effective settings for startup reporting.
+    """
     conn = get_connection()
     cur = conn.cursor()
 
+    # Persistent in the database file; WAL lets the background loops
+    # read while an interactive completion is writing.
+    journal_mode = _profile_choice("journal_mode", _JOURNAL_MODES)
+    cur.execute(f"PRAGMA journal_mode = {journal_mode}")
+
     # ─────────────────────────────────────────────────────────
     # USERS (account-level only)
     # ─────────────────────────────────────────────────────────
@@ -84,6 +374,8 @@ def initialize_db():
 
     # ─────────────────────────────────────────────────────────
     # TASK ASSIGNMENT
+    # (migration 11 rebuilds both task tables on task_id /
+    # category_id integers — see core/task_catalog)
     # ─────────────────────────────────────────────────────────
     cur.execute("""
     CREATE TABLE IF NOT EXISTS assigned_tasks (
@@ -135,6 +427,7 @@ def initialize_db():
         last_intimacy_day TEXT,
         last_kink_day TEXT,
         last_explicit_day TEXT,
+        last_regression_day TEXT,
 
         FOREIGN KEY (profile_id)
             REFERENCES profiles(profile_id)
@@ -349,4 +642,194 @@ def initialize_db():
     """)
 
     conn.commit()
+
+    # ─────────────────────────────────────────────────────────
+    # MIGRATIONS (columns / tables added after the base schema)
+    # ─────────────────────────────────────────────────────────
+    from core.migrations import run_migrations
+
+    schema_version = run_migrations(conn)
+
+    # ─────────────────────────────────────────────────────────
+    # INDEXES (hot access paths)
+    # ─────────────────────────────────────────────────────────
+    for ddl in INDEXES:
+        cur.execute(ddl)
+
+    conn.commit()
+
+    from core.task_catalog import sync_catalog
+
+    sync_catalog(conn)
+
+    # Refresh planner statistics for anything that changed
+    cur.execute("PRAGMA optimize")
+
+    for name, detail in check_query_plans(conn):
+        log.warning("Hot query %r is not using an index: %s", name, detail)
+
+    settings = describe_storage(conn)
+    settings["schema_version"] = schema_version
     conn.close()
+    return settings
+
+
+# ─────────────────────────────────────────────────────────────
+# Indexes
+# ─────────────────────────────────────────────────────────────
+
+# assigned_tasks / task_history lookups by (profile_id, date) are
+# already served by their (profile_id, date, task_id) primary keys.
+INDEXES = (
+    # get_active_profile / get_all_profiles
+    """
+    CREATE INDEX IF NOT EXISTS idx_profiles_user_active
+    ON profiles (user_id, is_active)
+    """,
+    # timezone buckets for scheduled jobs (covering)
+    """
+    CREATE INDEX IF NOT EXISTS idx_users_started_timezone
+    ON users (has_started, timezone)
+    """,
+    # reminders by wall-clock time (the scheduler itself loads once)
+    """
+    CREATE INDEX IF NOT EXISTS idx_reminders_time
+    ON reminders (hour, minute, profile_id)
+    """,
+    # reward delivery / pending_rewards: only undelivered rows, in order
+    """
+    CREATE INDEX IF NOT EXISTS idx_redemption_pending
+    ON redemption_history (created_at)
+    WHERE delivered = 0
+    """,
+    # /mycodes
+    """
+    CREATE INDEX IF NOT EXISTS idx_redemption_profile
+    ON redemption_history (profile_id, created_at)
+    """,
+    # retention: oldest hot day (core/retention)
+    """
+    CREATE INDEX IF NOT EXISTS idx_assigned_tasks_date
+    ON assigned_tasks (date)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_task_history_date
+    ON task_history (date)
+    """,
+    # boss progress rebuild: completed tasks in a window, per profile
+    """
+    CREATE INDEX IF NOT EXISTS idx_task_history_completed_date
+    ON task_history (completed, date, profile_id)
+    """,
+    # boss_history by profile: admin resets, defeat lookups
+    """
+    CREATE INDEX IF NOT EXISTS idx_boss_history_lookup
+    ON boss_history (profile_id, boss_name, defeated_at)
+    """,
+    # token ledger audit: a user's newest entries
+    """
+    CREATE INDEX IF NOT EXISTS idx_token_ledger_user
+    ON token_ledger (user_id, id)
+    """,
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# Query plan check
+# ─────────────────────────────────────────────────────────────
+
+# Every query that runs on a loop or on each interaction. Parameters
+# are placeholders only — EXPLAIN QUERY PLAN never executes them.
+HOT_QUERIES = {
+    "active_profile": (
+        "SELECT * FROM profiles WHERE user_id = ? AND is_active = 1 LIMIT 1",
+        ("0",),
+    ),
+    "timezone_buckets": (
+        """
+        SELECT COALESCE(u.timezone, ?) AS timezone, COUNT(*)
+        FROM users u
+        WHERE u.has_started = 1
+        GROUP BY 1
+        """,
+        ("",),
+    ),
+    "pending_rewards": (
+        """
+        SELECT rh.id, rh.item_id, rh.reward_code, p.name, p.user_id
+        FROM redemption_history rh
+        JOIN profiles p ON rh.profile_id = p.profile_id
+        WHERE rh.delivered = 0
+        ORDER BY rh.created_at ASC
+        """,
+        (),
+    ),
+    "user_codes": (
+        """
+        SELECT rh.item_id, rh.reward_code, rh.delivered, p.name
+        FROM redemption_history rh
+        JOIN profiles p ON rh.profile_id = p.profile_id
+        WHERE p.user_id = ?
+        ORDER BY rh.created_at DESC
+        """,
+        ("0",),
+    ),
+    "assigned_today": (
+        "SELECT task_id, category_id, is_required FROM assigned_tasks WHERE profile_id = ? AND date = ?",
+        (0, ""),
+    ),
+    "history_today": (
+        "SELECT task_id FROM task_history WHERE profile_id = ? AND completed = 1 AND date = ?",
+        (0, ""),
+    ),
+    "recent_history": (
+        "SELECT date, task_id, completed FROM task_history WHERE profile_id = ? ORDER BY date DESC LIMIT 10",
+        (0,),
+    ),
+    "boss_progress": (
+        "SELECT requirement_key, count FROM boss_progress WHERE profile_id = ? AND requirement_key IN (?, ?)",
+        (0, "", ""),
+    ),
+    "stats_range": (
+        """
+        SELECT category, SUM(completed), SUM(tokens)
+        FROM daily_stats
+        WHERE profile_id = ? AND date >= ?
+        GROUP BY category
+        """,
+        (0, ""),
+    ),
+    "oldest_hot_day": (
+        "SELECT MIN(date) FROM task_history WHERE date < ?",
+        ("",),
+    ),
+    "due_messages": (
+        """
+        SELECT id, user_id, content, embed, attempts
+        FROM message_queue
+        WHERE sent = 0 AND next_attempt_at <= ?
+        ORDER BY next_attempt_at, id
+        LIMIT 100
+        """,
+        ("",),
+    ),
+}
+
+
+def check_query_plans(conn) -> list[tuple[str, str]]:
+    """
+    Runs EXPLAIN QUERY PLAN for every hot query.
+
+    Returns (query_name, plan_detail) for each step that falls back
+    to a full table scan. An empty list means every hot path is
+    served by an index.
+    """
+    offenders = []
+
+    for name, (sql, params) in HOT_QUERIES.items():
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            detail = row[3]
+            if detail.startswith("SCAN") and "USING" not in detail:
+                offenders.append((name, detail))
+
+    return offenders
@@ -0,0 +1,386 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from core import clock
+from core.db import get_connection
+from core.async_db import run_db
+from core.dm_resolver import DMResolver
+
+log = logging.getLogger("tinyregg.dm_dispatcher")
+
+# Concurrent senders. discord.py already queues per-route buckets
+# and honours 429s; this bounds how much we put in flight at once.
+DM_SENDERS = int(os.getenv("TINYREGG_DM_SENDERS", "8"))
+
+# Sends started per second, kept under Discord's global 50/s.
+DM_RATE_PER_SECOND = float(os.getenv("TINYREGG_DM_RATE", "40"))
+
+BATCH_SIZE = 100
+IDLE_POLL_SECONDS = 30
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 15
+BACKOFF_MAX_SECONDS = 30 * 60
+
+# Discord JSON error codes
+UNKNOWN_CHANNEL = 10003
+
+# message_queue.sent
+PENDING = 0
+SENT = 1
+FAILED = -1
+
+# Sent and failed rows are kept this long for inspection, then pruned.
+# Every dedupe_key is only re-offered within a day or so of its first
+# enqueue (morning run, reminder slot, milestone countdown day), so
+# dropping week-old keys can't let a message through twice.
+QUEUE_RETENTION_DAYS = int(os.getenv("TINYREGG_QUEUE_RETENTION_DAYS", "7"))
+PRUNE_BATCH = 500
+
+
+def _now() -> datetime:
+    return clock.now_utc()
+
+
+def _stamp(moment: datetime) -> str:
+    # Same shape as CURRENT_TIMESTAMP (UTC), so text order is time order
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _parse_stamp(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+# ─────────────────────────────────────────────
+# ENQUEUE (sync, joins the caller's transaction)
+# ─────────────────────────────────────────────
+
+_ENQUEUE_SQL = """
+    INSERT OR IGNORE INTO message_queue
+    (user_id, profile_id, content, embed, dedupe_key, timestamp, next_attempt_at, sent)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+"""
+
+
+def dm_row(user_id, content=None, *, embed=None, profile_id=None, dedupe_key=None):
+    """
+    Parameters for one queued DM.
+
+    dedupe_key makes enqueueing idempotent: a second message with
+    the same key is dropped (e.g. "morning:2024-05-01:<user_id>").
+    """
+    now = _stamp(_now())
+    return (
+        str(user_id),
+        profile_id,
+        content,
+        json.dumps(embed.to_dict()) if embed is not None else None,
+        dedupe_key,
+        now,
+        now,
+    )
+
+
+def queue_dm(cur, user_id, content=None, **kwargs) -> bool:
+    """
+    Queues one DM inside an open transaction (never commits), so it
+    lands atomically with whatever state change caused it.
+    Returns False if the dedupe_key was already queued.
+    """
+    cur.execute(_ENQUEUE_SQL, dm_row(user_id, content, **kwargs))
+    return cur.rowcount > 0
+
+
+def _enqueue(rows) -> int:
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany(_ENQUEUE_SQL, rows)
+    queued = cur.rowcount
+    conn.commit()
+    conn.close()
+    return queued
+
+
+# ─────────────────────────────────────────────
+# QUEUE STATE
+# ─────────────────────────────────────────────
+
+def _claim_due(limit: int):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT id, user_id, content, embed, attempts
+        FROM message_queue
+        WHERE sent = 0 AND next_attempt_at <= ?
+        ORDER BY next_attempt_at, id
+        LIMIT ?
+        """,
+        (_stamp(_now()), limit),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def _next_due() -> str | None:
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT MIN(next_attempt_at) AS due
+        FROM message_queue
+        WHERE sent = 0
+        """
+    )
+    row = cur.fetchone()
+    conn.close()
+    return row["due"] if row else None
+
+
+def _record_results(sent: list, retries: list, failed: list):
+    """
+    - sent: [message_id]
+    - retries: [(next_attempt_at, error, message_id)]
+    - failed: [(error, message_id)]
+    """
+    now = _stamp(_now())
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "UPDATE message_queue SET sent = 1, sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+        [(now, message_id) for message_id in sent],
+    )
+    cur.executemany(
+        """
+        UPDATE message_queue
+        SET attempts = attempts + 1,
+            next_attempt_at = ?,
+            last_error = ?
+        WHERE id = ?
+        """,
+        retries,
+    )
+    cur.executemany(
+        """
+        UPDATE message_queue
+        SET sent = -1,
+            attempts = attempts + 1,
+            last_error = ?
+        WHERE id = ?
+        """,
+        failed,
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def prune_step(days: int = QUEUE_RETENTION_DAYS, batch_size: int = PRUNE_BATCH) -> int:
+    """
+    Deletes up to batch_size finished rows (sent, or failed for good)
+    older than `days`, in one short transaction. Returns how many were
+    deleted; 0 means nothing is left to prune. Sync — call through
+    run_db, once per batch.
+    """
+    cutoff = _stamp(_now() - timedelta(days=days))
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        DELETE FROM message_queue
+        WHERE id IN (
+            SELECT id
+            FROM message_queue
+            WHERE sent != 0
+              AND COALESCE(sent_at, next_attempt_at, timestamp) < ?
+            LIMIT ?
+        )
+        """,
+        (cutoff, batch_size),
+    )
+    deleted = cur.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** attempts, BACKOFF_MAX_SECONDS))
+
+
+# ─────────────────────────────────────────────
+# DISPATCHER
+# ─────────────────────────────────────────────
+
+class DMDispatcher:
+    """
+    Durable outbound DMs.
+
+    Messages are written to message_queue first and drained by one
+    background task with at most DM_SENDERS sends in flight, paced
+    to DM_RATE_PER_SECOND. Transient failures back off and retry;
+    closed DMs / unknown users fail permanently. Anything still
+    pending when the bot stops is picked up on the next start.
+
+    Delivery is at-least-once: a crash between a send and its
+    bookkeeping can repeat that one message.
+    """
+
+    def __init__(self, bot: discord.Client, senders: int = DM_SENDERS):
+        self.bot = bot
+        self.resolver = DMResolver(bot)
+        self._senders = asyncio.Semaphore(senders)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._interval = 1 / DM_RATE_PER_SECOND
+        self._next_slot = 0.0
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="tinyregg-dm-dispatcher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """
+        Call after queue_dm() commits so the drain starts immediately.
+        """
+        self._wakeup.set()
+
+    # ---------------------------------------------------------
+    # Enqueue
+    # ---------------------------------------------------------
+    async def send(self, user_id, content=None, **kwargs) -> bool:
+        queued = await run_db(_enqueue, [dm_row(user_id, content, **kwargs)])
+        self.wake()
+        return queued > 0
+
+    async def send_many(self, rows) -> int:
+        """
+        rows: dm_row(...) tuples. One transaction for the whole fan-out.
+        """
+        queued = await run_db(_enqueue, list(rows))
+        self.wake()
+        return queued
+
+    # ---------------------------------------------------------
+    # Drain
+    # ---------------------------------------------------------
+    async def _run(self):
+        await self.bot.wait_until_ready()
+
+        while True:
+            try:
+                drained = await self._drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("DM dispatcher drain failed")
+                drained = 0
+
+            if drained:
+                continue
+
+            await self._sleep_until_due()
+
+    async def _sleep_until_due(self):
+        self._wakeup.clear()
+        timeout = IDLE_POLL_SECONDS
+
+        due = await run_db(_next_due)
+        if due:
+            wait = (_parse_stamp(due) - _now()).total_seconds()
+            timeout = max(1.0, min(timeout, wait))
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _drain_once(self) -> int:
+        rows = await run_db(_claim_due, BATCH_SIZE)
+        if not rows:
+            return 0
+
+        await self.resolver.prime(row["user_id"] for row in rows)
+        results = await asyncio.gather(*(self._deliver(row) for row in rows))
+
+        sent, retries, failed = [], [], []
+        now = _now()
+
+        for row, error in zip(rows, results):
+            if error is None:
+                sent.append(row["id"])
+            elif error.permanent or row["attempts"] + 1 >= MAX_ATTEMPTS:
+                failed.append((error.reason, row["id"]))
+            else:
+                retries.append((_stamp(now + _backoff(row["attempts"])), error.reason, row["id"]))
+
+        await run_db(_record_results, sent, retries, failed)
+
+        if failed:
+            log.warning("Gave up on %s queued DM(s)", len(failed))
+
+        return len(rows)
+
+    async def _pace(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _deliver(self, row):
+        """
+        Returns None on success, or a _DeliveryError.
+        """
+        async with self._senders:
+            await self._pace()
+
+            embed = discord.Embed.from_dict(json.loads(row["embed"])) if row["embed"] else None
+
+            try:
+                channel = await self.resolver.resolve(row["user_id"])
+                await channel.send(content=row["content"], embed=embed)
+            except discord.NotFound as e:
+                if e.code == UNKNOWN_CHANNEL:
+                    # Stale stored channel: re-resolve on the retry
+                    await self.resolver.forget(row["user_id"])
+                    return _DeliveryError(f"NotFound: {e}", permanent=False)
+                return _DeliveryError(f"NotFound: {e}", permanent=True)
+            except discord.Forbidden as e:
+                return _DeliveryError(f"{type(e).__name__}: {e}", permanent=True)
+            except discord.HTTPException as e:
+                return _DeliveryError(f"HTTP {e.status}: {e}", permanent=400 <= e.status < 500 and e.status != 429)
+            except Exception as e:
+                log.exception("Unexpected DM failure for user %s", row["user_id"])
+                return _DeliveryError(f"{type(e).__name__}: {e}", permanent=False)
+
+            return None
+
+
+class _DeliveryError:
+    __slots__ = ("reason", "permanent")
+
+    def __init__(self, reason: str, permanent: bool):
+        self.reason = reason[:500]
+        self.permanent = permanent
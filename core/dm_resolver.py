@@ -0,0 +1,151 @@
+import logging
+import os
+from collections import OrderedDict
+
+import discord
+
+from core.db import get_connection
+from core.async_db import run_db
+
+log = logging.getLogger("tinyregg.dm_resolver")
+
+DM_CHANNEL_CACHE_SIZE = int(os.getenv("TINYREGG_DM_CHANNEL_CACHE", "4096"))
+
+
+# ─────────────────────────────────────────────
+# PERSISTENCE (dm_channels)
+# ─────────────────────────────────────────────
+
+def _load_channels(user_ids) -> dict[str, int]:
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+
+    placeholders = ",".join("?" * len(user_ids))
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT user_id, channel_id
+        FROM dm_channels
+        WHERE user_id IN ({placeholders})
+        """,
+        user_ids,
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return {r["user_id"]: int(r["channel_id"]) for r in rows}
+
+
+def _save_channel(user_id: str, channel_id: int):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO dm_channels (user_id, channel_id)
+        VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            channel_id = excluded.channel_id,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (user_id, str(channel_id)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _delete_channel(user_id: str):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM dm_channels WHERE user_id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+
+
+# ─────────────────────────────────────────────
+# RESOLVER
+# ─────────────────────────────────────────────
+
+class DMResolver:
+    """
+    user_id -> something we can .send() to, without a REST call
+    whenever possible.
+
+    Lookup order:
+    1. bounded LRU of DM channel ids
+    2. bot.get_user(...).dm_channel (gateway cache)
+    3. dm_channels table (survives restarts)
+    4. REST: fetch_user + create_dm, then remembered in 1 and 3
+
+    Hits 1 and 3 return a PartialMessageable, so sending costs a
+    single request.
+    """
+
+    def __init__(self, bot: discord.Client, size: int = DM_CHANNEL_CACHE_SIZE):
+        self.bot = bot
+        self._size = size
+        self._channels: "OrderedDict[str, int]" = OrderedDict()
+
+    def _remember(self, user_id: str, channel_id: int):
+        self._channels[user_id] = channel_id
+        self._channels.move_to_end(user_id)
+        if len(self._channels) > self._size:
+            self._channels.popitem(last=False)
+
+    def _partial(self, channel_id: int):
+        return self.bot.get_partial_messageable(
+            channel_id,
+            type=discord.ChannelType.private,
+        )
+
+    async def prime(self, user_ids):
+        """
+        Loads persisted channel ids for a whole batch in one query,
+        so a fan-out doesn't hit the DB once per recipient.
+        """
+        missing = {str(u) for u in user_ids} - self._channels.keys()
+        if not missing:
+            return
+
+        for user_id, channel_id in (await run_db(_load_channels, missing)).items():
+            self._remember(user_id, channel_id)
+
+    async def resolve(self, user_id) -> discord.abc.Messageable:
+        user_id = str(user_id)
+
+        channel_id = self._channels.get(user_id)
+        if channel_id is not None:
+            self._channels.move_to_end(user_id)
+            return self._partial(channel_id)
+
+        user = self.bot.get_user(int(user_id))
+        if user is not None and user.dm_channel is not None:
+            await self._store(user_id, user.dm_channel.id)
+            return user.dm_channel
+
+        stored = (await run_db(_load_channels, [user_id])).get(user_id)
+        if stored is not None:
+            self._remember(user_id, stored)
+            return self._partial(stored)
+
+        # Miss everywhere: the only path that costs extra requests
+        if user is None:
+            user = await self.bot.fetch_user(int(user_id))
+        channel = user.dm_channel or await user.create_dm()
+        await self._store(user_id, channel.id)
+        return channel
+
+    async def forget(self, user_id):
+        """
+        Drops a channel id that Discord no longer accepts.
+        """
+        user_id = str(user_id)
+        self._channels.pop(user_id, None)
+        await run_db(_delete_channel, user_id)
+
+    async def _store(self, user_id: str, channel_id: int):
+        if self._channels.get(user_id) == channel_id:
+            return
+        self._remember(user_id, channel_id)
+        await run_db(_save_channel, user_id, channel_id)
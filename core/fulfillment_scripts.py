@@ -1,5 +1,7 @@
 import random
 
+from core.templates import precompile
+
 # ------------------------------------------------------------
 # SIGNATURE SYSTEM (dynamic)
 # ------------------------------------------------------------
@@ -97,6 +99,20 @@ DOM_BODIES = [
 ]
 
 
+# Validated at import; names are injected later by theming
+precompile([
+    *(s for variants in SIGNATURE_VARIANTS.values() for s in variants),
+    *COZY_OPENERS,
+    *COZY_BODIES,
+    *ROMANTIC_OPENERS,
+    *ROMANTIC_BODIES,
+    *PLAYFUL_OPENERS,
+    *PLAYFUL_BODIES,
+    *DOM_OPENERS,
+    *DOM_BODIES,
+])
+
+
 # ------------------------------------------------------------
 # MAIN SCRIPT GENERATOR
 # ------------------------------------------------------------
@@ -0,0 +1,128 @@
+import logging
+
+from core.db import get_connection
+
+log = logging.getLogger("tinyregg.jobs")
+
+
+# ─────────────────────────────────────────────
+# JOB LEDGER (job_runs)
+# ─────────────────────────────────────────────
+# One row per (job_name, scheduled_for). A run is claimed by
+# inserting its row, advanced by moving its cursor in the same
+# transaction as the work for that page, and closed by setting
+# finished_at — so a restart resumes exactly where it stopped.
+
+def claim_run(job_name: str, scheduled_for: str):
+    """
+    Returns the ledger row for this run, creating it if needed.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO job_runs (job_name, scheduled_for)
+        VALUES (?, ?)
+        """,
+        (job_name, scheduled_for),
+    )
+    cur.execute(
+        """
+        SELECT *
+        FROM job_runs
+        WHERE job_name = ? AND scheduled_for = ?
+        """,
+        (job_name, scheduled_for),
+    )
+    row = cur.fetchone()
+
+    conn.commit()
+    conn.close()
+    return row
+
+
+def is_finished(job_name: str, scheduled_for: str) -> bool:
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT finished_at
+        FROM job_runs
+        WHERE job_name = ? AND scheduled_for = ?
+        """,
+        (job_name, scheduled_for),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return bool(row and row["finished_at"])
+
+
+def start_run(job_name: str, scheduled_for: str, total: int):
+    conn = get_connection()
+    conn.execute(
+        """
+        UPDATE job_runs
+        SET started_at = COALESCE(started_at, CURRENT_TIMESTAMP),
+            total = ?
+        WHERE job_name = ? AND scheduled_for = ?
+        """,
+        (total, job_name, scheduled_for),
+    )
+    conn.commit()
+    conn.close()
+
+
+def advance_run(cur, job_name: str, scheduled_for: str, cursor: str, processed: int):
+    """
+    Moves the cursor inside the caller's transaction (never commits),
+    so a page's work and its progress land together.
+    """
+    cur.execute(
+        """
+        UPDATE job_runs
+        SET cursor = ?,
+            processed = processed + ?
+        WHERE job_name = ? AND scheduled_for = ?
+        """,
+        (cursor, processed, job_name, scheduled_for),
+    )
+
+
+def finish_run(job_name: str, scheduled_for: str):
+    conn = get_connection()
+    conn.execute(
+        """
+        UPDATE job_runs
+        SET finished_at = CURRENT_TIMESTAMP
+        WHERE job_name = ? AND scheduled_for = ?
+        """,
+        (job_name, scheduled_for),
+    )
+    conn.commit()
+    conn.close()
+
+
+def recent_runs(job_name: str = None, limit: int = 7):
+    """
+    Newest runs first, for progress reporting (admin !jobs).
+    job_name matches exactly or as a prefix before ":" ("morning_prompt"
+    covers every "morning_prompt:<timezone>"); None lists every job.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT *
+        FROM job_runs
+        WHERE :job IS NULL
+           OR job_name = :job
+           OR substr(job_name, 1, length(:job) + 1) = :job || ':'
+        ORDER BY scheduled_for DESC, job_name
+        LIMIT :limit
+        """,
+        {"job": job_name, "limit": limit},
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,516 @@
+import logging
+
+log = logging.getLogger("tinyregg.migrations")
+
+
+# ─────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────
+
+def _columns(cur, table: str) -> set[str]:
+    return {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(cur, table: str, column: str, ddl: str):
+    """
+    ALTER TABLE ... ADD COLUMN is O(1) in SQLite (no table rebuild),
+    so this is safe to run against a live database.
+    """
+    if column not in _columns(cur, table):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _has_unique_key(cur, table: str, columns: tuple[str, ...]) -> bool:
+    for index in cur.execute(f"PRAGMA index_list({table})").fetchall():
+        if not index["unique"]:
+            continue
+        cols = tuple(
+            row["name"]
+            for row in cur.execute(f"PRAGMA index_info({index['name']})")
+        )
+        if cols == columns:
+            return True
+    return False
+
+
+# ─────────────────────────────────────────────
+# MIGRATION STEPS
+# ─────────────────────────────────────────────
+# Each step receives a cursor inside an open transaction and must
+# not commit. Steps are applied once, in order, and never edited
+# after release — add a new step instead. Steps use plain SQL only:
+# a rebuild that needs live code (which moves on with the schema) is
+# registered in REPAIRS instead of being called from the step.
+
+def _m001_task_history_category(cur):
+    _add_column(cur, "task_history", "category", "TEXT")
+
+    cur.execute(
+        """
+        UPDATE task_history
+        SET category = (
+            SELECT a.category
+            FROM assigned_tasks a
+            WHERE a.profile_id = task_history.profile_id
+              AND a.date = task_history.date
+              AND a.task_key = task_history.task_key
+        )
+        WHERE category IS NULL
+        """
+    )
+
+
+def _m002_task_history_unique_key(cur):
+    # Older databases were created before task_history had its
+    # (profile_id, date, task_key) primary key. Without it,
+    # INSERT OR REPLACE silently piles up duplicate rows.
+    key = ("profile_id", "date", "task_key")
+    if _has_unique_key(cur, "task_history", key):
+        return
+
+    cur.execute(
+        """
+        DELETE FROM task_history
+        WHERE rowid NOT IN (
+            SELECT MAX(rowid)
+            FROM task_history
+            GROUP BY profile_id, date, task_key
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE UNIQUE INDEX idx_task_history_key
+        ON task_history (profile_id, date, task_key)
+        """
+    )
+
+
+def _m003_message_queue_delivery(cur):
+    # message_queue becomes the durable outbox for core/dm_dispatcher.
+    _add_column(cur, "message_queue", "user_id", "TEXT")
+    _add_column(cur, "message_queue", "dedupe_key", "TEXT")
+    _add_column(cur, "message_queue", "attempts", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(cur, "message_queue", "next_attempt_at", "TEXT")
+    _add_column(cur, "message_queue", "last_error", "TEXT")
+    _add_column(cur, "message_queue", "sent_at", "TEXT")
+
+    # Drain order: only pending rows, soonest first
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_message_queue_due
+        ON message_queue (next_attempt_at, id)
+        WHERE sent = 0
+        """
+    )
+    # Enqueueing the same logical message twice is a no-op
+    cur.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_message_queue_dedupe
+        ON message_queue (dedupe_key)
+        WHERE dedupe_key IS NOT NULL
+        """
+    )
+
+
+def _m004_dm_channels(cur):
+    # user_id -> DM channel id, so sends after a restart don't need
+    # fetch_user + create_dm first (core/dm_resolver)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dm_channels (
+            user_id TEXT PRIMARY KEY,
+            channel_id TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def _m005_reminder_schedule(cur):
+    # Explicit due time for one-shot deadlines (previously they had
+    # only hour/minute and re-fired every day) and a firing mark so
+    # missed occurrences can be caught up after downtime.
+    _add_column(cur, "reminders", "due_at", "TEXT")
+    _add_column(cur, "reminders", "last_fired_at", "TEXT")
+
+    # set_deadline ended the text with "... — due YYYY-MM-DD"; other
+    # one-shots fall back to the (UTC) day the migration runs
+    cur.execute(
+        """
+        UPDATE reminders
+        SET due_at =
+            CASE
+                WHEN text GLOB '*due [0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+                THEN substr(text, -10)
+                ELSE date('now')
+            END
+            || 'T' || printf('%02d:%02d', COALESCE(hour, 0), COALESCE(minute, 0))
+        WHERE is_recurring = 0 AND due_at IS NULL
+        """
+    )
+
+
+def _m006_job_runs(cur):
+    # Ledger for scheduled jobs (core/jobs): one row per run
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            job_name TEXT NOT NULL,
+            scheduled_for TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            cursor TEXT,
+            processed INTEGER NOT NULL DEFAULT 0,
+            total INTEGER,
+
+            PRIMARY KEY (job_name, scheduled_for)
+        )
+        """
+    )
+
+
+def _m007_user_timezone(cur):
+    # IANA name; NULL means core.clock.DEFAULT_TIMEZONE
+    _add_column(cur, "users", "timezone", "TEXT")
+
+
+def _m008_streak_rebuild(cur):
+    # regression_streak had no day column, so it could never advance
+    _add_column(cur, "profile_streaks", "last_regression_day", "TEXT")
+
+    # Earlier code counted every required task (not days) and never
+    # reset on gaps; all streaks are recomputed by its repair (REPAIRS)
+
+
+def _m009_daily_stats(cur):
+    # Rollups behind /stats (core/stats); one row per profile-day-category
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            profile_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            category TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            tokens INTEGER NOT NULL DEFAULT 0,
+
+            PRIMARY KEY (profile_id, date, category),
+            FOREIGN KEY (profile_id)
+                REFERENCES profiles(profile_id)
+                ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+
+    # daily_stats is filled and weekly re-keyed by ISO year + week
+    # in its repair (REPAIRS)
+
+
+def _m010_task_archive(cur):
+    # Archive tier for core/retention: one row per profile-day, the
+    # day's tasks as a JSON array of
+    # [task_key, category, is_required, completed, points_awarded]
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_archive (
+            profile_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            assigned INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            tokens INTEGER NOT NULL DEFAULT 0,
+            tasks TEXT NOT NULL DEFAULT '[]',
+
+            PRIMARY KEY (profile_id, date),
+            FOREIGN KEY (profile_id)
+                REFERENCES profiles(profile_id)
+                ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+
+
+# Fixed codes; must match core.task_catalog.CATEGORY_CODES
+_M011_CATEGORIES = (
+    (1, "required"),
+    (2, "basic"),
+    (3, "fun"),
+    (4, "small_clean"),
+    (5, "medium_clean"),
+    (6, "heavy_clean"),
+    (7, "regressive"),
+    (8, "intimacy"),
+    (9, "kink"),
+    (10, "explicit"),
+)
+
+
+def _m011_task_ids(cur):
+    # Hot tables store small integers instead of repeating task_key /
+    # category text in every row (and in their primary keys)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_categories (
+            category_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """
+    )
+    cur.executemany(
+        "INSERT OR IGNORE INTO task_categories (category_id, name) VALUES (?, ?)",
+        _M011_CATEGORIES,
+    )
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO task_categories (name)
+        SELECT category FROM assigned_tasks WHERE category IS NOT NULL
+        UNION
+        SELECT category FROM task_history WHERE category IS NOT NULL
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS task_catalog (
+            task_id INTEGER PRIMARY KEY,
+            task_key TEXT NOT NULL UNIQUE,
+            category_id INTEGER REFERENCES task_categories(category_id)
+        )
+        """
+    )
+    # Every key ever stored gets an id, including retired ones
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO task_catalog (task_key, category_id)
+        SELECT k.task_key, c.category_id
+        FROM (
+            SELECT task_key, category FROM assigned_tasks
+            UNION ALL
+            SELECT task_key, category FROM task_history
+        ) AS k
+        LEFT JOIN task_categories c ON c.name = k.category
+        ORDER BY k.category IS NULL
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE assigned_tasks_new (
+            profile_id INTEGER,
+            date TEXT,
+            task_id INTEGER NOT NULL,
+            category_id INTEGER,
+            is_required INTEGER DEFAULT 0,
+            hidden_until_complete INTEGER DEFAULT 1,
+
+            PRIMARY KEY (profile_id, date, task_id),
+            FOREIGN KEY (profile_id)
+                REFERENCES profiles(profile_id)
+                ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO assigned_tasks_new
+        SELECT a.profile_id, a.date, t.task_id, c.category_id,
+               a.is_required, a.hidden_until_complete
+        FROM assigned_tasks a
+        JOIN task_catalog t ON t.task_key = a.task_key
+        LEFT JOIN task_categories c ON c.name = a.category
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE task_history_new (
+            profile_id INTEGER,
+            date TEXT,
+            task_id INTEGER NOT NULL,
+            category_id INTEGER,
+            completed INTEGER DEFAULT 0,
+            points_awarded INTEGER DEFAULT 0,
+
+            PRIMARY KEY (profile_id, date, task_id),
+            FOREIGN KEY (profile_id)
+                REFERENCES profiles(profile_id)
+                ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO task_history_new
+        SELECT h.profile_id, h.date, t.task_id, c.category_id,
+               h.completed, h.points_awarded
+        FROM task_history h
+        JOIN task_catalog t ON t.task_key = h.task_key
+        LEFT JOIN task_categories c ON c.name = h.category
+        """
+    )
+
+    # Old indexes go with the old tables; db.INDEXES recreates them
+    for table in ("assigned_tasks", "task_history"):
+        cur.execute(f"DROP TABLE {table}")
+        cur.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _m012_token_ledger(cur):
+    # Append-only history of users.tokens (see core/token_ledger).
+    # Existing balances become one "opening" row each, so every
+    # balance equals the sum of its rows from here on.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS token_ledger (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            delta INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            ref TEXT,
+            balance INTEGER NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO token_ledger (user_id, delta, reason, balance)
+        SELECT user_id, tokens, 'opening', tokens
+        FROM users
+        WHERE COALESCE(tokens, 0) != 0
+        """
+    )
+
+
+MIGRATIONS = [
+    (1, "task_history.category", _m001_task_history_category),
+    (2, "task_history unique (profile_id, date, task_key)", _m002_task_history_unique_key),
+    (3, "message_queue delivery columns", _m003_message_queue_delivery),
+    (4, "dm_channels", _m004_dm_channels),
+    (5, "reminders.due_at / last_fired_at", _m005_reminder_schedule),
+    (6, "job_runs", _m006_job_runs),
+    (7, "users.timezone", _m007_user_timezone),
+    (8, "profile_streaks.last_regression_day (streaks rebuilt by repair)", _m008_streak_rebuild),
+    (9, "daily_stats (rollups backfilled by repair)", _m009_daily_stats),
+    (10, "task_archive", _m010_task_archive),
+    (11, "task_catalog / task_categories + integer hot tables", _m011_task_ids),
+    (12, "token_ledger", _m012_token_ledger),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ─────────────────────────────────────────────
+# REPAIRS
+# ─────────────────────────────────────────────
+# Data rebuilds that call live code. They run once, after every
+# pending step has been applied, so they always see the latest schema
+# (a step can't call code written against a schema it predates).
+# Each is idempotent and has an admin command to re-run it.
+
+def _repair_streaks(cur):
+    from core.streaks import rebuild_streaks_with
+
+    rebuild_streaks_with(cur)
+
+
+def _repair_rollups(cur):
+    from core.stats import backfill_rollups_with
+
+    backfill_rollups_with(cur)
+
+
+REPAIRS = {
+    8: _repair_streaks,
+    9: _repair_rollups,
+}
+
+assert [v for v, _, _ in MIGRATIONS] == list(range(1, LATEST_VERSION + 1)), (
+    "Migration versions must be consecutive"
+)
+
+
+# ─────────────────────────────────────────────
+# RUNNER
+# ─────────────────────────────────────────────
+
+def current_version(cur) -> int:
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cur.fetchone()[0]
+
+
+def run_migrations(conn) -> int:
+    """
+    Brings the schema up to LATEST_VERSION.
+
+    Each step runs in its own IMMEDIATE transaction together with its
+    schema_version row, so a failed step leaves the database at the
+    previous version. Returns the resulting version.
+    """
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    version = current_version(cur)
+
+    # Fast path: nothing to do on a normal startup
+    if version >= LATEST_VERSION:
+        return version
+
+    conn.commit()
+    applied = []
+
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            step(cur)
+            cur.execute(
+                """
+                INSERT INTO schema_version (version, description)
+                VALUES (?, ?)
+                """,
+                (step_version, description),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            log.exception(
+                "Migration %s (%s) failed — schema left at version %s",
+                step_version,
+                description,
+                version,
+            )
+            raise
+
+        version = step_version
+        applied.append(step_version)
+        log.info("Applied migration %s: %s", step_version, description)
+
+    for step_version in applied:
+        repair = REPAIRS.get(step_version)
+        if repair is None:
+            continue
+
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            repair(cur)
+            conn.commit()
+        except Exception:
+            # Schema is fine; the data can be rebuilt from the admin commands
+            conn.rollback()
+            log.exception("Repair for migration %s failed", step_version)
+            continue
+
+        log.info("Ran repair for migration %s", step_version)
+
+    return version
@@ -1,4 +1,8 @@
+import threading
+from collections import OrderedDict
+
 from core.db import get_connection
+from core.theming import ProfileContext
 
 
 # ─────────────────────────────────────────────
@@ -29,6 +33,53 @@ def get_active_profile(user_id: str):
     return row
 
 
+# ─────────────────────────────────────────────
+# PROFILE CONTEXT CACHE
+# ─────────────────────────────────────────────
+
+PROFILE_CONTEXT_CACHE_SIZE = 1024
+
+_context_cache: "OrderedDict[str, ProfileContext]" = OrderedDict()
+_context_generation: dict[str, int] = {}
+_context_lock = threading.Lock()
+
+
+def get_profile_context(user_id: str) -> ProfileContext | None:
+    """
+    Cached ProfileContext for the user's active profile.
+
+    Invalidated by switch_active_profile (and therefore
+    set_cloudy_mode). Returns None if nobody is active.
+    """
+    with _context_lock:
+        context = _context_cache.get(user_id)
+        if context is not None:
+            _context_cache.move_to_end(user_id)
+            return context
+        generation = _context_generation.get(user_id, 0)
+
+    profile = get_active_profile(user_id)
+    if not profile:
+        return None
+
+    context = ProfileContext(profile)
+
+    with _context_lock:
+        # A switch that landed while we were reading wins.
+        if _context_generation.get(user_id, 0) == generation:
+            _context_cache[user_id] = context
+            if len(_context_cache) > PROFILE_CONTEXT_CACHE_SIZE:
+                _context_cache.popitem(last=False)
+
+    return context
+
+
+def invalidate_profile_context(user_id: str):
+    with _context_lock:
+        _context_cache.pop(user_id, None)
+        _context_generation[user_id] = _context_generation.get(user_id, 0) + 1
+
+
 def get_all_profiles(user_id: str):
     """
     Returns all profiles for a user, ordered by creation.
@@ -114,6 +165,8 @@ def switch_active_profile(user_id: str, profile_id: int):
     finally:
         conn.close()
 
+    invalidate_profile_context(user_id)
+
 
 # ─────────────────────────────────────────────
 # 🔁 BACKWARD-COMPATIBILITY ALIASES
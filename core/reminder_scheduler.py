@@ -0,0 +1,277 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+
+from core import clock
+from core.db import get_connection
+from core.async_db import run_db
+from core.dm_dispatcher import queue_dm
+
+log = logging.getLogger("tinyregg.reminder_scheduler")
+
+# Re-check the clock at least this often (host sleep / clock jumps)
+MAX_SLEEP_SECONDS = 15 * 60
+
+
+def reminder_message(text: str) -> str:
+    return f"⏱ **Reminder**\n\n{text}"
+
+
+# ─────────────────────────────────────────────
+# DUE-TIME RULES
+# ─────────────────────────────────────────────
+
+def _local(value: str, tz) -> datetime:
+    # Stored times are naive wall-clock in the owner's timezone
+    return datetime.fromisoformat(value).replace(tzinfo=tz)
+
+
+def next_due(reminder, now: datetime) -> datetime | None:
+    """
+    When a reminder should fire next, as an aware datetime in the
+    owner's timezone. `now` may be in any zone.
+
+    - one-shot: its due_at, unless it already fired
+    - recurring: the next hour:minute; if an occurrence was missed
+      since last_fired_at (downtime), the latest missed one is due
+      now — one catch-up firing, however many days were missed
+    """
+    tz = clock.zone(reminder["timezone"])
+
+    if not reminder["is_recurring"]:
+        if reminder["last_fired_at"] or not reminder["due_at"]:
+            return None
+        return _local(reminder["due_at"], tz)
+
+    now = now.astimezone(tz)
+    at = now.replace(hour=reminder["hour"], minute=reminder["minute"], second=0, microsecond=0)
+    upcoming = at if at > now else at + timedelta(days=1)
+
+    if reminder["last_fired_at"]:
+        latest = upcoming - timedelta(days=1)
+        if latest > _local(reminder["last_fired_at"], tz):
+            return latest
+
+    return upcoming
+
+
+# ─────────────────────────────────────────────
+# DB
+# ─────────────────────────────────────────────
+
+_REMINDER_COLUMNS = """
+    r.reminder_id,
+    r.hour,
+    r.minute,
+    r.text,
+    r.is_recurring,
+    r.due_at,
+    r.last_fired_at,
+    p.user_id,
+    p.profile_id,
+    u.timezone
+"""
+
+
+def _load_reminders(reminder_id=None, user_id=None):
+    conn = get_connection()
+    cur = conn.cursor()
+    sql = f"""
+        SELECT {_REMINDER_COLUMNS}
+        FROM reminders r
+        JOIN profiles p ON p.profile_id = r.profile_id
+        JOIN users u ON u.user_id = p.user_id
+    """
+    if reminder_id is not None:
+        cur.execute(sql + " WHERE r.reminder_id = ?", (reminder_id,))
+    elif user_id is not None:
+        cur.execute(sql + " WHERE p.user_id = ?", (user_id,))
+    else:
+        cur.execute(sql)
+    rows = [dict(r) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+def _fire(reminders: list, due_at: dict) -> int:
+    """
+    Queues the DMs and records the firings in one transaction:
+    one-shots are deleted, recurring ones get last_fired_at. The
+    dedupe key makes a repeated firing of the same slot a no-op.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+
+    queued = 0
+    for r in reminders:
+        slot = due_at[r["reminder_id"]]
+        queued += queue_dm(
+            cur,
+            r["user_id"],
+            reminder_message(r["text"]),
+            profile_id=r["profile_id"],
+            dedupe_key=f"reminder:{r['reminder_id']}:{slot}",
+        )
+
+        if r["is_recurring"]:
+            cur.execute(
+                "UPDATE reminders SET last_fired_at = ? WHERE reminder_id = ?",
+                (slot, r["reminder_id"]),
+            )
+        else:
+            cur.execute(
+                "DELETE FROM reminders WHERE reminder_id = ?",
+                (r["reminder_id"],),
+            )
+
+    conn.commit()
+    conn.close()
+    return queued
+
+
+# ─────────────────────────────────────────────
+# SCHEDULER
+# ─────────────────────────────────────────────
+
+class ReminderScheduler:
+    """
+    In-memory min-heap of (due, reminder_id), loaded from the
+    reminders table at start and kept current through add()/remove().
+
+    One task sleeps until the earliest due time (or until woken by a
+    change), fires everything due, and goes back to sleep — no polling
+    between firings. Removed or rescheduled entries are skipped lazily
+    when they reach the top of the heap.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._heap: list[tuple[datetime, int]] = []
+        self._reminders: dict[int, dict] = {}
+        self._due: dict[int, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="tinyregg-reminders")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------------------------------------------------------
+    # Changes
+    # ---------------------------------------------------------
+    def _schedule(self, reminder: dict, now: datetime):
+        due = next_due(reminder, now)
+        reminder_id = reminder["reminder_id"]
+
+        if due is None:
+            self._reminders.pop(reminder_id, None)
+            self._due.pop(reminder_id, None)
+            return
+
+        self._reminders[reminder_id] = reminder
+        self._due[reminder_id] = due
+        heapq.heappush(self._heap, (due, reminder_id))
+
+    async def add(self, reminder_id: int):
+        """
+        Call after inserting (or editing) a reminder row.
+        """
+        for reminder in await run_db(_load_reminders, reminder_id):
+            self._schedule(reminder, clock.now_utc())
+        self._wakeup.set()
+
+    async def reload_user(self, user_id: str):
+        """
+        Call after a user's timezone changes: their reminders are
+        rescheduled against the new wall clock.
+        """
+        for reminder in await run_db(_load_reminders, None, user_id):
+            self._schedule(reminder, clock.now_utc())
+        self._wakeup.set()
+
+    def remove(self, reminder_id: int):
+        """
+        Call after deleting a reminder row.
+        """
+        self._reminders.pop(reminder_id, None)
+        self._due.pop(reminder_id, None)
+        self._wakeup.set()
+
+    # ---------------------------------------------------------
+    # Loop
+    # ---------------------------------------------------------
+    async def _run(self):
+        await self.bot.wait_until_ready()
+
+        now = clock.now_utc()
+        for reminder in await run_db(_load_reminders):
+            self._schedule(reminder, now)
+        log.info("Reminder scheduler loaded %s reminders", len(self._reminders))
+
+        while True:
+            self._wakeup.clear()
+
+            try:
+                await self._fire_due(clock.now_utc())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Reminder firing failed")
+                await asyncio.sleep(30)
+
+            timeout = MAX_SLEEP_SECONDS
+            if self._heap:
+                wait = (self._heap[0][0] - clock.now_utc()).total_seconds()
+                timeout = max(0.0, min(timeout, wait))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire_due(self, now: datetime):
+        due_now = []
+
+        while self._heap and self._heap[0][0] <= now:
+            due, reminder_id = heapq.heappop(self._heap)
+            # Stale heap entry (removed or rescheduled)
+            if self._due.get(reminder_id) != due or reminder_id in due_now:
+                continue
+            due_now.append(reminder_id)
+
+        if not due_now:
+            return
+
+        reminders = [self._reminders[i] for i in due_now]
+        # Slots are recorded as the owner's wall-clock time
+        slots = {
+            i: self._due[i].replace(tzinfo=None).isoformat(timespec="minutes")
+            for i in due_now
+        }
+
+        try:
+            await run_db(_fire, reminders, slots)
+        except Exception:
+            # Nothing was recorded: keep them due for the next pass
+            for reminder_id in due_now:
+                heapq.heappush(self._heap, (self._due[reminder_id], reminder_id))
+            raise
+
+        self.bot.dm_dispatcher.wake()
+
+        for reminder in reminders:
+            reminder["last_fired_at"] = slots[reminder["reminder_id"]]
+            self._schedule(reminder, now)
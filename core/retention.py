@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+from datetime import timedelta
+
+from core import clock
+from core.db import get_connection
+
+log = logging.getLogger("tinyregg.retention")
+
+
+# ─────────────────────────────────────────────
+# RETENTION TIERS
+# ─────────────────────────────────────────────
+# hot     assigned_tasks + task_history: the last HOT_DAYS days, one
+#         row per task — what boards, completions, /history and the
+#         boss/streak windows read
+# archive task_archive: one row per (profile, day) with counts and the
+#         day's tasks as a JSON array — kept indefinitely for analytics
+#
+# Rows move between tiers in small IMMEDIATE transactions, so the
+# archiver never holds the write lock long enough to stall a click.
+
+HOT_DAYS = int(os.getenv("TINYREGG_HOT_HISTORY_DAYS", "14"))
+ARCHIVE_BATCH = int(os.getenv("TINYREGG_ARCHIVE_BATCH", "200"))
+
+# Positions inside each task_archive.tasks entry
+TASK_FIELDS = ("task_key", "category", "is_required", "completed", "points_awarded")
+
+
+def hot_cutoff() -> str:
+    """
+    Oldest date kept hot. A day behind UTC, so no timezone still
+    living in a day ever sees it archived.
+    """
+    return (clock.now_utc().date() - timedelta(days=HOT_DAYS + 1)).isoformat()
+
+
+# ─────────────────────────────────────────────
+# SQL
+# ─────────────────────────────────────────────
+
+# Every task of the batch's profile-days: assigned tasks with their
+# outcome, plus history rows whose assignment is already gone. The
+# archive keeps task keys and category names (not the hot tables'
+# integer ids), so it reads on its own.
+_ARCHIVE_SQL = """
+    WITH batch(profile_id) AS (
+        SELECT value FROM json_each(:profiles)
+    ),
+    ids AS (
+        SELECT
+            a.profile_id, a.date, a.task_id, a.category_id, a.is_required,
+            COALESCE(h.completed, 0) AS completed,
+            COALESCE(h.points_awarded, 0) AS points_awarded
+        FROM assigned_tasks a
+        LEFT JOIN task_history h
+            ON h.profile_id = a.profile_id
+           AND h.date = a.date
+           AND h.task_id = a.task_id
+        WHERE a.date = :date
+          AND a.profile_id IN batch
+
+        UNION ALL
+
+        SELECT
+            h.profile_id, h.date, h.task_id, h.category_id, 0,
+            h.completed, h.points_awarded
+        FROM task_history h
+        WHERE h.date = :date
+          AND h.profile_id IN batch
+          AND NOT EXISTS (
+              SELECT 1
+              FROM assigned_tasks a
+              WHERE a.profile_id = h.profile_id
+                AND a.date = h.date
+                AND a.task_id = h.task_id
+          )
+    ),
+    rows AS (
+        SELECT
+            ids.profile_id, ids.date, t.task_key, c.name AS category,
+            ids.is_required, ids.completed, ids.points_awarded
+        FROM ids
+        LEFT JOIN task_catalog t ON t.task_id = ids.task_id
+        LEFT JOIN task_categories c ON c.category_id = ids.category_id
+    )
+    INSERT INTO task_archive (profile_id, date, assigned, completed, tokens, tasks)
+    SELECT
+        profile_id,
+        date,
+        COUNT(*),
+        SUM(completed),
+        SUM(points_awarded),
+        json_group_array(
+            json_array(task_key, category, is_required, completed, points_awarded)
+        )
+    FROM rows
+    GROUP BY profile_id, date
+    ON CONFLICT (profile_id, date) DO UPDATE SET
+        assigned = assigned + excluded.assigned,
+        completed = completed + excluded.completed,
+        tokens = tokens + excluded.tokens,
+        tasks = (
+            SELECT json_group_array(json(value))
+            FROM (
+                SELECT value FROM json_each(task_archive.tasks)
+                UNION ALL
+                SELECT value FROM json_each(excluded.tasks)
+            )
+        )
+"""
+
+
+def _oldest_hot_date(cur, before: str | None):
+    dates = []
+    for table in ("assigned_tasks", "task_history"):
+        if before is None:
+            cur.execute(f"SELECT MIN(date) FROM {table}")
+        else:
+            cur.execute(f"SELECT MIN(date) FROM {table} WHERE date < ?", (before,))
+        value = cur.fetchone()[0]
+        if value is not None:
+            dates.append(value)
+    return min(dates) if dates else None
+
+
+def _archive_batch(before: str | None, batch_size: int) -> int:
+    """
+    Moves up to batch_size profile-days (all of the oldest hot date)
+    into task_archive in one short transaction. Returns how many
+    profile-days moved; 0 means nothing older than `before` is left.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        day = _oldest_hot_date(cur, before)
+        if day is None:
+            conn.commit()
+            return 0
+
+        cur.execute(
+            """
+            SELECT profile_id FROM assigned_tasks WHERE date = ?
+            UNION
+            SELECT profile_id FROM task_history WHERE date = ?
+            LIMIT ?
+            """,
+            (day, day, batch_size),
+        )
+        profiles = [row["profile_id"] for row in cur.fetchall()]
+        params = {"date": day, "profiles": json.dumps(profiles)}
+
+        cur.execute(_ARCHIVE_SQL, params)
+        for table in ("assigned_tasks", "task_history"):
+            cur.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE date = :date
+                  AND profile_id IN (SELECT value FROM json_each(:profiles))
+                """,
+                params,
+            )
+
+        conn.commit()
+        return len(profiles)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# ─────────────────────────────────────────────
+# PUBLIC ENTRY POINTS
+# ─────────────────────────────────────────────
+
+def archive_step(before: str = None, batch_size: int = ARCHIVE_BATCH) -> int:
+    """
+    One batch of the background archiver: rows dated before `before`
+    (default hot_cutoff()). Returns profile-days moved, 0 when done.
+    Sync — call through run_db, once per batch, so other DB work
+    interleaves between batches.
+    """
+    return _archive_batch(before or hot_cutoff(), batch_size)
+
+
+def archive_history(before: str = None, batch_size: int = ARCHIVE_BATCH) -> int:
+    """
+    Runs archive_step until nothing older than `before` is left.
+    Returns profile-days archived.
+    """
+    before = before or hot_cutoff()
+    moved = 0
+    while True:
+        count = _archive_batch(before, batch_size)
+        if not count:
+            break
+        moved += count
+
+    if moved:
+        log.info("Archived %s profile-days older than %s", moved, before)
+    return moved
+
+
+def archive_all(batch_size: int = ARCHIVE_BATCH) -> int:
+    """
+    Archives every hot row, today's included (admin day reset).
+    Nothing is lost: a day archived twice is merged into one row.
+    """
+    moved = 0
+    while True:
+        count = _archive_batch(None, batch_size)
+        if not count:
+            break
+        moved += count
+    return moved
@@ -1,8 +1,10 @@
 import logging
 import discord
-from datetime import datetime
 
+from core import clock
 from core.db import get_connection
+from core.async_db import run_db, fetch_all
+from core.dm_dispatcher import queue_dm
 from shop.rewards import REWARDS
 from core.theming import format_reward_delivery
 
@@ -19,10 +21,7 @@ async def deliver_pending_rewards(bot: discord.Client):
     Safe to call repeatedly.
     """
 
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
+    rows = await fetch_all(
         """
         SELECT
             rh.id,
@@ -37,9 +36,6 @@ async def deliver_pending_rewards(bot: discord.Client):
         """
     )
 
-    rows = cur.fetchall()
-    conn.close()
-
     if not rows:
         return
 
@@ -67,7 +63,7 @@ async def _deliver_one(bot: discord.Client, row: dict):
             "Unknown reward item_id=%s — marking delivered",
             row["item_id"],
         )
-        _mark_delivered(row["id"])
+        await run_db(_mark_delivered, row["id"])
         return
 
     user_id = int(row["user_id"])
@@ -80,22 +76,13 @@ async def _deliver_one(bot: discord.Client, row: dict):
         profile_name=profile_name,
     )
 
-    # Prefer direct fetch (guild-agnostic, safer)
-    try:
-        user = await bot.fetch_user(user_id)
-    except Exception:
-        log.warning("Failed to fetch user %s", user_id)
-        return
+    # Queue the DM and mark delivered in one transaction: the
+    # dispatcher owns retries from here
+    await run_db(_queue_delivery, row["id"], user_id, message)
+    bot.dm_dispatcher.wake()
 
-    try:
-        await user.send(message)
-    except discord.Forbidden:
-        log.warning("DMs closed for user %s", user_id)
-        return
-
-    _mark_delivered(row["id"])
     log.info(
-        "Delivered reward id=%s to user=%s",
+        "Queued reward id=%s for user=%s",
         row["id"],
         user_id,
     )
@@ -105,6 +92,25 @@ async def _deliver_one(bot: discord.Client, row: dict):
 # DB UPDATE
 # ─────────────────────────────────────────────
 
+def _queue_delivery(redemption_id: int, user_id: int, message: str):
+    conn = get_connection()
+    cur = conn.cursor()
+
+    queue_dm(cur, user_id, message, dedupe_key=f"reward:{redemption_id}")
+    cur.execute(
+        """
+        UPDATE redemption_history
+        SET delivered = 1,
+            delivered_at = ?
+        WHERE id = ?
+        """,
+        (clock.now_utc().isoformat(), redemption_id),
+    )
+
+    conn.commit()
+    conn.close()
+
+
 def _mark_delivered(redemption_id: int):
     conn = get_connection()
     cur = conn.cursor()
@@ -116,7 +122,7 @@ def _mark_delivered(redemption_id: int):
             delivered_at = ?
         WHERE id = ?
         """,
-        (datetime.utcnow().isoformat(), redemption_id),
+        (clock.now_utc().isoformat(), redemption_id),
     )
 
     conn.commit()
@@ -1,9 +1,10 @@
 import logging
 import random
 import string
-from datetime import datetime
 
+from core import clock, token_ledger
 from core.db import get_connection
+from core.streaks import current_streaks_with
 from shop.rewards import REWARDS
 
 log = logging.getLogger("tinyregg.reward_engine")
@@ -115,22 +116,29 @@ def generate_reward(user_id: str, profile_id: int, item_key: str):
         conn.close()
         return None
 
+    # Streak gate (required-task streak, as of the profile's today)
+    if reward.get("min_streak"):
+        streak = current_streaks_with(cur, profile_id)["required"]
+        if streak < reward["min_streak"]:
+            conn.close()
+            return None
+
     # ─────────────────────────────────────────
     # Atomic spend + log
     # ─────────────────────────────────────────
     reward_code = _generate_code()
 
     try:
-        cur.execute("BEGIN")
+        cur.execute("BEGIN IMMEDIATE")
 
-        cur.execute(
-            """
-            UPDATE users
-            SET tokens = tokens - ?
-            WHERE user_id = ?
-            """,
-            (reward["cost"], user_id),
+        # Re-checks the balance under the write lock
+        balance = token_ledger.debit_with(
+            cur, user_id, reward["cost"], token_ledger.REDEEM, ref=reward_code
         )
+        if balance is None:
+            conn.rollback()
+            conn.close()
+            return None
 
         cur.execute(
             """
@@ -147,11 +155,12 @@ def generate_reward(user_id: str, profile_id: int, item_key: str):
                 profile_id,
                 item_key,
                 reward_code,
-                datetime.utcnow().isoformat(),
+                clock.now_utc().isoformat(),
             ),
         )
 
         conn.commit()
+        token_ledger.remember(user_id, balance)
 
     except Exception:
         conn.rollback()
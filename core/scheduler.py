@@ -1,124 +1,251 @@
+import asyncio
+import logging
 import discord
-import pytz
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from discord.ext import commands, tasks
 
+from core import clock
 from core.db import get_connection
+from core.async_db import run_db
+from core.dm_dispatcher import prune_step, queue_dm
+from core.jobs import claim_run, finish_run, is_finished, start_run, advance_run
+from core.retention import archive_step
+from core.task_reset import reset_all_daily_tasks
 from core.theming import build_embed, purple_doll_colors
 
-CENTRAL = pytz.timezone("America/Chicago")
+log = logging.getLogger("tinyregg.scheduler")
+
+MORNING_JOB = "morning_prompt"
+MORNING_TIME = time(6, 0)
+
+# A missed morning is still run after downtime, but not once the
+# day is mostly over
+CATCH_UP_WINDOW = timedelta(hours=12)
+
+PAGE_SIZE = 500
+
+
+def morning_embed() -> discord.Embed:
+    return build_embed(
+        title="🌅 Good Morning",
+        description=(
+            "Who’s fronting today?\n\n"
+            "You can choose a profile, create a new one, or stay in **Cloudy Mode**.\n"
+            "Cloudy Mode still counts toward streaks and rewards."
+        ),
+        color=purple_doll_colors["accent"],
+    )
+
+
+def latest_morning(now: datetime) -> datetime:
+    """
+    The most recent scheduled 6:00 AM at or before now.
+    """
+    scheduled = datetime.combine(now.date(), MORNING_TIME, tzinfo=now.tzinfo)
+    if scheduled > now:
+        scheduled -= timedelta(days=1)
+    return scheduled
 
 
 class MorningScheduler(commands.Cog):
     """
     Morning Orchestrator:
-    - Runs once per day at the set time
+    - Runs once per day per timezone bucket, at 6:00 local time, so
+      the fan-out is spread across the day instead of one spike
+    - Each run is tracked in the job_runs ledger
+    - Catches up after downtime, resumes a half-finished fan-out
+    - Batch-generates everyone's tasks (task_reset / task_engine own the logic)
     - Prompts each user to choose who is fronting
-    - Does NOT assign tasks
+    - Hourly, moves history past the hot window to the archive tier
     """
 
     def __init__(self, bot):
         self.bot = bot
+        self._done_for = {}  # timezone -> finished run key
         self.morning_loop.start()
+        self.retention_loop.start()
+
+    def cog_unload(self):
+        self.morning_loop.cancel()
+        self.retention_loop.cancel()
 
     # ---------------------------------------------------------
     # Morning Loop (checks every minute)
     # ---------------------------------------------------------
     @tasks.loop(minutes=1)
     async def morning_loop(self):
-        now = datetime.now(CENTRAL)
-
-        # Fire exactly at 6:00 AM
-        if not (now.hour == 6 and now.minute == 0):
-            return
+        for timezone, _ in await run_db(clock.timezone_buckets):
+            now = clock.local_now(timezone)
+            scheduled = latest_morning(now)
+            run_key = scheduled.isoformat()
 
-        today = now.date().isoformat()
+            if self._done_for.get(timezone) == run_key:
+                continue
 
-        if self._already_prompted_today(today):
-            return
+            if now - scheduled > CATCH_UP_WINDOW:
+                continue
 
-        self._mark_prompted(today)
+            job = f"{MORNING_JOB}:{timezone}"
 
-        conn = get_connection()
-        cur = conn.cursor()
+            if await run_db(is_finished, job, run_key):
+                self._done_for[timezone] = run_key
+                continue
 
-        # Fetch ALL users who have started
-        cur.execute(
-            """
-            SELECT user_id
-            FROM users
-            WHERE has_started = 1
-            """
-        )
-        users = cur.fetchall()
-        conn.close()
+            try:
+                await self._run_morning(job, timezone, scheduled, run_key)
+            except Exception:
+                # Ledger keeps the cursor; the next tick resumes from it
+                log.exception("Morning prompt %s %s failed", timezone, run_key)
+                continue
 
-        if not users:
-            return
+            self._done_for[timezone] = run_key
 
-        for row in users:
-            user_id = row["user_id"]
+    async def _run_morning(self, job: str, timezone: str, scheduled: datetime, run_key: str):
+        run = await run_db(claim_run, job, run_key)
 
+        # No cursor yet: the fan-out hasn't started, so (re)run the
+        # batch generation first. It is idempotent (INSERT OR IGNORE,
+        # seeded picks), so a crash mid-generation is safe to repeat.
+        if run["cursor"] is None:
             try:
-                user = await self.bot.fetch_user(int(user_id))
+                generated = await run_db(reset_all_daily_tasks, timezone)
+                log.info("Morning batch generated %s tasks for %s", generated, timezone)
             except Exception:
-                continue
+                log.exception("Morning batch task generation failed")
+
+        total = await run_db(self._count_started_users, timezone)
+        await run_db(start_run, job, run_key, total)
 
-            embed = build_embed(
-                title="🌅 Good Morning",
-                description=(
-                    "Who’s fronting today?\n\n"
-                    "You can choose a profile, create a new one, or stay in **Cloudy Mode**.\n"
-                    "Cloudy Mode still counts toward streaks and rewards."
-                ),
-                color=purple_doll_colors["accent"],
+        cursor = run["cursor"] or ""
+        processed = run["processed"]
+        day = scheduled.date().isoformat()
+        embed = morning_embed()
+
+        if cursor:
+            log.info("Resuming %s %s after user %s (%s/%s)", job, day, cursor, processed, total)
+
+        while True:
+            count, cursor = await run_db(
+                self._prompt_page,
+                job,
+                timezone,
+                run_key,
+                day,
+                cursor,
+                embed,
             )
+            if not count:
+                break
 
-            view = FrontingSelectionView(user_id=str(user_id))
+            processed += count
+            self.bot.dm_dispatcher.wake()
+            log.info("%s %s: queued %s/%s", job, day, processed, total)
 
-            try:
-                await user.send(embed=embed, view=view)
-            except discord.Forbidden:
-                continue
+        await run_db(finish_run, job, run_key)
+        log.info("%s %s finished (%s users)", job, day, processed)
 
     # ---------------------------------------------------------
-    # Daily State Tracking
+    # Fan-out pages
     # ---------------------------------------------------------
-    def _already_prompted_today(self, today: str) -> bool:
+    def _count_started_users(self, timezone: str) -> int:
         conn = get_connection()
         cur = conn.cursor()
-
         cur.execute(
-            """
-            SELECT last_reset_date
-            FROM task_reset_state
-            WHERE id = 1
-            """
+            f"""
+            SELECT COUNT(*)
+            FROM users u
+            WHERE u.has_started = 1
+              AND {clock.USER_TIMEZONE_SQL} = ?
+            """,
+            (clock.DEFAULT_TIMEZONE, timezone),
         )
-        row = cur.fetchone()
+        total = cur.fetchone()[0]
         conn.close()
+        return total
 
-        if not row:
-            return False
-
-        return row["last_reset_date"] == today
-
-    def _mark_prompted(self, today: str):
+    def _prompt_page(self, job: str, timezone: str, run_key: str, day: str, after: str, embed: discord.Embed):
+        """
+        Queues one page of prompts and advances the ledger cursor in
+        the same transaction. Returns (count, new_cursor).
+        """
         conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(
-            """
-            INSERT INTO task_reset_state (id, last_reset_date)
-            VALUES (1, ?)
-            ON CONFLICT(id)
-            DO UPDATE SET last_reset_date = excluded.last_reset_date
+            f"""
+            SELECT u.user_id
+            FROM users u
+            WHERE u.has_started = 1
+              AND {clock.USER_TIMEZONE_SQL} = ?
+              AND u.user_id > ?
+            ORDER BY u.user_id
+            LIMIT ?
             """,
-            (today,),
+            (clock.DEFAULT_TIMEZONE, timezone, after, PAGE_SIZE),
         )
+        user_ids = [r["user_id"] for r in cur.fetchall()]
+
+        if not user_ids:
+            conn.close()
+            return 0, after
+
+        for user_id in user_ids:
+            queue_dm(
+                cur,
+                user_id,
+                embed=embed,
+                dedupe_key=f"morning:{day}:{user_id}",
+            )
+
+        advance_run(cur, job, run_key, user_ids[-1], len(user_ids))
 
         conn.commit()
         conn.close()
+        return len(user_ids), user_ids[-1]
+
+    # ---------------------------------------------------------
+    # Retention (hot history -> task_archive, old queued DMs)
+    # ---------------------------------------------------------
+    @tasks.loop(hours=1)
+    async def retention_loop(self):
+        moved = 0
+        try:
+            # One short transaction per batch; yield between them so
+            # interactive writes never queue behind the whole backlog
+            while True:
+                count = await run_db(archive_step)
+                if not count:
+                    break
+                moved += count
+                await asyncio.sleep(0)
+        except Exception:
+            log.exception("History archiving failed after %s profile-days", moved)
+
+        if moved:
+            log.info("Archived %s profile-days of history", moved)
+
+        pruned = 0
+        try:
+            while True:
+                count = await run_db(prune_step)
+                if not count:
+                    break
+                pruned += count
+                await asyncio.sleep(0)
+        except Exception:
+            log.exception("Message queue pruning failed after %s rows", pruned)
+            return
+
+        if pruned:
+            log.info("Pruned %s delivered messages", pruned)
+
+    @retention_loop.before_loop
+    async def before_retention(self):
+        await self.bot.wait_until_ready()
+
+    @morning_loop.before_loop
+    async def before_morning_loop(self):
+        await self.bot.wait_until_ready()
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,186 @@
+from collections import Counter
+from datetime import date
+
+from core import clock
+from core.db import get_connection
+
+
+# ─────────────────────────────────────────────
+# ROLLUPS
+# ─────────────────────────────────────────────
+# daily_stats: one row per (profile, local day, category) with the
+# completions and tokens of that day. weekly: one row per (profile,
+# ISO week) with completions and boss defeats. Both are written in
+# the completion transaction, so stats never read raw history and
+# survive task_history cleanup.
+
+UNCATEGORIZED = "other"
+
+
+def week_key(day: str) -> int:
+    """
+    weekly.week for a local date: ISO year * 100 + ISO week (202642),
+    so weeks of different years never collide.
+    """
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return year * 100 + week
+
+
+_DAILY_SQL = """
+    INSERT INTO daily_stats (profile_id, date, category, completed, tokens)
+    VALUES (?, ?, ?, 1, ?)
+    ON CONFLICT (profile_id, date, category) DO UPDATE SET
+        completed = completed + 1,
+        tokens = tokens + excluded.tokens
+"""
+
+_WEEKLY_SQL = """
+    INSERT INTO weekly (profile_id, week, tasks_completed)
+    VALUES (?, ?, 1)
+    ON CONFLICT (profile_id, week) DO UPDATE SET
+        tasks_completed = tasks_completed + 1
+"""
+
+
+def record_completion(cur, profile_id: int, day: str, category: str, tokens: int):
+    """
+    Counts one completion into both rollups.
+    Assumes an open transaction and never commits.
+    """
+    cur.execute(_DAILY_SQL, (profile_id, day, category or UNCATEGORIZED, tokens))
+    cur.execute(_WEEKLY_SQL, (profile_id, week_key(day)))
+
+
+# ─────────────────────────────────────────────
+# READS
+# ─────────────────────────────────────────────
+
+def stats_since(profile_id: int, since: str):
+    """
+    Per-category completions and tokens from `since` (inclusive):
+    one primary-key range read.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT category, SUM(completed) AS count, SUM(tokens) AS tokens
+        FROM daily_stats
+        WHERE profile_id = ?
+          AND date >= ?
+        GROUP BY category
+        ORDER BY count DESC
+        """,
+        (profile_id, since),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def week_summary(profile_id: int, day: str):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT tasks_completed, bosses_defeated
+        FROM weekly
+        WHERE profile_id = ? AND week = ?
+        """,
+        (profile_id, week_key(day)),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+# ─────────────────────────────────────────────
+# BACKFILL
+# ─────────────────────────────────────────────
+
+def backfill_rollups_with(cur):
+    """
+    Rebuilds both rollups from task_history and boss_history.
+    Idempotent (recounts, never adds); never commits.
+
+    Days no longer in task_history keep their daily_stats rows, so a
+    backfill after history cleanup never loses counts.
+    """
+    cur.execute(
+        """
+        INSERT INTO daily_stats (profile_id, date, category, completed, tokens)
+        SELECT
+            th.profile_id,
+            th.date,
+            COALESCE(c.name, ?),
+            COUNT(*),
+            COALESCE(SUM(th.points_awarded), 0)
+        FROM task_history th
+        LEFT JOIN task_categories c ON c.category_id = th.category_id
+        WHERE th.completed = 1
+        GROUP BY 1, 2, 3
+        ON CONFLICT (profile_id, date, category) DO UPDATE SET
+            completed = excluded.completed,
+            tokens = excluded.tokens
+        """,
+        (UNCATEGORIZED,),
+    )
+
+    # ISO weeks can't be computed in SQL here, so fold days in Python;
+    # the input is already one row per profile-day
+    tasks = Counter()
+    cur.execute(
+        """
+        SELECT profile_id, date, SUM(completed) AS completed
+        FROM daily_stats
+        GROUP BY profile_id, date
+        """
+    )
+    for row in cur.fetchall():
+        tasks[(row["profile_id"], week_key(row["date"]))] += row["completed"]
+
+    # defeated_at is UTC; the week is the owner's local one, as in
+    # boss_engine._settle_defeat
+    bosses = Counter()
+    cur.execute(
+        f"""
+        SELECT bh.profile_id, bh.defeated_at, {clock.USER_TIMEZONE_SQL} AS timezone
+        FROM boss_history bh
+        LEFT JOIN profiles p ON p.profile_id = bh.profile_id
+        LEFT JOIN users u ON u.user_id = p.user_id
+        """,
+        (clock.DEFAULT_TIMEZONE,),
+    )
+    for row in cur.fetchall():
+        day = clock.local_date(row["defeated_at"], row["timezone"])
+        bosses[(row["profile_id"], week_key(day))] += 1
+
+    cur.execute("SELECT profile_id, week, bonus_awarded FROM weekly")
+    bonus = {(r["profile_id"], r["week"]): r["bonus_awarded"] for r in cur.fetchall()}
+
+    cur.execute("DELETE FROM weekly")
+    cur.executemany(
+        """
+        INSERT INTO weekly (profile_id, week, tasks_completed, bosses_defeated, bonus_awarded)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (*key, tasks[key], bosses[key], bonus.get(key, 0))
+            for key in tasks.keys() | bosses.keys()
+        ],
+    )
+
+
+def backfill_rollups():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        backfill_rollups_with(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
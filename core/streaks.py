@@ -0,0 +1,235 @@
+import os
+from datetime import date, timedelta
+
+from core import clock
+from core.db import get_connection
+from core.task_catalog import category_code
+
+
+# ─────────────────────────────────────────────
+# POLICY
+# ─────────────────────────────────────────────
+# A streak counts calendar days (in the profile's timezone) with at
+# least one qualifying completion. Up to GRACE_DAYS missed days in a
+# row are forgiven: the streak is kept (not grown) across them.
+
+GRACE_DAYS = int(os.getenv("TINYREGG_STREAK_GRACE_DAYS", "1"))
+
+# streak name -> task_history category that feeds it.
+# Each has <name>_streak / last_<name>_day columns in profile_streaks.
+STREAKS = {
+    "required": "required",
+    "intimacy": "intimacy",
+    "kink": "kink",
+    "explicit": "explicit",
+    "regression": "regressive",
+}
+
+
+def _grace_from(today: str) -> str:
+    """
+    Oldest last_*_day that still continues a streak on `today`.
+    """
+    return (date.fromisoformat(today) - timedelta(days=GRACE_DAYS + 1)).isoformat()
+
+
+# ─────────────────────────────────────────────
+# SQL (built once from STREAKS)
+# ─────────────────────────────────────────────
+
+def _upsert_sql() -> str:
+    """
+    One UPSERT for every streak. Per streak, with :<name> = 1 when
+    this completion qualifies:
+    - already counted today (or a later day) → unchanged
+    - last day within the grace window → +1
+    - otherwise (gap, or first ever) → 1
+    A flag of 0 leaves that streak and its last day untouched.
+    """
+    columns = ["profile_id"]
+    values = [":profile_id"]
+    updates = []
+
+    for name in STREAKS:
+        streak, last = f"{name}_streak", f"last_{name}_day"
+        columns += [streak, last]
+        values += [f":{name}", f"CASE WHEN :{name} THEN :today END"]
+        updates += [
+            f"""{streak} = CASE
+                WHEN NOT :{name} THEN {streak}
+                WHEN {last} >= :today THEN {streak}
+                WHEN {last} >= :grace_from THEN {streak} + 1
+                ELSE 1
+            END""",
+            f"{last} = CASE WHEN :{name} THEN MAX(COALESCE({last}, ''), :today) ELSE {last} END",
+        ]
+
+    separator = ",\n            "
+    return f"""
+        INSERT INTO profile_streaks ({", ".join(columns)})
+        VALUES ({", ".join(values)})
+        ON CONFLICT (profile_id) DO UPDATE SET
+            {separator.join(updates)}
+    """
+
+
+def _current_sql() -> str:
+    # A stored streak whose last day fell out of the grace window is
+    # already broken, even though no completion has reset it yet
+    reads = ",\n            ".join(
+        f"""CASE WHEN last_{name}_day >= :grace_from
+                THEN {name}_streak ELSE 0 END AS {name}"""
+        for name in STREAKS
+    )
+    return f"""
+        SELECT
+            {reads}
+        FROM profile_streaks
+        WHERE profile_id = :profile_id
+    """
+
+
+_UPSERT_STREAKS_SQL = _upsert_sql()
+_CURRENT_STREAKS_SQL = _current_sql()
+
+
+# ─────────────────────────────────────────────
+# COMPLETION PATH (O(1), inside the completion transaction)
+# ─────────────────────────────────────────────
+
+def update_streaks(cur, profile_id: int, category: str, is_required: bool, today: str):
+    """
+    Counts today towards every streak this completion qualifies for.
+    Assumes an open transaction and never commits.
+    """
+    params = {
+        "profile_id": profile_id,
+        "today": today,
+        "grace_from": _grace_from(today),
+    }
+    for name, streak_category in STREAKS.items():
+        params[name] = int(category == streak_category)
+    params["required"] = int(is_required or category == STREAKS["required"])
+
+    cur.execute(_UPSERT_STREAKS_SQL, params)
+
+
+# ─────────────────────────────────────────────
+# READS
+# ─────────────────────────────────────────────
+
+def current_streaks_with(cur, profile_id: int, today: str = None) -> dict:
+    """
+    {streak name: days} as of today — a single primary-key read.
+    Authoritative for gates such as the shop's min_streak.
+    """
+    today = today or clock.profile_today(profile_id)
+
+    cur.execute(
+        _CURRENT_STREAKS_SQL,
+        {"profile_id": profile_id, "grace_from": _grace_from(today)},
+    )
+    row = cur.fetchone()
+
+    if not row:
+        return {name: 0 for name in STREAKS}
+    return {name: row[name] for name in STREAKS}
+
+
+def current_streaks(profile_id: int, today: str = None) -> dict:
+    conn = get_connection()
+    try:
+        return current_streaks_with(conn.cursor(), profile_id, today)
+    finally:
+        conn.close()
+
+
+# ─────────────────────────────────────────────
+# REPAIR
+# ─────────────────────────────────────────────
+
+def rebuild_streaks_with(cur):
+    """
+    Recomputes every streak of every profile from task_history (and
+    the task_archive tier) in one set-based statement per streak
+    (gaps-and-islands over completion days): each streak becomes the
+    length of the latest run of days whose gaps fit the grace policy.
+    Never commits.
+    """
+    cur.execute("INSERT OR IGNORE INTO profile_streaks (profile_id) SELECT profile_id FROM profiles")
+
+    for name, category in STREAKS.items():
+        streak, last = f"{name}_streak", f"last_{name}_day"
+
+        cur.execute(f"UPDATE profile_streaks SET {streak} = 0, {last} = NULL")
+        cur.execute(
+            f"""
+            WITH days(profile_id, day) AS (
+                SELECT DISTINCT profile_id, date
+                FROM task_history
+                WHERE completed = 1
+                  AND category_id = :code
+                UNION
+                SELECT ta.profile_id, ta.date
+                FROM task_archive ta, json_each(ta.tasks) t
+                WHERE json_extract(t.value, '$[3]') = 1
+                  AND json_extract(t.value, '$[1]') = :category
+            ),
+            marked AS (
+                SELECT
+                    profile_id,
+                    day,
+                    CASE
+                        WHEN julianday(day) - julianday(LAG(day) OVER w) <= :max_gap THEN 0
+                        ELSE 1
+                    END AS starts_run
+                FROM days
+                WINDOW w AS (PARTITION BY profile_id ORDER BY day)
+            ),
+            runs AS (
+                SELECT
+                    profile_id,
+                    day,
+                    SUM(starts_run) OVER (PARTITION BY profile_id ORDER BY day) AS run
+                FROM marked
+            ),
+            latest AS (
+                SELECT
+                    profile_id,
+                    day,
+                    run,
+                    MAX(run) OVER (PARTITION BY profile_id) AS last_run
+                FROM runs
+            )
+            UPDATE profile_streaks
+            SET {streak} = s.days,
+                {last} = s.last_day
+            FROM (
+                SELECT profile_id, COUNT(*) AS days, MAX(day) AS last_day
+                FROM latest
+                WHERE run = last_run
+                GROUP BY profile_id
+            ) AS s
+            WHERE profile_streaks.profile_id = s.profile_id
+            """,
+            {
+                "category": category,
+                "code": category_code(category),
+                "max_gap": GRACE_DAYS + 1,
+            },
+        )
+
+
+def rebuild_streaks():
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        rebuild_streaks_with(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
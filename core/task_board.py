@@ -0,0 +1,160 @@
+import threading
+from collections import OrderedDict
+
+from core import task_catalog, task_pools
+from core.db import get_connection
+from core.templates import render_many
+
+
+# ─────────────────────────────────────────────
+# BOARD STATE
+# ─────────────────────────────────────────────
+
+OPTIONAL_SECTIONS = ("intimacy", "kink", "explicit")
+
+
+def _section_for(category: str, is_required: bool) -> str:
+    if is_required:
+        return "required"
+    if category in OPTIONAL_SECTIONS:
+        return category
+    return "core"
+
+
+class TaskBoard:
+    """
+    One profile's task list for one day, with names already injected.
+
+    Built from the DB once, then updated in place as tasks are
+    completed — a click marks one key done instead of re-reading
+    and re-rendering the whole list.
+    """
+
+    __slots__ = ("profile_id", "date", "sections", "done")
+
+    def __init__(self, profile_id: int, date_str: str, sections: dict, done: set):
+        self.profile_id = profile_id
+        self.date = date_str
+        self.sections = sections  # section -> {task_key: text}
+        self.done = done
+
+    def mark_done(self, task_key: str):
+        self.done.add(task_key)
+
+    def pending(self, section: str) -> dict:
+        return {
+            key: text
+            for key, text in self.sections.get(section, {}).items()
+            if key not in self.done
+        }
+
+    def pending_keys(self) -> list[str]:
+        return [
+            key
+            for items in self.sections.values()
+            for key in items
+            if key not in self.done
+        ]
+
+
+def load_board(profile_id: int, date_str: str, names: dict) -> TaskBoard:
+    """
+    Cache-miss path: today's assignments plus what is already done.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT a.task_id, a.category_id, a.is_required, h.completed
+        FROM assigned_tasks a
+        LEFT JOIN task_history h
+          ON h.profile_id = a.profile_id
+         AND h.date = a.date
+         AND h.task_id = a.task_id
+        WHERE a.profile_id = ?
+          AND a.date = ?
+        """,
+        (profile_id, date_str),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    keys = [task_catalog.task_key(r["task_id"]) for r in rows]
+
+    raw = {}
+    for key in keys:
+        task = task_pools.get_task(key)
+        raw[key] = task["text"] if task else key
+
+    texts = dict(zip(raw, render_many(raw.values(), names)))
+
+    sections = {}
+    done = set()
+    for key, r in zip(keys, rows):
+        category = task_catalog.category_name(r["category_id"])
+        section = _section_for(category, bool(r["is_required"]))
+        sections.setdefault(section, {})[key] = texts[key]
+        if r["completed"]:
+            done.add(key)
+
+    return TaskBoard(profile_id, date_str, sections, done)
+
+
+# ─────────────────────────────────────────────
+# BOARD CACHE
+# ─────────────────────────────────────────────
+
+TASK_BOARD_CACHE_SIZE = 512
+
+_board_cache: "OrderedDict[tuple[int, str], TaskBoard]" = OrderedDict()
+_board_generation: dict[int, int] = {}
+_board_epoch = 0
+_board_lock = threading.Lock()
+
+
+def get_board(profile_id: int, date_str: str, names: dict) -> TaskBoard:
+    """
+    Cached TaskBoard for (profile_id, date). Sync (DB-bound on a
+    miss) — call through run_db from async code.
+    """
+    cache_key = (profile_id, date_str)
+
+    with _board_lock:
+        board = _board_cache.get(cache_key)
+        if board is not None:
+            _board_cache.move_to_end(cache_key)
+            return board
+        generation = (_board_epoch, _board_generation.get(profile_id, 0))
+
+    board = load_board(profile_id, date_str, names)
+
+    with _board_lock:
+        # Tasks changed while we were reading: serve, don't cache.
+        if (_board_epoch, _board_generation.get(profile_id, 0)) == generation:
+            _board_cache[cache_key] = board
+            if len(_board_cache) > TASK_BOARD_CACHE_SIZE:
+                _board_cache.popitem(last=False)
+
+    return board
+
+
+def invalidate_board(profile_id: int):
+    """
+    Call whenever a profile's assigned tasks change (generation,
+    reassess, regenerate).
+    """
+    with _board_lock:
+        for cache_key in [k for k in _board_cache if k[0] == profile_id]:
+            del _board_cache[cache_key]
+        _board_generation[profile_id] = _board_generation.get(profile_id, 0) + 1
+
+
+def clear_boards():
+    """
+    Bulk changes (morning batch, admin resets) drop everything.
+    """
+    global _board_epoch
+
+    with _board_lock:
+        _board_cache.clear()
+        _board_epoch += 1
@@ -1,40 +1,47 @@
 import discord
-from discord.ui import Button, View
-from datetime import date
+from discord.ui import Button, DynamicItem, View
 
-from core.task_engine import complete_task_for_profile, get_tasks_for_profile
-from core.theming import inject_names
-from core.presence import get_active_profile
+from core.async_db import run_db
 
 
-class TaskCompleteButton(Button):
-    def __init__(self, user_id: str, profile_id: int, task_key: str):
+class TaskCompleteButton(
+    DynamicItem[Button],
+    template=r"task:(?P<profile_id>\d+):(?P<task_key>.+)",
+):
+    """
+    Persistent "Complete" button. All state lives in the custom_id
+    ("task:{profile_id}:{task_key}"), so once the class is registered
+    (bot.add_dynamic_items in setup_hook) clicks on any /tasks
+    message are routed here — including messages sent before a
+    restart — and no per-message View has to be kept in memory.
+    """
+
+    def __init__(self, profile_id: int, task_key: str):
         super().__init__(
-            style=discord.ButtonStyle.success,
-            label="Complete",
-            custom_id=f"task:{profile_id}:{task_key}",
+            Button(
+                style=discord.ButtonStyle.success,
+                label="Complete",
+                custom_id=f"task:{profile_id}:{task_key}",
+            )
         )
-        self.user_id = str(user_id)
         self.profile_id = profile_id
         self.task_key = task_key
 
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(int(match["profile_id"]), match["task_key"])
+
     async def callback(self, interaction: discord.Interaction):
-        # 🔒 Owner check
-        if str(interaction.user.id) != self.user_id:
-            await interaction.response.send_message(
-                "This button isn’t for you.",
-                ephemeral=True,
-            )
-            return
+        # ✅ Complete task + reload (DB executor, off the loop)
+        from cogs.tasks import build_tasks_embed_and_view, complete_and_reload
 
-        # ✅ Complete task (SYNC engine call)
-        complete_task_for_profile(
-            profile_id=self.profile_id,
-            task_key=self.task_key,
+        profile, board, message = await run_db(
+            complete_and_reload,
+            str(interaction.user.id),
+            self.profile_id,
+            self.task_key,
         )
 
-        # 🔄 Refresh active profile
-        profile = get_active_profile(self.user_id)
         if not profile:
             await interaction.response.send_message(
                 "I’m not sure who’s here right now.",
@@ -42,19 +49,19 @@ class TaskCompleteButton(Button):
             )
             return
 
-        # 🔄 Fetch updated tasks
-        tasks = get_tasks_for_profile(
-            profile_id=profile["profile_id"],
-            date=date.today().isoformat(),
-        )
-
-        # 🔧 Rebuild embed + buttons
-        from cogs.tasks import build_tasks_embed_and_view
+        # 🔒 Owner check (the clicker's active profile must own the button)
+        if board is None:
+            await interaction.response.send_message(
+                "This button isn’t for you.",
+                ephemeral=True,
+            )
+            return
 
+        # 🔧 Re-serialize embed + buttons from the board
         embed, view = build_tasks_embed_and_view(
             interaction.user.id,
             profile,
-            tasks,
+            board,
         )
 
         await interaction.response.edit_message(
@@ -62,17 +69,26 @@ class TaskCompleteButton(Button):
             view=view,
         )
 
+        if message:
+            await interaction.followup.send(message, ephemeral=True)
+            # A boss defeat queues its announcement with the completion
+            interaction.client.dm_dispatcher.wake()
+
+
+def build_task_buttons(board) -> View:
+    """
+    One button per pending task, as a send-only View.
+
+    Dispatch is handled by the registered TaskCompleteButton, so the
+    View is stopped before it is sent: discord.py only keeps views
+    that are still listening, and a board message never needs its
+    View back. Call on the event loop (a View only becomes stoppable
+    there).
+    """
+    view = View(timeout=None)
 
-class TaskButtonsView(View):
-    def __init__(self, user_id: str, profile_id: int, tasks: dict):
-        super().__init__(timeout=None)
+    for task_key in board.pending_keys():
+        view.add_item(TaskCompleteButton(board.profile_id, task_key))
 
-        for category in tasks.values():
-            for task_key in category.keys():
-                self.add_item(
-                    TaskCompleteButton(
-                        user_id=user_id,
-                        profile_id=profile_id,
-                        task_key=task_key,
-                    )
-                )
+    view.stop()
+    return view
@@ -0,0 +1,147 @@
+import logging
+
+from core.db import get_connection
+
+log = logging.getLogger("tinyregg.task_catalog")
+
+
+# ─────────────────────────────────────────────
+# CATEGORY CODES
+# ─────────────────────────────────────────────
+# assigned_tasks / task_history store category_id and task_id
+# integers; names and keys live once, in task_categories and
+# task_catalog. Codes are fixed (migration 11 seeds the same table):
+# never renumber, only append.
+
+CATEGORY_CODES = {
+    "required": 1,
+    "basic": 2,
+    "fun": 3,
+    "small_clean": 4,
+    "medium_clean": 5,
+    "heavy_clean": 6,
+    "regressive": 7,
+    "intimacy": 8,
+    "kink": 9,
+    "explicit": 10,
+}
+
+CATEGORY_NAMES = {code: name for name, code in CATEGORY_CODES.items()}
+
+
+def category_code(name: str):
+    """
+    Integer code of a category name, or None for unknown names.
+    """
+    if name in CATEGORY_CODES:
+        return CATEGORY_CODES[name]
+    _ensure_loaded()
+    return _extra_codes.get(name)
+
+
+def category_name(code):
+    """
+    Category name of a code, or None.
+    """
+    if code in CATEGORY_NAMES:
+        return CATEGORY_NAMES[code]
+    if code is None:
+        return None
+    _ensure_loaded()
+    return _extra_names.get(code)
+
+
+# ─────────────────────────────────────────────
+# TASK IDS
+# ─────────────────────────────────────────────
+# task_key <-> task_id, loaded once per process. Ids are assigned by
+# the table (INTEGER PRIMARY KEY) and never reused, so retired keys
+# still resolve for old history rows.
+
+_ids = {}
+_keys = {}
+_extra_codes = {}
+_extra_names = {}
+_loaded = False
+
+
+def _load(cur):
+    global _loaded
+
+    cur.execute("SELECT task_id, task_key FROM task_catalog")
+    rows = cur.fetchall()
+    _ids.clear()
+    _keys.clear()
+    for r in rows:
+        _ids[r["task_key"]] = r["task_id"]
+        _keys[r["task_id"]] = r["task_key"]
+
+    # Categories found in old data that aren't in CATEGORY_CODES
+    cur.execute("SELECT category_id, name FROM task_categories")
+    _extra_codes.clear()
+    _extra_names.clear()
+    for r in cur.fetchall():
+        if r["name"] not in CATEGORY_CODES:
+            _extra_codes[r["name"]] = r["category_id"]
+            _extra_names[r["category_id"]] = r["name"]
+
+    _loaded = True
+
+
+def _ensure_loaded():
+    if _loaded:
+        return
+
+    conn = get_connection()
+    try:
+        _load(conn.cursor())
+    finally:
+        conn.close()
+
+
+def task_id(task_key: str):
+    """
+    Integer id of a task key, or None if the key was never catalogued.
+    """
+    _ensure_loaded()
+    return _ids.get(task_key)
+
+
+def task_key(value: int):
+    """
+    Task key of a task id, or None.
+    """
+    _ensure_loaded()
+    return _keys.get(value)
+
+
+# ─────────────────────────────────────────────
+# STARTUP
+# ─────────────────────────────────────────────
+
+def sync_catalog(conn):
+    """
+    Gives every pool task an id (new keys get fresh ids, existing ones
+    keep theirs) and loads the maps. Called by initialize_db after
+    migrations; commits.
+    """
+    from core.task_pools import TASK_CATALOG
+
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT OR IGNORE INTO task_categories (category_id, name) VALUES (?, ?)",
+        [(code, name) for name, code in CATEGORY_CODES.items()],
+    )
+    cur.executemany(
+        "INSERT OR IGNORE INTO task_catalog (task_key, category_id) VALUES (?, ?)",
+        [
+            (key, CATEGORY_CODES.get(task["category"]))
+            for key, task in TASK_CATALOG.items()
+        ],
+    )
+    added = cur.rowcount
+    conn.commit()
+
+    _load(cur)
+    if added > 0:
+        log.info("Catalogued %s new task keys", added)
@@ -1,21 +1,30 @@
 # core/task_engine.py
 
 import random
-from datetime import date
 from collections import defaultdict
 
-from core import task_pools
+from core import clock, task_catalog, task_pools
 from core.db import get_connection
+from core.task_board import clear_boards, invalidate_board
+from core.task_rewards import complete_task
+from core.task_selection import TaskSelector
 
 MAX_DAILY_TASKS = 10
 
+_selector = TaskSelector(MAX_DAILY_TASKS)
+
 
 # ─────────────────────────────────────────────
 # DATE (single source of truth)
 # ─────────────────────────────────────────────
 
-def _today() -> str:
-    return date.today().isoformat()
+def _today(profile_id=None) -> str:
+    """
+    The profile owner's local date (see core.clock).
+    """
+    if profile_id is None:
+        return clock.local_today()
+    return clock.profile_today(profile_id)
 
 
 # ─────────────────────────────────────────────
@@ -27,36 +36,12 @@ def _resolve_task_text(task_key: str) -> str:
     Canonical task text resolver.
 
     This is intentionally centralized so that:
-    - Today: text comes from task_pools
+    - Today: text comes from the task_pools catalog (one dict lookup)
     - Later: text can come from DB / AI / localization
     """
-    for pool in (
-        task_pools.BASIC_CARE,
-        task_pools.FUN_TASKS,
-        task_pools.SMALL_CLEANING,
-        task_pools.MEDIUM_CLEANING,
-        task_pools.HEAVY_CLEANING,
-        task_pools.REGRESSIVE_TASKS,
-    ):
-        if task_key in pool:
-            return pool[task_key]
-
-    for text in task_pools.INTIMACY_TASKS:
-        if task_key.endswith(str(abs(hash(text)))):
-            return text
-
-    for level in (
-        task_pools.KINK_LEVEL_1,
-        task_pools.KINK_LEVEL_2,
-        task_pools.KINK_LEVEL_3,
-    ):
-        for text in level:
-            if task_key.endswith(str(abs(hash(text)))):
-                return text
-
-    for text in task_pools.EXPLICIT_TASKS:
-        if task_key.endswith(str(abs(hash(text)))):
-            return text
+    task = task_pools.get_task(task_key)
+    if task:
+        return task["text"]
 
     return task_key  # safe fallback
 
@@ -65,17 +50,6 @@ def _resolve_task_text(task_key: str) -> str:
 # INTERNAL HELPERS
 # ─────────────────────────────────────────────
 
-def _weighted_choice(weighted_items):
-    total = sum(w for _, w in weighted_items)
-    roll = random.uniform(0, total)
-    upto = 0
-    for key, weight in weighted_items:
-        if upto + weight >= roll:
-            return key
-        upto += weight
-    return weighted_items[-1][0]
-
-
 def _get_profile(profile_id):
     conn = get_connection()
     cur = conn.cursor()
@@ -85,76 +59,96 @@ def _get_profile(profile_id):
     return row
 
 
-def _get_existing_task_keys(profile_id):
-    today = _today()
+def _get_existing_tasks(profile_id, date_str=None):
+    """
+    Today's assigned tasks as {task_key: category}.
+    """
     conn = get_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT task_key
+        SELECT task_id, category_id
         FROM assigned_tasks
         WHERE profile_id = ?
           AND date = ?
         """,
-        (profile_id, today),
+        (profile_id, date_str or _today(profile_id)),
     )
     rows = cur.fetchall()
     conn.close()
-    return {r["task_key"] for r in rows}
+    return {
+        task_catalog.task_key(r["task_id"]): task_catalog.category_name(r["category_id"])
+        for r in rows
+    }
 
 
-def _explicit_already_assigned(profile_id) -> bool:
-    today = _today()
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT 1
-        FROM assigned_tasks
-        WHERE profile_id = ?
-          AND category = 'explicit'
-          AND date = ?
-        LIMIT 1
-        """,
-        (profile_id, today),
-    )
-    exists = cur.fetchone() is not None
-    conn.close()
-    return exists
+def _task_rows(profile_id, date_str, tasks):
+    return [
+        (
+            profile_id,
+            date_str,
+            task_catalog.task_id(task["key"]),
+            task_catalog.category_code(task["category"]),
+            task["required"],
+            task["hidden"],
+        )
+        for task in tasks
+    ]
 
 
-def _insert_tasks(profile_id, tasks):
-    today = _today()
-    conn = get_connection()
-    cur = conn.cursor()
+_INSERT_ASSIGNED_SQL = """
+    INSERT OR IGNORE INTO assigned_tasks
+    (profile_id, date, task_id, category_id, is_required, hidden_until_complete)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
 
-    for task in tasks:
-        cur.execute(
-            """
-            INSERT OR IGNORE INTO assigned_tasks
-            (profile_id, date, task_key, category, is_required, hidden_until_complete)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                profile_id,
-                today,
-                task["key"],
-                task["category"],
-                task["required"],
-                task["hidden"],
-            ),
-        )
 
+def _insert_tasks(profile_id, tasks, date_str=None):
+    if not tasks:
+        return
+
+    conn = get_connection()
+    conn.executemany(
+        _INSERT_ASSIGNED_SQL,
+        _task_rows(profile_id, date_str or _today(profile_id), tasks),
+    )
     conn.commit()
     conn.close()
 
 
+def _allowed_categories(profile):
+    """
+    Categories a profile may currently be assigned.
+    Mirrors the pools generation draws from.
+    """
+    if profile["age_context"] in ("cloudy", "regressive"):
+        allowed = ["required", "basic", "fun", "regressive", "small_clean"]
+    else:
+        allowed = [
+            "required",
+            "basic",
+            "fun",
+            "small_clean",
+            "medium_clean",
+            "heavy_clean",
+        ]
+        if profile["intimacy_opt_in"]:
+            allowed.append("intimacy")
+        if profile["kink_opt_in"]:
+            allowed.append("kink")
+        if profile["explicit_opt_in"]:
+            allowed.append("explicit")
+
+    return allowed
+
+
 def _remove_uncompleted_unsafe(profile_id, allowed_categories):
     if not allowed_categories:
         return
 
-    today = _today()
-    placeholders = ",".join("?" * len(allowed_categories))
+    today = _today(profile_id)
+    codes = [task_catalog.category_code(c) for c in allowed_categories]
+    placeholders = ",".join("?" * len(codes))
 
     conn = get_connection()
     cur = conn.cursor()
@@ -163,107 +157,144 @@ def _remove_uncompleted_unsafe(profile_id, allowed_categories):
         DELETE FROM assigned_tasks
         WHERE profile_id = ?
           AND date = ?
-          AND task_key NOT IN (
-              SELECT task_key
+          AND task_id NOT IN (
+              SELECT task_id
               FROM task_history
               WHERE profile_id = ?
                 AND completed = 1
                 AND date = ?
           )
-          AND category NOT IN ({placeholders})
+          AND category_id NOT IN ({placeholders})
         """,
-        (profile_id, today, profile_id, today, *allowed_categories),
+        (profile_id, today, profile_id, today, *codes),
     )
 
     conn.commit()
     conn.close()
+    invalidate_board(profile_id)
 
 
 # ─────────────────────────────────────────────
 # DAILY GENERATION
 # ─────────────────────────────────────────────
 
-def generate_daily_tasks(profile_id):
+def _plan_daily_tasks(profile, existing, date_str=None, rng=None):
+    """
+    Pure: decides which tasks to add for a profile given what is
+    already assigned today ({task_key: category}). No DB access, so
+    it serves both the lazy and the batch path.
+
+    Seeded from profile_id + date unless an rng is given, so a
+    profile gets the same picks whichever path generates them.
+    """
+    if rng is None:
+        return _selector.select_for_day(profile, existing, date_str or _today(profile["profile_id"]))
+    return _selector.select(profile, existing, rng)
+
+
+def generate_daily_tasks(profile_id, rng=None):
+    """
+    Lazy, single-profile generation (fallback for /tasks).
+    """
     profile = _get_profile(profile_id)
     if not profile:
         return []
 
-    age = profile["age_context"]
-    intimacy_ok = bool(profile["intimacy_opt_in"])
-    kink_ok = bool(profile["kink_opt_in"])
-    explicit_ok = bool(profile["explicit_opt_in"])
+    today = _today(profile_id)
+    tasks = _plan_daily_tasks(profile, _get_existing_tasks(profile_id, today), today, rng)
+    _insert_tasks(profile_id, tasks, today)
+    if tasks:
+        invalidate_board(profile_id)
+    return tasks
+
+
+def ensure_daily_tasks(profile_id) -> bool:
+    """
+    Generates today's tasks only if none exist yet (i.e. the morning
+    batch missed this profile). Returns True if it had to generate.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT 1
+        FROM assigned_tasks
+        WHERE profile_id = ?
+          AND date = ?
+        LIMIT 1
+        """,
+        (profile_id, _today(profile_id)),
+    )
+    hit = cur.fetchone() is not None
+    conn.close()
+
+    if hit:
+        return False
 
-    existing = _get_existing_task_keys(profile_id)
-    tasks = []
+    generate_daily_tasks(profile_id)
+    return True
 
-    for t in task_pools.get_required_tasks():
-        if t["key"] not in existing:
-            tasks.append(t)
 
-    remaining = MAX_DAILY_TASKS - len(existing) - len(tasks)
-    if remaining <= 0:
-        _insert_tasks(profile_id, tasks)
-        return tasks
+def generate_daily_tasks_bulk(timezone=clock.DEFAULT_TIMEZONE, date_str=None) -> int:
+    """
+    Batch generation for every started user's active profile in
+    one timezone bucket, for that bucket's local date.
 
-    explicit_used = _explicit_already_assigned(profile_id)
+    One read for the profiles, one for what is already assigned,
+    planning in memory, and a single executemany transaction.
+    Returns the number of tasks written.
+    """
+    date_str = date_str or clock.local_today(timezone)
+    bucket = (clock.DEFAULT_TIMEZONE, timezone)
 
-    if age in ("cloudy", "regressive"):
-        weighted = [
-            ("basic", 35),
-            ("fun", 30),
-            ("regressive", 25),
-            ("small_clean", 10),
-        ]
-    else:
-        weighted = [
-            ("basic", 25),
-            ("fun", 20),
-            ("small_clean", 20),
-            ("medium_clean", 15),
-            ("heavy_clean", 5),
-        ]
-        if intimacy_ok:
-            weighted.append(("intimacy", 10))
-        if kink_ok:
-            weighted.append(("kink", 7))
-
-    while remaining > 0:
-        pool = _weighted_choice(weighted)
-
-        if (
-            age == "adult"
-            and explicit_ok
-            and not explicit_used
-            and random.random() <= 0.18
-        ):
-            picked = task_pools.get_explicit_tasks()
-            explicit_used = True
-        else:
-            picker = {
-                "basic": task_pools.get_basic_care,
-                "fun": task_pools.get_fun_tasks,
-                "regressive": task_pools.get_regressive_tasks,
-                "small_clean": task_pools.get_small_cleaning,
-                "medium_clean": task_pools.get_medium_cleaning,
-                "heavy_clean": task_pools.get_heavy_cleaning,
-                "intimacy": task_pools.get_intimacy_tasks,
-                "kink": task_pools.get_kink_tasks,
-            }.get(pool)
-
-            if not picker:
-                break
-
-            picked = picker()
-
-        for t in picked:
-            if t["key"] not in existing:
-                tasks.append(t)
-                remaining -= 1
-                if remaining <= 0:
-                    break
-
-    _insert_tasks(profile_id, tasks)
-    return tasks
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute(
+        f"""
+        SELECT p.*
+        FROM profiles p
+        JOIN users u ON u.user_id = p.user_id
+        WHERE p.is_active = 1
+          AND u.has_started = 1
+          AND {clock.USER_TIMEZONE_SQL} = ?
+        """,
+        bucket,
+    )
+    profiles = cur.fetchall()
+
+    cur.execute(
+        f"""
+        SELECT a.profile_id, a.task_id, a.category_id
+        FROM assigned_tasks a
+        JOIN profiles p ON p.profile_id = a.profile_id
+        JOIN users u ON u.user_id = p.user_id
+        WHERE a.date = ?
+          AND p.is_active = 1
+          AND {clock.USER_TIMEZONE_SQL} = ?
+        """,
+        (date_str, *bucket),
+    )
+    existing = defaultdict(dict)
+    for r in cur.fetchall():
+        key = task_catalog.task_key(r["task_id"])
+        existing[r["profile_id"]][key] = task_catalog.category_name(r["category_id"])
+
+    rows = []
+    for profile in profiles:
+        profile_id = profile["profile_id"]
+        tasks = _plan_daily_tasks(profile, existing[profile_id], date_str)
+        rows.extend(_task_rows(profile_id, date_str, tasks))
+
+    try:
+        cur.executemany(_INSERT_ASSIGNED_SQL, rows)
+        written = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+
+    clear_boards()
+    return written
 
 
 # ─────────────────────────────────────────────
@@ -287,7 +318,7 @@ def get_tasks_for_profile(profile_id: int, date_str: str):
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT task_key, category, is_required
+        SELECT task_id, category_id, is_required
         FROM assigned_tasks
         WHERE profile_id = ?
           AND date = ?
@@ -300,13 +331,13 @@ def get_tasks_for_profile(profile_id: int, date_str: str):
     tasks = defaultdict(dict)
 
     for r in rows:
-        key = r["task_key"]
+        key = task_catalog.task_key(r["task_id"])
         text = _resolve_task_text(key)
 
         if r["is_required"]:
             tasks["required"][key] = text
         else:
-            tasks[r["category"]][key] = text
+            tasks[task_catalog.category_name(r["category_id"])][key] = text
 
     return tasks
 
@@ -315,38 +346,27 @@ def get_tasks_for_profile(profile_id: int, date_str: str):
 # COMPLETION (SINGLE SOURCE OF TRUTH)
 # ─────────────────────────────────────────────
 
-def complete_task_for_profile(profile_id: int, task_key: str) -> bool:
-    today = _today()
-    conn = get_connection()
-    cur = conn.cursor()
+def complete_task_for_profile(profile_id: int, task_key: str):
+    """
+    Delegates to task_rewards.complete_task so every completion
+    records history, credits tokens and updates streaks together.
+    Returns the Completion.
+    """
+    return complete_task(profile_id, task_key, _today(profile_id))
 
-    cur.execute(
-        """
-        SELECT 1
-        FROM assigned_tasks
-        WHERE profile_id = ?
-          AND task_key = ?
-          AND date = ?
-        """,
-        (profile_id, task_key, today),
-    )
 
-    if not cur.fetchone():
-        conn.close()
-        return False
+def reassess_tasks_for_profile(profile_id: int):
+    """
+    Presence changed mid-day: drop uncompleted tasks the profile is
+    no longer allowed, then top the list back up.
+    """
+    profile = _get_profile(profile_id)
+    if not profile:
+        return
 
-    cur.execute(
-        """
-        INSERT OR REPLACE INTO task_history
-        (profile_id, date, task_key, completed)
-        VALUES (?, ?, ?, 1)
-        """,
-        (profile_id, today, task_key),
-    )
+    _remove_uncompleted_unsafe(profile_id, _allowed_categories(profile))
+    generate_daily_tasks(profile_id)
 
-    conn.commit()
-    conn.close()
-    return True
 
 def regenerate_daily_tasks(profile_id: int):
     """
@@ -354,7 +374,7 @@ def regenerate_daily_tasks(profile_id: int):
     Safely clears uncompleted tasks and re-rolls.
     """
 
-    today = _today()
+    today = _today(profile_id)
     conn = get_connection()
     cur = conn.cursor()
 
@@ -364,8 +384,8 @@ def regenerate_daily_tasks(profile_id: int):
         DELETE FROM assigned_tasks
         WHERE profile_id = ?
           AND date = ?
-          AND task_key NOT IN (
-              SELECT task_key
+          AND task_id NOT IN (
+              SELECT task_id
               FROM task_history
               WHERE profile_id = ?
                 AND date = ?
@@ -377,6 +397,8 @@ def regenerate_daily_tasks(profile_id: int):
 
     conn.commit()
     conn.close()
+    invalidate_board(profile_id)
 
-    # Re-generate safely
-    generate_daily_tasks(profile_id)
+    # Re-generate safely. A fresh RNG: the daily seed would just
+    # hand back the same picks.
+    generate_daily_tasks(profile_id, rng=random.Random())
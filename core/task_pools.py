@@ -1,5 +1,8 @@
+import hashlib
 import random
 
+from core.templates import precompile
+
 #############################################
 # REQUIRED / DAILY ANCHORS
 #############################################
@@ -145,65 +148,127 @@ def _task(key, text, category, required=False):
         "hidden": 1,
     }
 
+def _stable_key(prefix, text):
+    # Content-derived, so the same template gets the same key in every
+    # process and after restarts (unlike the salted built-in hash()).
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+    return f"{prefix}_{digest}"
+
+
+def _keyed(prefix, templates):
+    return [(_stable_key(prefix, t), t) for t in templates]
+
+
+INTIMACY_KEYED = _keyed("intimacy", INTIMACY_TASKS)
+
+KINK_KEYED = {
+    1: _keyed("kink", KINK_LEVEL_1),
+    2: _keyed("kink", KINK_LEVEL_2),
+    3: _keyed("kink", KINK_LEVEL_3),
+}
+
+EXPLICIT_KEYED = _keyed("explicit", EXPLICIT_TASKS)
+
+#############################################
+# CATALOG — task_key -> task (built once)
+#############################################
+
+def _build_catalog():
+    catalog = {}
+
+    def add(items, category, required=False):
+        for key, text in items:
+            if key in catalog:
+                raise ValueError(f"Duplicate task key in pools: {key}")
+            catalog[key] = _task(key, text, category, required)
+
+    add(DAILY_REQUIRED, "required", True)
+    add(BASIC_CARE.items(), "basic")
+    add(FUN_TASKS.items(), "fun")
+    add(SMALL_CLEANING.items(), "small_clean")
+    add(MEDIUM_CLEANING.items(), "medium_clean")
+    add(HEAVY_CLEANING.items(), "heavy_clean")
+    add(REGRESSIVE_TASKS.items(), "regressive")
+    add(INTIMACY_KEYED, "intimacy")
+    for level in KINK_KEYED.values():
+        add(level, "kink")
+    add(EXPLICIT_KEYED, "explicit")
+
+    return catalog
+
+
+TASK_CATALOG = _build_catalog()
+
+# Validates every placeholder at import and warms the render cache
+precompile(t["text"] for t in TASK_CATALOG.values())
+
+
+def get_task(task_key):
+    """
+    Single dict lookup. Returns the normalized task or None.
+    """
+    return TASK_CATALOG.get(task_key)
+
 #############################################
 # PUBLIC API — ENGINE PICKS FROM HERE
 #############################################
 
-def get_required_tasks():
-    return [_task(k, t, "required", True) for k, t in DAILY_REQUIRED]
+# Per-category arrays, built once (pickers never rebuild lists)
+CATEGORY_TASKS = {}
+for _t in TASK_CATALOG.values():
+    CATEGORY_TASKS.setdefault(_t["category"], []).append(_t)
+CATEGORY_TASKS = {c: tuple(ts) for c, ts in CATEGORY_TASKS.items()}
+
+# get_kink_tasks() has always drawn from level 1 unless asked
+KINK_BY_LEVEL = {
+    level: tuple(TASK_CATALOG[k] for k, _ in keyed)
+    for level, keyed in KINK_KEYED.items()
+}
+
 
+def _pick(tasks, rng):
+    return [dict(rng.choice(tasks))]
+
+
+def get_required_tasks():
+    return [dict(t) for t in CATEGORY_TASKS["required"]]
 
-def get_basic_care():
-    k, t = random.choice(list(BASIC_CARE.items()))
-    return [_task(k, t, "basic")]
 
+def get_basic_care(rng=random):
+    return _pick(CATEGORY_TASKS["basic"], rng)
 
-def get_fun_tasks():
-    k, t = random.choice(list(FUN_TASKS.items()))
-    return [_task(k, t, "fun")]
 
+def get_fun_tasks(rng=random):
+    return _pick(CATEGORY_TASKS["fun"], rng)
 
-def get_small_cleaning():
-    k, t = random.choice(list(SMALL_CLEANING.items()))
-    return [_task(k, t, "small_clean")]
 
+def get_small_cleaning(rng=random):
+    return _pick(CATEGORY_TASKS["small_clean"], rng)
 
-def get_medium_cleaning():
-    k, t = random.choice(list(MEDIUM_CLEANING.items()))
-    return [_task(k, t, "medium_clean")]
 
+def get_medium_cleaning(rng=random):
+    return _pick(CATEGORY_TASKS["medium_clean"], rng)
 
-def get_heavy_cleaning():
-    k, t = random.choice(list(HEAVY_CLEANING.items()))
-    return [_task(k, t, "heavy_clean")]
 
+def get_heavy_cleaning(rng=random):
+    return _pick(CATEGORY_TASKS["heavy_clean"], rng)
 
-def get_regressive_tasks():
-    k, t = random.choice(list(REGRESSIVE_TASKS.items()))
-    return [_task(k, t, "regressive")]
 
+def get_regressive_tasks(rng=random):
+    return _pick(CATEGORY_TASKS["regressive"], rng)
 
-def get_intimacy_tasks():
-    pick = random.choice(INTIMACY_TASKS)
-    return [_task(f"intimacy_{abs(hash(pick))}", pick, "intimacy")]
 
+def get_intimacy_tasks(rng=random):
+    return _pick(CATEGORY_TASKS["intimacy"], rng)
 
-def get_kink_tasks(level=1):
-    pool = {
-        1: KINK_LEVEL_1,
-        2: KINK_LEVEL_2,
-        3: KINK_LEVEL_3,
-    }.get(level, KINK_LEVEL_1)
 
-    pick = random.choice(pool)
-    return [_task(f"kink_{abs(hash(pick))}", pick, "kink")]
+def get_kink_tasks(level=1, rng=random):
+    return _pick(KINK_BY_LEVEL.get(level, KINK_BY_LEVEL[1]), rng)
 
 
-def get_explicit_tasks():
-    pick = random.choice(EXPLICIT_TASKS)
-    return [_task(f"explicit_{abs(hash(pick))}", pick, "explicit")]
+def get_explicit_tasks(rng=random):
+    return _pick(CATEGORY_TASKS["explicit"], rng)
 
 
-def get_safe_required_replacement():
-    k, t = random.choice(DAILY_REQUIRED)
-    return _task(k, t, "required", True)
+def get_safe_required_replacement(rng=random):
+    return dict(rng.choice(CATEGORY_TASKS["required"]))
@@ -1,18 +1,12 @@
-from datetime import date
-
-from core.db import get_connection
-from core.task_engine import generate_daily_tasks, reassess_tasks_for_profile
+from core import clock
+from core.task_engine import (
+    generate_daily_tasks,
+    generate_daily_tasks_bulk,
+    reassess_tasks_for_profile,
+)
 from core.presence import get_active_profile
 
 
-# ─────────────────────────────────────────────
-# DATE (single source of truth)
-# ─────────────────────────────────────────────
-
-def _today() -> str:
-    return date.today().isoformat()
-
-
 # ─────────────────────────────────────────────
 # DAILY RESET
 # ─────────────────────────────────────────────
@@ -22,43 +16,28 @@ def reset_daily_tasks(user_id: str, profile_id: int):
     Called once per day by the scheduler.
 
     Responsibilities:
-    - clear previous days' assigned tasks
-    - clear previous days' task history
     - generate today's tasks via task_engine
-    """
 
-    today = _today()
-
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # Clear assigned tasks before today
-    cur.execute(
-        """
-        DELETE FROM assigned_tasks
-        WHERE profile_id = ?
-          AND date < ?
-        """,
-        (profile_id, today),
-    )
-
-    # Clear task history before today
-    cur.execute(
-        """
-        DELETE FROM task_history
-        WHERE profile_id = ?
-          AND date < ?
-        """,
-        (profile_id, today),
-    )
-
-    conn.commit()
-    conn.close()
+    Previous days stay in the hot tables until core.retention moves
+    them to the archive; nothing is deleted here.
+    """
 
     # Generate today's tasks (engine owns all logic)
     return generate_daily_tasks(profile_id)
 
 
+def reset_all_daily_tasks(timezone=clock.DEFAULT_TIMEZONE) -> int:
+    """
+    Called once per day per timezone bucket by the morning scheduler.
+
+    Same responsibilities as reset_daily_tasks, but for every
+    profile in the bucket at once: a single batch generation pass.
+    Returns the number of tasks generated.
+    """
+
+    return generate_daily_tasks_bulk(timezone, clock.local_today(timezone))
+
+
 # ─────────────────────────────────────────────
 # MID-DAY PRESENCE CHANGE
 # ─────────────────────────────────────────────
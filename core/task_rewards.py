@@ -1,6 +1,8 @@
-from datetime import date
-
+from core import clock, task_catalog, token_ledger
+from core.boss_engine import record_progress
 from core.db import get_connection
+from core.stats import record_completion
+from core.streaks import update_streaks
 from core.completion_messages import get_completion_message
 
 
@@ -16,197 +18,175 @@ REQUIRED_TASK_BONUS = 1
 # DATE (single source of truth)
 # ─────────────────────────────────────────────
 
-def _today() -> str:
-    return date.today().isoformat()
+def _today(profile_id: int) -> str:
+    return clock.profile_today(profile_id)
 
 
 # ─────────────────────────────────────────────
-# PUBLIC ENTRY POINT (CANONICAL)
+# RESULT
 # ─────────────────────────────────────────────
 
-def handle_task_completion(user_id: str, profile_id: int, task_key: str) -> str:
-    """
-    Canonical task completion handler.
+COMPLETED = "completed"
+ALREADY_COMPLETED = "already_completed"
+NOT_ASSIGNED = "not_assigned"
 
-    Responsibilities:
-    - idempotent completion safety
-    - token rewards
-    - streak updates
-    - returns a completion message template
 
-    UI / theming / injection happens elsewhere.
+class Completion:
+    """
+    Outcome of one completion attempt.
+    tokens is 0 unless this call actually completed the task;
+    bosses lists the boss definitions this completion defeated.
     """
 
-    today = _today()
+    __slots__ = ("status", "category", "is_required", "tokens", "bosses")
 
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # ─────────────────────────────────────────
-    # Validate task exists for today
-    # ─────────────────────────────────────────
-    cur.execute(
-        """
-        SELECT category, is_required
-        FROM assigned_tasks
-        WHERE profile_id = ?
-          AND task_key = ?
-          AND date = ?
-        """,
-        (profile_id, task_key, today),
-    )
-    task = cur.fetchone()
-
-    if not task:
-        conn.close()
-        return "That task isn’t available anymore."
+    def __init__(self, status: str, category=None, is_required=False, tokens=0, bosses=()):
+        self.status = status
+        self.category = category
+        self.is_required = is_required
+        self.tokens = tokens
+        self.bosses = bosses
 
-    category = task["category"]
-    is_required = bool(task["is_required"])
+    @property
+    def completed(self) -> bool:
+        return self.status == COMPLETED
 
-    # ─────────────────────────────────────────
-    # Idempotency guard (NO double rewards)
-    # ─────────────────────────────────────────
-    cur.execute(
+    @property
+    def message(self) -> str:
         """
-        SELECT completed
-        FROM task_history
-        WHERE profile_id = ?
-          AND task_key = ?
-          AND date = ?
-        """,
-        (profile_id, task_key, today),
-    )
-    existing = cur.fetchone()
-
-    if existing and existing["completed"]:
-        conn.close()
-        return "That task was already completed 💜"
-
-    # ─────────────────────────────────────────
-    # Record completion FIRST (source of truth)
-    # ─────────────────────────────────────────
-    cur.execute(
+        Raw template; render with names + tokens=self.tokens.
         """
-        INSERT OR REPLACE INTO task_history
-        (profile_id, date, task_key, completed)
-        VALUES (?, ?, ?, 1)
-        """,
-        (profile_id, today, task_key),
-    )
-
-    # ─────────────────────────────────────────
-    # Token rewards (isolated + scalable)
-    # ─────────────────────────────────────────
-    total_tokens = BASE_TOKEN_REWARD
-    if is_required:
-        total_tokens += REQUIRED_TASK_BONUS
-
-    cur.execute(
-        """
-        UPDATE users
-        SET tokens = tokens + ?
-        WHERE user_id = ?
-        """,
-        (total_tokens, user_id),
-    )
-
-    # ─────────────────────────────────────────
-    # Streak updates
-    # ─────────────────────────────────────────
-    _update_streaks(
-        cur=cur,
-        profile_id=profile_id,
-        category=category,
-        is_required=is_required,
-        today=today,
-    )
-
-    conn.commit()
-    conn.close()
-
-    # ─────────────────────────────────────────
-    # Return completion message (template only)
-    # ─────────────────────────────────────────
-    return get_completion_message(category, is_required)
+        if self.status == NOT_ASSIGNED:
+            return "That task isn’t available anymore."
+        if self.status == ALREADY_COMPLETED:
+            return "That task was already completed 💜"
+        return get_completion_message(self.category, self.is_required)
+
+
+# ─────────────────────────────────────────────
+# SQL
+# ─────────────────────────────────────────────
 
+# Validation + idempotent insert in one statement: the SELECT yields
+# nothing if the task isn't assigned today, and the conflict clause
+# only flips rows that are not completed yet. RETURNING is empty when
+# nothing changed, so no reward can be paid twice.
+_RECORD_COMPLETION_SQL = """
+    INSERT INTO task_history
+    (profile_id, date, task_id, category_id, completed, points_awarded)
+    SELECT
+        a.profile_id,
+        a.date,
+        a.task_id,
+        a.category_id,
+        1,
+        :base + CASE WHEN a.is_required THEN :bonus ELSE 0 END
+    FROM assigned_tasks a
+    WHERE a.profile_id = :profile_id
+      AND a.date = :today
+      AND a.task_id = :task_id
+    ON CONFLICT (profile_id, date, task_id) DO UPDATE SET
+        completed = 1,
+        category_id = excluded.category_id,
+        points_awarded = excluded.points_awarded
+    WHERE task_history.completed = 0
+    RETURNING
+        category_id,
+        points_awarded,
+        (
+            SELECT a.is_required
+            FROM assigned_tasks a
+            WHERE a.profile_id = task_history.profile_id
+              AND a.date = task_history.date
+              AND a.task_id = task_history.task_id
+        ) AS is_required
+"""
 
 # ─────────────────────────────────────────────
-# STREAK HANDLING (ISOLATED + SAFE)
+# PUBLIC ENTRY POINT (CANONICAL)
 # ─────────────────────────────────────────────
 
-def _update_streaks(
-    *,
-    cur,
-    profile_id: int,
-    category: str,
-    is_required: bool,
-    today: str,
-):
+def complete_task(profile_id: int, task_key: str, today: str = None) -> Completion:
     """
-    Updates profile_streaks safely.
+    Canonical task completion engine.
 
-    This function:
-    - assumes an open transaction
-    - never commits
-    - only mutates relevant fields
+    One short write transaction:
+    - validate + idempotent record (INSERT ... SELECT ... ON CONFLICT ... RETURNING)
+    - token credit + ledger row (owner resolved through profiles)
+    - streak UPSERT (once per day, see core.streaks)
+    - stats rollups (see core.stats)
+    - boss progress (+ defeat settlement, see core.boss_engine)
+
+    The slow path (telling "not assigned" from "already done") only
+    runs after the transaction, when nothing was written.
     """
+    task_id = task_catalog.task_id(task_key)
+    if task_id is None:
+        return Completion(NOT_ASSIGNED)
 
-    # Ensure row exists
-    cur.execute(
-        """
-        INSERT OR IGNORE INTO profile_streaks (profile_id)
-        VALUES (?)
-        """,
-        (profile_id,),
-    )
-
-    # Required streak
-    if is_required:
-        cur.execute(
-            """
-            UPDATE profile_streaks
-            SET
-                required_streak = required_streak + 1,
-                last_required_day = ?
-            WHERE profile_id = ?
-            """,
-            (today, profile_id),
-        )
+    today = today or _today(profile_id)
+    params = {"profile_id": profile_id, "today": today, "task_id": task_id}
 
-    # Category-specific streaks
-    if category == "intimacy":
-        cur.execute(
-            """
-            UPDATE profile_streaks
-            SET
-                intimacy_streak = intimacy_streak + 1,
-                last_intimacy_day = ?
-            WHERE profile_id = ?
-            """,
-            (today, profile_id),
-        )
+    conn = get_connection()
+    cur = conn.cursor()
 
-    elif category == "kink":
+    try:
         cur.execute(
-            """
-            UPDATE profile_streaks
-            SET
-                kink_streak = kink_streak + 1,
-                last_kink_day = ?
-            WHERE profile_id = ?
-            """,
-            (today, profile_id),
+            _RECORD_COMPLETION_SQL,
+            {**params, "base": BASE_TOKEN_REWARD, "bonus": REQUIRED_TASK_BONUS},
         )
+        row = cur.fetchone()
+
+        if row:
+            category = task_catalog.category_name(row["category_id"])
+            is_required = bool(row["is_required"])
+            tokens = row["points_awarded"]
+
+            owner, balance = token_ledger.credit_profile_with(
+                cur, profile_id, tokens, token_ledger.TASK, ref=task_key
+            )
+            update_streaks(cur, profile_id, category, is_required, today)
+            record_completion(cur, profile_id, today, category, tokens)
+            bosses = record_progress(cur, profile_id, category, today)
+            if bosses and owner is not None:
+                # Defeats credited the owner again
+                balance = token_ledger.balance_with(cur, owner)
+
+        conn.commit()
+
+        if row:
+            token_ledger.remember(owner, balance)
+            return Completion(COMPLETED, category, is_required, tokens, bosses)
 
-    elif category == "explicit":
         cur.execute(
             """
-            UPDATE profile_streaks
-            SET
-                explicit_streak = explicit_streak + 1,
-                last_explicit_day = ?
+            SELECT 1
+            FROM assigned_tasks
             WHERE profile_id = ?
+              AND date = ?
+              AND task_id = ?
             """,
-            (today, profile_id),
+            (profile_id, today, task_id),
         )
+        if cur.fetchone():
+            return Completion(ALREADY_COMPLETED)
+        return Completion(NOT_ASSIGNED)
+
+    except Exception:
+        # Nothing of a half-applied completion survives
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def handle_task_completion(user_id: str, profile_id: int, task_key: str) -> str:
+    """
+    Message-only wrapper around complete_task().
+
+    user_id is kept for existing callers; tokens are credited to
+    the profile's owner.
+
+    UI / theming / injection happens elsewhere.
+    """
+    return complete_task(profile_id, task_key).message
@@ -0,0 +1,176 @@
+import bisect
+import hashlib
+import random
+from itertools import accumulate
+
+from core import task_pools
+
+# ─────────────────────────────────────────────
+# WEIGHTS (precomputed once)
+# ─────────────────────────────────────────────
+
+SOFT_WEIGHTS = (
+    ("basic", 35),
+    ("fun", 30),
+    ("regressive", 25),
+    ("small_clean", 10),
+)
+
+ADULT_WEIGHTS = (
+    ("basic", 25),
+    ("fun", 20),
+    ("small_clean", 20),
+    ("medium_clean", 15),
+    ("heavy_clean", 5),
+)
+
+INTIMACY_WEIGHT = ("intimacy", 10)
+KINK_WEIGHT = ("kink", 7)
+
+EXPLICIT_CHANCE = 0.18
+
+# Pools drawn per category. Kink only ever drew from level 1.
+SELECTION_POOLS = {
+    **task_pools.CATEGORY_TASKS,
+    "kink": task_pools.KINK_BY_LEVEL[1],
+}
+
+
+def _weight_table(weights):
+    categories = tuple(c for c, _ in weights)
+    cumulative = tuple(accumulate(w for _, w in weights))
+    return categories, cumulative
+
+
+# (soft, intimacy_ok, kink_ok) -> (categories, cumulative weights)
+_WEIGHT_TABLES = {
+    (True, False, False): _weight_table(SOFT_WEIGHTS),
+}
+for _intimacy in (False, True):
+    for _kink in (False, True):
+        _WEIGHT_TABLES[(False, _intimacy, _kink)] = _weight_table(
+            ADULT_WEIGHTS
+            + ((INTIMACY_WEIGHT,) if _intimacy else ())
+            + ((KINK_WEIGHT,) if _kink else ())
+        )
+
+
+# ─────────────────────────────────────────────
+# SEEDING
+# ─────────────────────────────────────────────
+
+def seed_for(profile_id: int, date_str: str) -> int:
+    """
+    Stable across processes (no salted hash()).
+    """
+    digest = hashlib.sha256(f"{profile_id}:{date_str}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def rng_for(profile_id: int, date_str: str) -> random.Random:
+    return random.Random(seed_for(profile_id, date_str))
+
+
+# ─────────────────────────────────────────────
+# SELECTION (pure)
+# ─────────────────────────────────────────────
+
+def select_tasks(profile, existing: dict, rng: random.Random, limit: int, pools=None) -> list[dict]:
+    """
+    Picks the tasks to add for one profile.
+
+    - profile: row/dict with age_context and *_opt_in flags
+    - existing: {task_key: category} already assigned today
+    - rng: any random.Random; the same seed gives the same tasks
+    - limit: total tasks wanted for the day
+    - pools: category -> tasks override (defaults to SELECTION_POOLS)
+
+    Samples without replacement. Every loop iteration either adds a
+    task, retires an exhausted category, or spends the one explicit
+    roll, so the number of draws is bounded and it cannot spin.
+    """
+    tasks = [t for t in task_pools.get_required_tasks() if t["key"] not in existing]
+
+    remaining = limit - len(existing) - len(tasks)
+    if remaining <= 0:
+        return tasks
+
+    soft = profile["age_context"] in ("cloudy", "regressive")
+    categories, cumulative = _WEIGHT_TABLES[(
+        soft,
+        not soft and bool(profile["intimacy_opt_in"]),
+        not soft and bool(profile["kink_opt_in"]),
+    )]
+    categories, cumulative = list(categories), list(cumulative)
+
+    explicit_roll = (
+        not soft
+        and bool(profile["explicit_opt_in"])
+        and "explicit" not in existing.values()
+    )
+
+    pools = SELECTION_POOLS if pools is None else pools
+    taken = set(existing)
+    available = {}
+
+    def candidates(category):
+        if category not in available:
+            available[category] = [
+                t for t in pools.get(category, ()) if t["key"] not in taken
+            ]
+        return available[category]
+
+    def take(pool, index):
+        # swap-pop: O(1) removal, order is irrelevant for sampling
+        pool[index], pool[-1] = pool[-1], pool[index]
+        task = dict(pool.pop())
+        taken.add(task["key"])
+        tasks.append(task)
+
+    while remaining > 0 and categories:
+        if explicit_roll and rng.random() <= EXPLICIT_CHANCE:
+            explicit_roll = False
+            pool = candidates("explicit")
+            if pool:
+                take(pool, rng.randrange(len(pool)))
+                remaining -= 1
+            continue
+
+        i = bisect.bisect_right(cumulative, rng.random() * cumulative[-1])
+        i = min(i, len(categories) - 1)
+        pool = candidates(categories[i])
+
+        if not pool:
+            # Category exhausted: drop it and rebuild the cumulative table
+            del categories[i]
+            weights = [b - a for a, b in zip([0] + cumulative[:-1], cumulative)]
+            del weights[i]
+            cumulative = list(accumulate(weights))
+            continue
+
+        take(pool, rng.randrange(len(pool)))
+        remaining -= 1
+
+    return tasks
+
+
+class TaskSelector:
+    """
+    select_tasks bound to a daily limit and pool set, so batch
+    generation and benchmarks can share one configured instance.
+    """
+
+    __slots__ = ("limit", "pools")
+
+    def __init__(self, limit: int, pools=None):
+        self.limit = limit
+        self.pools = SELECTION_POOLS if pools is None else pools
+
+    def select(self, profile, existing: dict, rng: random.Random) -> list[dict]:
+        return select_tasks(profile, existing, rng, self.limit, self.pools)
+
+    def select_for_day(self, profile, existing: dict, date_str: str) -> list[dict]:
+        """
+        Reproducible: same profile, date and existing tasks -> same picks.
+        """
+        return self.select(profile, existing, rng_for(profile["profile_id"], date_str))
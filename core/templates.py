@@ -0,0 +1,128 @@
+import string
+from functools import lru_cache
+
+# ------------------------------------------------------------
+# Placeholders templates may use
+# ------------------------------------------------------------
+
+ALLOWED_FIELDS = frozenset({
+    "sub",
+    "dom",
+    "they",
+    "them",
+    "their",
+    "theirs",
+    "themself",
+    "tokens",
+})
+
+_formatter = string.Formatter()
+
+
+class TemplateError(ValueError):
+    pass
+
+
+# ------------------------------------------------------------
+# Compiled template
+# ------------------------------------------------------------
+
+class CompiledTemplate:
+    """
+    A template parsed once into (literal, field) pairs.
+
+    render() is a join over precomputed parts — no re-parsing.
+    Fields missing from the supplied names are left as-is
+    (e.g. "{tokens}") instead of discarding the whole render.
+    """
+
+    __slots__ = ("source", "fields", "_parts", "_literal")
+
+    def __init__(self, source: str, parts: tuple):
+        self.source = source
+        self._parts = parts
+        self.fields = frozenset(f for _, f in parts if f is not None)
+        # Field-free text, with {{ }} already unescaped by the parser
+        self._literal = None if self.fields else "".join(l for l, _ in parts)
+
+    def render(self, names: dict) -> str:
+        if self._literal is not None:
+            return self._literal
+
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = names.get(field)
+                out.append("{" + field + "}" if value is None else str(value))
+        return "".join(out)
+
+
+def _parse(source: str) -> tuple:
+    parts = []
+
+    for literal, field, spec, conversion in _formatter.parse(source):
+        if field is None:
+            parts.append((literal, None))
+            continue
+
+        if field not in ALLOWED_FIELDS:
+            raise TemplateError(f"Unknown placeholder {{{field}}} in template: {source!r}")
+        if spec or conversion:
+            raise TemplateError(f"Format specs are not supported ({{{field}}}) in template: {source!r}")
+
+        parts.append((literal, field))
+
+    return tuple(parts)
+
+
+# ------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------
+
+@lru_cache(maxsize=4096)
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    Lenient compile for text assembled at runtime.
+
+    Malformed text (stray braces, unknown fields) compiles to a
+    template that renders itself unchanged.
+    """
+    try:
+        return CompiledTemplate(source, _parse(source))
+    except (TemplateError, ValueError):
+        return CompiledTemplate(source, ((source, None),))
+
+
+def precompile(sources) -> list[CompiledTemplate]:
+    """
+    Strict compile for templates shipped with the bot.
+
+    Call at import time: a malformed template raises TemplateError
+    at startup instead of silently rendering raw later. The results
+    also warm compile_template's cache.
+    """
+    compiled = []
+
+    for source in sources:
+        try:
+            _parse(source)
+        except TemplateError:
+            raise
+        except ValueError as e:  # unbalanced braces
+            raise TemplateError(f"Malformed template {source!r}: {e}") from e
+
+        compiled.append(compile_template(source))
+
+    return compiled
+
+
+def render(source: str, names: dict) -> str:
+    return compile_template(source).render(names)
+
+
+def render_many(sources, names: dict) -> list[str]:
+    """
+    Renders a batch (e.g. a whole task list) against one name map.
+    """
+    return [compile_template(source).render(names) for source in sources]
@@ -1,5 +1,8 @@
 from typing import Dict
-from core.db import get_connection
+
+import discord
+
+from core.templates import render
 
 # ------------------------------------------------------------
 # Defaults
@@ -73,74 +76,101 @@ def parse_pronouns(raw: str | None) -> Dict[str, str]:
 
 
 # ------------------------------------------------------------
-# Active Profile Resolution
+# Profile Context (resolved once per interaction)
 # ------------------------------------------------------------
 
-def get_active_profile(user_id: str):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT
-            profile_id,
-            name,
-            pronouns,
-            nickname
-        FROM profiles
-        WHERE user_id = ?
-          AND is_active = 1
-        """,
-        (user_id,),
-    )
+class ProfileContext:
+    """
+    Everything rendering needs about who is here:
+    - the active profile row
+    - parsed pronouns
+    - the resolved {sub} name
 
-    row = cur.fetchone()
-    conn.close()
-    return row
+    Build it once and pass it through instead of re-querying
+    the active profile for every line of text.
+    """
+
+    __slots__ = ("profile", "pronouns", "sub_name", "names")
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.pronouns = parse_pronouns(profile["pronouns"] if profile else None)
+        self.sub_name = (
+            profile["nickname"]
+            if profile and profile["nickname"]
+            else profile["name"]
+            if profile
+            else DEFAULT_SUB_FALLBACK
+        )
+        self.names = {
+            "sub": self.sub_name,
+            "dom": DEFAULT_DOM_FALLBACK,
+            **self.pronouns,
+        }
+
+    @property
+    def profile_id(self):
+        return self.profile["profile_id"] if self.profile else None
+
+
+NO_PROFILE_CONTEXT = ProfileContext(None)
 
 
 # ------------------------------------------------------------
 # Name & Pronoun Injection (CANONICAL)
 # ------------------------------------------------------------
 
-def inject_names(template: str, user_id: str) -> str:
+def inject_names(
+    template: str,
+    user_id: str | None = None,
+    *,
+    context: ProfileContext | None = None,
+    **values,
+) -> str:
     """
     Replaces:
     - {sub}
     - {dom}
     - pronoun tokens (they/them/their/etc)
+    - any extra **values (e.g. tokens=2)
 
-    Safe, silent failure.
-    """
+    Pass a ProfileContext when rendering many lines; otherwise the
+    (cached) context for user_id is used.
 
-    profile = get_active_profile(user_id)
+    Templates are compiled once and cached (core.templates);
+    unknown placeholders are left untouched.
+    """
 
-    sub_name = (
-        profile["nickname"]
-        if profile and profile["nickname"]
-        else profile["name"]
-        if profile
-        else DEFAULT_SUB_FALLBACK
-    )
+    if context is None:
+        from core.presence import get_profile_context
 
-    pronouns = parse_pronouns(profile["pronouns"] if profile else None)
+        context = (
+            get_profile_context(str(user_id)) if user_id is not None else None
+        ) or NO_PROFILE_CONTEXT
 
-    context = {
-        "sub": sub_name,
-        "dom": DEFAULT_DOM_FALLBACK,
-        **pronouns,
-    }
-
-    try:
-        return template.format(**context)
-    except Exception:
-        return template
+    names = {**context.names, **values} if values else context.names
+    return render(template, names)
 
 
 # ------------------------------------------------------------
 # Theme Colors
 # ------------------------------------------------------------
 
+purple_doll_colors = {
+    "primary": 0x9B59B6,
+    "soft": 0xC39BD3,
+    "accent": 0xA078C8,
+}
+
+
+def build_embed(title: str, description: str, color: int = purple_doll_colors["accent"]):
+    return discord.Embed(
+        title=title,
+        description=description,
+        color=color,
+    )
+
+
 def get_theme_colors(theme: str):
     THEMES = {
         "purple": {
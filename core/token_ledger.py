@@ -0,0 +1,235 @@
+import logging
+import threading
+
+from core.db import get_connection
+
+log = logging.getLogger("tinyregg.token_ledger")
+
+
+# ─────────────────────────────────────────────
+# LEDGER
+# ─────────────────────────────────────────────
+# Every change to users.tokens goes through this module. Each one
+# writes a token_ledger row (delta, reason, balance after) in the same
+# transaction, so a balance is always explained by its rows.
+#
+# Two layers:
+# - *_with(cur, ...) functions run inside the caller's transaction,
+#   never commit, and return the new balance
+# - the caller publishes that balance with remember() after commit
+#   (credit / debit own their transaction and do both)
+
+TASK = "task"
+BOSS = "boss"
+REDEEM = "redeem"
+GRANT = "grant"
+SPEND = "spend"
+ADMIN_ADD = "admin_add"
+ADMIN_REMOVE = "admin_remove"
+OPENING = "opening"
+
+_ENTRY_SQL = """
+    INSERT INTO token_ledger (user_id, delta, reason, ref, balance)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def credit_with(cur, user_id: str, amount: int, reason: str, ref=None):
+    """
+    Adds tokens to a user. Returns the new balance, or None if the
+    user doesn't exist. Never commits.
+    """
+    cur.execute(
+        "UPDATE users SET tokens = tokens + ? WHERE user_id = ? RETURNING tokens",
+        (amount, user_id),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+
+    cur.execute(_ENTRY_SQL, (user_id, amount, reason, ref, row["tokens"]))
+    return row["tokens"]
+
+
+def credit_profile_with(cur, profile_id: int, amount: int, reason: str, ref=None):
+    """
+    credit_with for a profile's owner.
+    Returns (user_id, new balance), or (None, None). Never commits.
+    """
+    cur.execute(
+        """
+        UPDATE users
+        SET tokens = tokens + ?
+        WHERE user_id = (
+            SELECT user_id FROM profiles WHERE profile_id = ?
+        )
+        RETURNING user_id, tokens
+        """,
+        (amount, profile_id),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None, None
+
+    cur.execute(_ENTRY_SQL, (row["user_id"], amount, reason, ref, row["tokens"]))
+    return row["user_id"], row["tokens"]
+
+
+def debit_with(cur, user_id: str, amount: int, reason: str, ref=None, clamp=False):
+    """
+    Takes tokens from a user. Returns the new balance, or None if the
+    user doesn't exist or can't afford it. With clamp, takes what is
+    there instead (balance floors at 0). Never commits.
+    """
+    cur.execute("SELECT tokens FROM users WHERE user_id = ?", (user_id,))
+    row = cur.fetchone()
+    if row is None:
+        return None
+
+    if row["tokens"] < amount:
+        if not clamp:
+            return None
+        amount = max(row["tokens"], 0)
+
+    cur.execute(
+        "UPDATE users SET tokens = tokens - ? WHERE user_id = ? RETURNING tokens",
+        (amount, user_id),
+    )
+    balance = cur.fetchone()["tokens"]
+
+    cur.execute(_ENTRY_SQL, (user_id, -amount, reason, ref, balance))
+    return balance
+
+
+def balance_with(cur, user_id: str):
+    cur.execute("SELECT tokens FROM users WHERE user_id = ?", (user_id,))
+    row = cur.fetchone()
+    return row["tokens"] if row else None
+
+
+# ─────────────────────────────────────────────
+# BALANCE CACHE
+# ─────────────────────────────────────────────
+# user_id -> balance. Filled on read, overwritten after every
+# committed write, so shop rendering never touches the DB twice.
+
+_balances: dict[str, int] = {}
+_balance_generation: dict[str, int] = {}
+_balance_lock = threading.Lock()
+
+
+def remember(user_id: str, balance):
+    """
+    Publishes a committed balance. Call after commit only — a rolled
+    back write must never reach the cache.
+    """
+    if user_id is None or balance is None:
+        return
+
+    with _balance_lock:
+        _balances[user_id] = balance
+        _balance_generation[user_id] = _balance_generation.get(user_id, 0) + 1
+
+
+def forget(user_id: str = None):
+    """
+    Drops one cached balance (or all of them). For writes that bypass
+    the ledger, such as deleting a user.
+    """
+    with _balance_lock:
+        if user_id is None:
+            _balances.clear()
+            for key in _balance_generation:
+                _balance_generation[key] += 1
+        else:
+            _balances.pop(user_id, None)
+            _balance_generation[user_id] = _balance_generation.get(user_id, 0) + 1
+
+
+def get_balance(user_id: str) -> int:
+    """
+    Cached balance (0 for unknown users). Sync (DB-bound on a miss)
+    — call through run_db from async code.
+    """
+    with _balance_lock:
+        if user_id in _balances:
+            return _balances[user_id]
+        generation = _balance_generation.get(user_id, 0)
+
+    conn = get_connection()
+    try:
+        balance = balance_with(conn.cursor(), user_id)
+    finally:
+        conn.close()
+
+    if balance is None:
+        return 0
+
+    with _balance_lock:
+        # A write landed while we were reading: serve, don't cache.
+        if _balance_generation.get(user_id, 0) == generation:
+            _balances[user_id] = balance
+
+    return balance
+
+
+# ─────────────────────────────────────────────
+# STANDALONE MUTATIONS (own transaction)
+# ─────────────────────────────────────────────
+
+def _apply(fn, user_id: str, *args, **kwargs):
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        balance = fn(cur, user_id, *args, **kwargs)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    remember(user_id, balance)
+    return balance
+
+
+def credit(user_id: str, amount: int, reason: str = GRANT, ref=None):
+    """
+    Returns the new balance, or None if the user doesn't exist.
+    """
+    return _apply(credit_with, user_id, amount, reason, ref)
+
+
+def debit(user_id: str, amount: int, reason: str = SPEND, ref=None, clamp=False):
+    """
+    Returns the new balance, or None if the user doesn't exist or
+    can't afford it (nothing is taken then).
+    """
+    return _apply(debit_with, user_id, amount, reason, ref, clamp=clamp)
+
+
+# ─────────────────────────────────────────────
+# AUDIT
+# ─────────────────────────────────────────────
+
+def recent_entries(user_id: str, limit: int = 10):
+    """
+    Newest ledger rows for a user.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT delta, reason, ref, balance, created_at
+        FROM token_ledger
+        WHERE user_id = ?
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (user_id, limit),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
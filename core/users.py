@@ -1,3 +1,4 @@
+from core import token_ledger
 from core.db import get_connection
 
 
@@ -37,20 +38,7 @@ def ensure_user(user_id: str):
 # ─────────────────────────────────────────────────────────────
 
 def add_tokens(user_id: str, amount: int):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        UPDATE users
-        SET tokens = tokens + ?
-        WHERE user_id = ?
-        """,
-        (amount, user_id),
-    )
-
-    conn.commit()
-    conn.close()
+    token_ledger.credit(user_id, amount)
 
 
 def spend_tokens(user_id: str, amount: int) -> bool:
@@ -58,31 +46,14 @@ def spend_tokens(user_id: str, amount: int) -> bool:
     Attempts to spend tokens.
     Returns True if successful.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        "SELECT tokens FROM users WHERE user_id = ?",
-        (user_id,),
-    )
-    row = cur.fetchone()
+    return token_ledger.debit(user_id, amount) is not None
 
-    if not row or row["tokens"] < amount:
-        conn.close()
-        return False
 
-    cur.execute(
-        """
-        UPDATE users
-        SET tokens = tokens - ?
-        WHERE user_id = ?
-        """,
-        (amount, user_id),
-    )
-
-    conn.commit()
-    conn.close()
-    return True
+def get_tokens(user_id: str) -> int:
+    """
+    Current balance, served from the ledger's cache.
+    """
+    return token_ledger.get_balance(user_id)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -8,8 +8,11 @@ from discord import app_commands
 from dotenv import load_dotenv
 
 from core.db import initialize_db
-from core import admin_services
+from core.async_db import run_db
+from core import admin_services, async_db
 from core.presence import get_active_profile
+from core.task_buttons import TaskCompleteButton
+from core.dm_dispatcher import DMDispatcher
 
 # ─────────────────────────────────────────────────────────────
 # CONSTANTS
@@ -30,6 +33,10 @@ CLOUDY_ACTIVITY = discord.Activity(
     name="Take your time — Regg is here."
 )
 
+CORE_EXTENSIONS = (
+    "core.scheduler",
+)
+
 # ─────────────────────────────────────────────────────────────
 # ENVIRONMENT
 # ─────────────────────────────────────────────────────────────
@@ -80,8 +87,28 @@ class MyBot(commands.Bot):
         )
 
     async def setup_hook(self):
-        initialize_db()
-        log.info("Database initialized")
+        storage = await run_db(initialize_db)
+        log.info(
+            "Database initialized (%s)",
+            ", ".join(f"{k}={v}" for k, v in storage.items()),
+        )
+
+        # Durable outbound DMs (drains message_queue once ready)
+        self.dm_dispatcher = DMDispatcher(self)
+        self.dm_resolver = self.dm_dispatcher.resolver
+        self.dm_dispatcher.start()
+
+        # Persistent buttons: routes clicks on any /tasks message,
+        # including ones sent before this restart
+        self.add_dynamic_items(TaskCompleteButton)
+
+        # Core cogs that live outside ./cogs
+        for ext in CORE_EXTENSIONS:
+            try:
+                await self.load_extension(ext)
+                log.info(f"Loaded core extension: {ext}")
+            except Exception:
+                log.exception(f"Failed to load core extension {ext}")
 
         for filename in os.listdir("./cogs"):
             if filename.endswith(".py") and not filename.startswith("_"):
@@ -95,6 +122,12 @@ class MyBot(commands.Bot):
         await self.tree.sync()
         log.info("Slash commands synced")
 
+    async def close(self):
+        if hasattr(self, "dm_dispatcher"):
+            await self.dm_dispatcher.stop()
+        await super().close()
+        async_db.shutdown()
+
 bot = MyBot()
 
 # ─────────────────────────────────────────────────────────────
@@ -105,8 +138,12 @@ bot.dispatch_daily_tasks = admin_services.dispatch_daily_tasks
 bot.force_daily_reset = admin_services.force_daily_reset
 bot.reset_user_state = admin_services.reset_user_state
 bot.set_user_streak = admin_services.set_user_streak
+bot.repair_streaks = admin_services.repair_streaks
+bot.backfill_stats = admin_services.backfill_stats
 bot.add_tokens = admin_services.add_tokens
 bot.remove_tokens = admin_services.remove_tokens
+bot.token_history = admin_services.token_history
+bot.job_runs = admin_services.job_runs
 
 # ─────────────────────────────────────────────────────────────
 # CRITICAL FIX: PREFIX COMMANDS
@@ -164,7 +201,7 @@ async def presence_watcher():
 
     if PRESENCE_OWNER_ID:
         try:
-            profile = get_active_profile(str(PRESENCE_OWNER_ID))
+            profile = await run_db(get_active_profile, str(PRESENCE_OWNER_ID))
             if profile and profile["age_context"] == "cloudy":
                 is_cloudy = True
         except Exception as e:
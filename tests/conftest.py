@@ -0,0 +1,107 @@
+import sqlite3
+
+import pytest
+
+from core import boss_engine, clock, db, migrations, task_catalog, token_ledger
+
+
+class MemoryPool(db.ConnectionPool):
+    """
+    A pool over one in-memory connection: every get_connection() in
+    the code under test sees the same database, and close() only
+    rolls back what was left open.
+    """
+
+    def __init__(self):
+        super().__init__(db.DB_PATH, max_idle=1)
+        self.raw = sqlite3.connect(":memory:", check_same_thread=False)
+        self.raw.row_factory = sqlite3.Row
+        db.apply_connection_pragmas(self.raw)
+
+    def _connect(self):
+        return self.raw
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+
+    def close_all(self):
+        self.raw.close()
+
+
+class _StopAfterBaseSchema(Exception):
+    pass
+
+
+def _reset_caches():
+    with clock._profile_lock:
+        clock._profile_timezones.clear()
+    token_ledger.forget()
+    boss_engine.reload_bosses()
+    task_catalog._loaded = False
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    """
+    An empty in-memory database behind core.db.get_connection.
+    """
+    pool = MemoryPool()
+    monkeypatch.setattr(db, "_pool", pool)
+    _reset_caches()
+    yield pool.raw
+    _reset_caches()
+    pool.close_all()
+
+
+@pytest.fixture
+def fresh_db(memory_db):
+    """
+    The full current schema, as a new install gets it.
+    """
+    db.initialize_db()
+    return memory_db
+
+
+@pytest.fixture
+def baseline_db(memory_db, monkeypatch):
+    """
+    Only the base schema (schema version 0), as every database looked
+    before the migration runner existed.
+    """
+    def stop(conn):
+        raise _StopAfterBaseSchema
+
+    with monkeypatch.context() as patch:
+        patch.setattr(migrations, "run_migrations", stop)
+        with pytest.raises(_StopAfterBaseSchema):
+            db.initialize_db()
+
+    return memory_db
+
+
+@pytest.fixture
+def cur(fresh_db):
+    return fresh_db.cursor()
+
+
+def _add_profile(conn, profile_id: int, user_id: str = None, tokens: int = 0):
+    user_id = user_id or f"u{profile_id}"
+    conn.execute(
+        "INSERT OR IGNORE INTO users (user_id, tokens, has_started) VALUES (?, ?, 1)",
+        (user_id, tokens),
+    )
+    conn.execute(
+        "INSERT INTO profiles (profile_id, user_id, name, is_active) VALUES (?, ?, ?, 1)",
+        (profile_id, user_id, f"P{profile_id}"),
+    )
+    conn.commit()
+    return user_id
+
+
+@pytest.fixture
+def add_profile():
+    """
+    add_profile(conn, profile_id, user_id=None, tokens=0) -> user_id
+    """
+    return _add_profile
@@ -0,0 +1,65 @@
+import pytest
+
+from core import boss_engine, clock
+
+BOSS = {
+    "key": "test_boss",
+    "name": "Test Boss",
+    "window": "week",
+    "requirements": {"*": 3},
+    "reward_tokens": 10,
+    "message": "Beaten.",
+}
+
+
+@pytest.fixture
+def boss(monkeypatch):
+    monkeypatch.setattr(boss_engine, "_bosses", (BOSS,))
+    # Monday 2026-03-09 everywhere: the current window is 2026-W11
+    monkeypatch.setattr(clock, "local_today", lambda tz_name=None: "2026-03-09")
+    return BOSS
+
+
+def _user(conn, add_profile, profile_id, tz):
+    user_id = add_profile(conn, profile_id)
+    conn.execute("UPDATE users SET timezone = ? WHERE user_id = ?", (tz, user_id))
+    conn.commit()
+
+
+def _defeat(conn, profile_id, stamp):
+    conn.execute(
+        "INSERT INTO boss_history (profile_id, boss_name, defeated_at) VALUES (?, ?, ?)",
+        (profile_id, BOSS["name"], stamp),
+    )
+    conn.commit()
+
+
+def _marked(conn):
+    key = boss_engine.progress_key(BOSS, "2026-W11", boss_engine.DEFEATED)
+    rows = conn.execute(
+        "SELECT profile_id FROM boss_progress WHERE requirement_key = ? ORDER BY profile_id",
+        (key,),
+    )
+    return [r[0] for r in rows]
+
+
+@pytest.mark.parametrize(
+    "tz, stamp, in_window",
+    [
+        # Monday 01:00 in Auckland (UTC+13), still Sunday in UTC
+        ("Pacific/Auckland", "2026-03-08 12:00:00", True),
+        # Sunday 23:00 in Auckland: last week
+        ("Pacific/Auckland", "2026-03-08 10:00:00", False),
+        # Sunday 22:00 in Chicago (UTC-5), already Monday in UTC
+        ("America/Chicago", "2026-03-09 03:00:00", False),
+        # Monday 00:30 in Chicago
+        ("America/Chicago", "2026-03-09 05:30:00", True),
+    ],
+)
+def test_rebuild_marks_defeats_by_local_window(fresh_db, add_profile, boss, tz, stamp, in_window):
+    _user(fresh_db, add_profile, 1, tz)
+    _defeat(fresh_db, 1, stamp)
+
+    boss_engine.rebuild_progress()
+
+    assert _marked(fresh_db) == ([1] if in_window else [])
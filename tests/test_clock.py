@@ -0,0 +1,20 @@
+from datetime import date
+
+from core import clock
+
+
+def test_local_date_of_utc_stamp():
+    assert clock.local_date("2026-03-08 12:00:00", "Pacific/Auckland") == "2026-03-09"
+    assert clock.local_date("2026-03-09 03:00:00", "America/Chicago") == "2026-03-08"
+    assert clock.local_date("2026-03-09T03:00:00+00:00", "UTC") == "2026-03-09"
+
+
+def test_day_start_stamp_follows_dst():
+    # Chicago is UTC-6 before 2026-03-08 and UTC-5 after
+    assert clock.day_start_stamp(date(2026, 3, 7), "America/Chicago") == "2026-03-07 06:00:00"
+    assert clock.day_start_stamp(date(2026, 3, 9), "America/Chicago") == "2026-03-09 05:00:00"
+    assert clock.day_start_stamp(date(2026, 3, 9), "Pacific/Auckland") == "2026-03-08 11:00:00"
+
+
+def test_unknown_zone_falls_back_to_default():
+    assert clock.local_date("2026-03-09 03:00:00", "Not/AZone") == "2026-03-08"
@@ -0,0 +1,24 @@
+import sqlite3
+
+from core import db, migrations
+
+
+def test_describe_storage_on_memory_db():
+    conn = sqlite3.connect(":memory:")
+    db.apply_connection_pragmas(conn)
+
+    settings = db.describe_storage(conn)
+    conn.close()
+
+    # :memory: reports no mmap_size row; that must not break startup
+    assert settings["mmap_size"] is None
+    assert settings["journal_mode"] == "memory"
+    assert settings["synchronous"] in ("off", "normal", "full", "extra")
+    assert settings["foreign_keys"] is True
+
+
+def test_initialize_db_reports_settings(memory_db):
+    settings = db.initialize_db()
+
+    assert settings["schema_version"] == migrations.LATEST_VERSION
+    assert settings["mmap_size"] is None
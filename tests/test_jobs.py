@@ -0,0 +1,34 @@
+from core import jobs
+
+
+def _run(job_name, scheduled_for, total=None, finished=False):
+    jobs.claim_run(job_name, scheduled_for)
+    if total is not None:
+        jobs.start_run(job_name, scheduled_for, total)
+    if finished:
+        jobs.finish_run(job_name, scheduled_for)
+
+
+def test_recent_runs_matches_job_and_its_timezones(fresh_db):
+    _run("morning_prompt:America/Chicago", "2026-03-01T09:00", total=3, finished=True)
+    _run("morning_prompt:Asia/Tokyo", "2026-03-02T09:00", total=5)
+    _run("morning_prompt_v2", "2026-03-03T09:00")
+    _run("archive", "2026-03-04T00:00")
+
+    rows = jobs.recent_runs("morning_prompt")
+
+    assert [r["job_name"] for r in rows] == [
+        "morning_prompt:Asia/Tokyo",
+        "morning_prompt:America/Chicago",
+    ]
+    assert (rows[0]["total"], rows[0]["finished_at"]) == (5, None)
+    assert rows[1]["finished_at"] is not None
+
+
+def test_recent_runs_without_name_lists_all_newest_first(fresh_db):
+    for day in range(1, 5):
+        _run("archive", f"2026-03-0{day}T00:00")
+
+    rows = jobs.recent_runs(limit=2)
+
+    assert [r["scheduled_for"] for r in rows] == ["2026-03-04T00:00", "2026-03-03T00:00"]
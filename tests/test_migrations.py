@@ -0,0 +1,184 @@
+import logging
+
+import pytest
+
+from core import db, migrations, task_catalog
+from core.task_catalog import CATEGORY_CODES
+
+DAY = "2026-03-02"
+PREVIOUS_DAY = "2026-03-01"
+
+
+def _versions(conn):
+    return [r[0] for r in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+# ─────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────
+
+def test_columns_lists_table_columns(baseline_db):
+    cur = baseline_db.cursor()
+
+    assert {"task_key", "points_awarded"} <= migrations._columns(cur, "task_history")
+    assert "category" not in migrations._columns(cur, "task_history")
+
+
+def test_has_unique_key_matches_exact_columns(baseline_db):
+    cur = baseline_db.cursor()
+    cur.execute("CREATE TABLE loose (a INTEGER, b INTEGER)")
+
+    assert migrations._has_unique_key(cur, "task_history", ("profile_id", "date", "task_key"))
+    assert not migrations._has_unique_key(cur, "task_history", ("profile_id", "date"))
+    assert not migrations._has_unique_key(cur, "loose", ("a", "b"))
+
+
+# ─────────────────────────────────────────────
+# FRESH DATABASE
+# ─────────────────────────────────────────────
+
+def test_fresh_db_is_at_latest_version(fresh_db):
+    assert _versions(fresh_db) == list(range(1, migrations.LATEST_VERSION + 1))
+    assert {"task_id", "category_id"} <= migrations._columns(fresh_db.cursor(), "task_history")
+
+
+def test_rerun_is_a_no_op(fresh_db):
+    assert migrations.run_migrations(fresh_db) == migrations.LATEST_VERSION
+    db.initialize_db()
+
+    assert _versions(fresh_db) == list(range(1, migrations.LATEST_VERSION + 1))
+
+
+def test_fresh_db_hot_queries_use_indexes(fresh_db):
+    assert db.check_query_plans(fresh_db) == []
+
+
+# ─────────────────────────────────────────────
+# BASELINE DATABASE (schema version 0)
+# ─────────────────────────────────────────────
+
+@pytest.fixture
+def old_rows(baseline_db, add_profile):
+    """
+    Old-shape rows: text task keys and categories, task_history
+    without its category column, one retired key and one category
+    the current code no longer knows.
+    """
+    add_profile(baseline_db, 1, tokens=5)
+    baseline_db.executemany(
+        """
+        INSERT INTO assigned_tasks (profile_id, date, task_key, category, is_required)
+        VALUES (1, ?, ?, ?, ?)
+        """,
+        [
+            (PREVIOUS_DAY, "eat_meal", "required", 1),
+            (DAY, "eat_meal", "required", 1),
+            (DAY, "retired_task", "retired_category", 0),
+        ],
+    )
+    baseline_db.executemany(
+        """
+        INSERT INTO task_history (profile_id, date, task_key, completed, points_awarded)
+        VALUES (1, ?, ?, 1, 2)
+        """,
+        [
+            (PREVIOUS_DAY, "eat_meal"),
+            (DAY, "eat_meal"),
+            (DAY, "retired_task"),
+        ],
+    )
+    baseline_db.commit()
+    return baseline_db
+
+
+def test_baseline_db_migrates_to_integer_ids(old_rows):
+    db.initialize_db()
+
+    assert _versions(old_rows) == list(range(1, migrations.LATEST_VERSION + 1))
+    for table in ("assigned_tasks", "task_history"):
+        columns = migrations._columns(old_rows.cursor(), table)
+        assert {"task_id", "category_id"} <= columns
+        assert not {"task_key", "category"} & columns
+
+    rows = old_rows.execute(
+        """
+        SELECT t.task_key, h.category_id
+        FROM task_history h
+        JOIN task_catalog t ON t.task_id = h.task_id
+        WHERE h.date = ?
+        ORDER BY t.task_key
+        """,
+        (DAY,),
+    ).fetchall()
+    retired = task_catalog.category_code("retired_category")
+    assert [tuple(r) for r in rows] == [
+        ("eat_meal", CATEGORY_CODES["required"]),
+        ("retired_task", retired),
+    ]
+    assert retired > max(CATEGORY_CODES.values())
+    assert task_catalog.task_key(task_catalog.task_id("retired_task")) == "retired_task"
+
+
+def test_baseline_db_runs_repairs(old_rows):
+    db.initialize_db()
+
+    row = old_rows.execute(
+        "SELECT required_streak, last_required_day FROM profile_streaks WHERE profile_id = 1"
+    ).fetchone()
+    assert tuple(row) == (2, DAY)
+
+    rows = old_rows.execute(
+        "SELECT date, category, completed FROM daily_stats ORDER BY date, category"
+    ).fetchall()
+    assert [tuple(r) for r in rows] == [
+        (PREVIOUS_DAY, "required", 1),
+        (DAY, "required", 1),
+        (DAY, "retired_category", 1),
+    ]
+
+
+def test_baseline_db_opens_the_ledger(old_rows):
+    db.initialize_db()
+
+    rows = old_rows.execute("SELECT user_id, delta, reason, balance FROM token_ledger").fetchall()
+    assert [tuple(r) for r in rows] == [("u1", 5, "opening", 5)]
+
+
+def test_baseline_db_hot_queries_use_indexes(old_rows):
+    db.initialize_db()
+
+    assert db.check_query_plans(old_rows) == []
+
+
+def test_failed_repair_still_advances_version(old_rows, monkeypatch, caplog):
+    def broken(cur):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(migrations.REPAIRS, 8, broken)
+
+    with caplog.at_level(logging.ERROR, logger="tinyregg.migrations"):
+        db.initialize_db()
+
+    assert "Repair for migration 8 failed" in caplog.text
+    assert _versions(old_rows)[-1] == migrations.LATEST_VERSION
+    # The other repair still ran
+    assert old_rows.execute("SELECT COUNT(*) FROM daily_stats").fetchone()[0] == 3
+
+
+def test_one_shot_reminders_get_due_at_in_sql(baseline_db, add_profile):
+    add_profile(baseline_db, 1)
+    baseline_db.executemany(
+        "INSERT INTO reminders (profile_id, hour, minute, text, is_recurring) VALUES (1, ?, ?, ?, ?)",
+        [
+            (9, 5, "DEADLINE: taxes — due 2026-04-15", 0),
+            (7, 0, "call back", 0),
+            (8, 30, "drink water", 1),
+        ],
+    )
+    baseline_db.commit()
+
+    db.initialize_db()
+
+    today = baseline_db.execute("SELECT date('now')").fetchone()[0]
+    rows = baseline_db.execute("SELECT due_at FROM reminders ORDER BY reminder_id").fetchall()
+    assert [r[0] for r in rows] == ["2026-04-15T09:05", f"{today}T07:00", None]
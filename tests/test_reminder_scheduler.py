@@ -0,0 +1,225 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core import clock, reminder_scheduler
+from core.reminder_scheduler import ReminderScheduler, next_due
+
+UTC = timezone.utc
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+def _reminder(hour=9, minute=0, tz="America/Chicago", last_fired_at=None, **extra):
+    return {
+        "reminder_id": 1,
+        "hour": hour,
+        "minute": minute,
+        "text": "drink water",
+        "is_recurring": 1,
+        "due_at": None,
+        "last_fired_at": last_fired_at,
+        "user_id": "u1",
+        "profile_id": 1,
+        "timezone": tz,
+        **extra,
+    }
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.wakes = 0
+
+    def wake(self):
+        self.wakes += 1
+
+
+class FakeBot:
+    def __init__(self):
+        self.dm_dispatcher = FakeDispatcher()
+
+
+@pytest.fixture
+def now(monkeypatch):
+    fake = FakeClock(_utc(2026, 3, 10, 12, 0))
+    monkeypatch.setattr(clock, "now_utc", fake)
+    return fake
+
+
+# ─────────────────────────────────────────────
+# DUE-TIME RULES
+# ─────────────────────────────────────────────
+
+def test_recurring_is_due_at_next_local_time():
+    # 12:00 UTC is 07:00 in Chicago (CDT): 09:00 is still ahead today
+    due = next_due(_reminder(), _utc(2026, 3, 10, 12, 0))
+
+    assert due == datetime(2026, 3, 10, 9, 0, tzinfo=clock.zone("America/Chicago"))
+    assert due.astimezone(UTC) == _utc(2026, 3, 10, 14, 0)
+
+
+def test_recurring_follows_dst_in_the_owners_zone():
+    # Chicago springs forward on 2026-03-08: 09:00 moves from 15:00 to 14:00 UTC
+    reminder = _reminder(last_fired_at="2026-03-07T09:00")
+
+    due = next_due(reminder, _utc(2026, 3, 7, 16, 0))
+
+    assert due.astimezone(UTC) == _utc(2026, 3, 8, 14, 0)
+
+
+def test_missed_days_catch_up_once():
+    # Down since the 5th: only the latest missed slot is due
+    reminder = _reminder(last_fired_at="2026-03-05T09:00")
+
+    due = next_due(reminder, _utc(2026, 3, 10, 12, 0))
+
+    assert due.replace(tzinfo=None) == datetime(2026, 3, 9, 9, 0)
+
+
+def test_one_shot_fires_once():
+    reminder = _reminder(is_recurring=0, due_at="2026-03-09T09:00")
+
+    assert next_due(reminder, _utc(2026, 3, 10, 12, 0)).replace(tzinfo=None) == datetime(2026, 3, 9, 9, 0)
+    reminder["last_fired_at"] = "2026-03-09T09:00"
+    assert next_due(reminder, _utc(2026, 3, 10, 12, 0)) is None
+
+
+# ─────────────────────────────────────────────
+# SCHEDULER (injected clock, real heap and DB)
+# ─────────────────────────────────────────────
+
+def _add_reminder(conn, hour=9, minute=0, last_fired_at=None, is_recurring=1, due_at=None):
+    cur = conn.execute(
+        """
+        INSERT INTO reminders (profile_id, hour, minute, text, is_recurring, due_at, last_fired_at)
+        VALUES (1, ?, ?, 'drink water', ?, ?, ?)
+        """,
+        (hour, minute, is_recurring, due_at, last_fired_at),
+    )
+    conn.commit()
+    return cur.lastrowid
+
+
+def _queued(conn):
+    return [r[0] for r in conn.execute("SELECT dedupe_key FROM message_queue ORDER BY id")]
+
+
+@pytest.fixture
+def user(fresh_db, add_profile):
+    user_id = add_profile(fresh_db, 1)
+    fresh_db.execute("UPDATE users SET timezone = 'America/Chicago' WHERE user_id = ?", (user_id,))
+    fresh_db.commit()
+    return user_id
+
+
+@pytest.fixture
+def scheduler():
+    return ReminderScheduler(FakeBot())
+
+
+def test_catch_up_after_downtime_fires_once(fresh_db, user, scheduler, now):
+    reminder_id = _add_reminder(fresh_db, last_fired_at="2026-03-05T09:00")
+
+    async def run():
+        await scheduler.add(reminder_id)
+        await scheduler._fire_due(now())
+        # Later passes the same morning find nothing new to fire
+        now.now += timedelta(minutes=30)
+        await scheduler._fire_due(now())
+
+    asyncio.run(run())
+
+    assert _queued(fresh_db) == [f"reminder:{reminder_id}:2026-03-09T09:00"]
+    assert scheduler.bot.dm_dispatcher.wakes == 1
+    # Next due is today's slot, not another missed day
+    assert scheduler._due[reminder_id].replace(tzinfo=None) == datetime(2026, 3, 10, 9, 0)
+    row = fresh_db.execute("SELECT last_fired_at FROM reminders").fetchone()
+    assert row[0] == "2026-03-09T09:00"
+
+
+def test_next_slot_fires_on_time(fresh_db, user, scheduler, now):
+    reminder_id = _add_reminder(fresh_db)
+
+    async def run():
+        await scheduler.add(reminder_id)
+        now.now = _utc(2026, 3, 10, 13, 59)
+        await scheduler._fire_due(now())
+        assert _queued(fresh_db) == []
+
+        now.now = _utc(2026, 3, 10, 14, 0)
+        await scheduler._fire_due(now())
+
+    asyncio.run(run())
+
+    assert _queued(fresh_db) == [f"reminder:{reminder_id}:2026-03-10T09:00"]
+    assert scheduler._due[reminder_id].astimezone(UTC) == _utc(2026, 3, 11, 14, 0)
+
+
+def test_missed_one_shot_fires_once_and_is_deleted(fresh_db, user, scheduler, now):
+    reminder_id = _add_reminder(fresh_db, is_recurring=0, due_at="2026-03-09T09:00")
+
+    async def run():
+        await scheduler.add(reminder_id)
+        await scheduler._fire_due(now())
+        await scheduler._fire_due(now())
+
+    asyncio.run(run())
+
+    assert _queued(fresh_db) == [f"reminder:{reminder_id}:2026-03-09T09:00"]
+    assert fresh_db.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 0
+    assert reminder_id not in scheduler._due
+
+
+def test_timezone_change_reschedules_in_new_zone(fresh_db, user, scheduler, now):
+    reminder_id = _add_reminder(fresh_db)
+
+    async def run():
+        await scheduler.add(reminder_id)
+        assert scheduler._due[reminder_id].astimezone(UTC) == _utc(2026, 3, 10, 14, 0)
+
+        clock.set_user_timezone(user, "Asia/Tokyo")
+        await scheduler.reload_user(user)
+
+        # The old Chicago slot is stale in the heap and must not fire
+        now.now = _utc(2026, 3, 10, 14, 0)
+        await scheduler._fire_due(now())
+        assert _queued(fresh_db) == []
+
+        # 09:00 in Tokyo on the 11th is 00:00 UTC
+        now.now = _utc(2026, 3, 11, 0, 0)
+        await scheduler._fire_due(now())
+
+    asyncio.run(run())
+
+    assert _queued(fresh_db) == [f"reminder:{reminder_id}:2026-03-11T09:00"]
+    assert str(scheduler._due[reminder_id].tzinfo) == "Asia/Tokyo"
+
+
+def test_failed_firing_stays_due(fresh_db, user, scheduler, now, monkeypatch):
+    reminder_id = _add_reminder(fresh_db, last_fired_at="2026-03-08T09:00")
+
+    def broken(reminders, slots):
+        raise RuntimeError("disk full")
+
+    async def run():
+        await scheduler.add(reminder_id)
+        with monkeypatch.context() as patch:
+            patch.setattr(reminder_scheduler, "_fire", broken)
+            with pytest.raises(RuntimeError):
+                await scheduler._fire_due(now())
+        await scheduler._fire_due(now())
+
+    asyncio.run(run())
+
+    assert _queued(fresh_db) == [f"reminder:{reminder_id}:2026-03-09T09:00"]
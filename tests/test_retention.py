@@ -0,0 +1,136 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from core import retention, stats, streaks, task_catalog
+from core.task_catalog import CATEGORY_CODES
+
+
+def _day(offset: int) -> str:
+    return (date(2026, 3, 1) + timedelta(days=offset)).isoformat()
+
+
+@pytest.fixture
+def profile(fresh_db, add_profile):
+    add_profile(fresh_db, 1)
+    return 1
+
+
+@pytest.fixture
+def keys(fresh_db):
+    """
+    Two catalogued task keys of the "required" category.
+    """
+    cur = fresh_db.cursor()
+    cur.execute(
+        "SELECT task_key FROM task_catalog WHERE category_id = ? ORDER BY task_id LIMIT 2",
+        (CATEGORY_CODES["required"],),
+    )
+    return [r["task_key"] for r in cur.fetchall()]
+
+
+def _assign(conn, day, key, completed, profile_id=1):
+    value = task_catalog.task_id(key)
+    code = CATEGORY_CODES["required"]
+    conn.execute(
+        "INSERT INTO assigned_tasks (profile_id, date, task_id, category_id, is_required) VALUES (?, ?, ?, ?, 1)",
+        (profile_id, day, value, code),
+    )
+    conn.execute(
+        """
+        INSERT INTO task_history (profile_id, date, task_id, category_id, completed, points_awarded)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (profile_id, day, value, code, completed, 2 if completed else 0),
+    )
+
+
+def _streak(conn):
+    cur = conn.cursor()
+    streaks.rebuild_streaks_with(cur)
+    cur.execute("SELECT required_streak, last_required_day FROM profile_streaks WHERE profile_id = 1")
+    row = tuple(cur.fetchone())
+    conn.rollback()
+    return row
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# ─────────────────────────────────────────────
+# ARCHIVE
+# ─────────────────────────────────────────────
+
+def test_archive_packs_one_row_per_day(fresh_db, profile, keys):
+    _assign(fresh_db, _day(0), keys[0], completed=1)
+    _assign(fresh_db, _day(0), keys[1], completed=0)
+    fresh_db.commit()
+
+    assert retention.archive_all() == 1
+
+    assert _count(fresh_db, "assigned_tasks") == 0
+    assert _count(fresh_db, "task_history") == 0
+
+    row = fresh_db.execute("SELECT * FROM task_archive").fetchone()
+    assert (row["date"], row["assigned"], row["completed"], row["tokens"]) == (_day(0), 2, 1, 2)
+
+    tasks = [dict(zip(retention.TASK_FIELDS, t)) for t in json.loads(row["tasks"])]
+    assert sorted(t["task_key"] for t in tasks) == sorted(keys)
+    assert {t["category"] for t in tasks} == {"required"}
+
+
+def test_archive_history_keeps_hot_days(fresh_db, profile, keys):
+    _assign(fresh_db, _day(0), keys[0], completed=1)
+    _assign(fresh_db, _day(5), keys[0], completed=1)
+    fresh_db.commit()
+
+    assert retention.archive_history(before=_day(5), batch_size=1) == 1
+
+    assert fresh_db.execute("SELECT date FROM task_history").fetchall()[0][0] == _day(5)
+    assert fresh_db.execute("SELECT date FROM task_archive").fetchall()[0][0] == _day(0)
+
+
+def test_archiving_a_day_twice_merges(fresh_db, profile, keys):
+    _assign(fresh_db, _day(0), keys[0], completed=1)
+    fresh_db.commit()
+    retention.archive_all()
+
+    _assign(fresh_db, _day(0), keys[1], completed=1)
+    fresh_db.commit()
+    retention.archive_all()
+
+    row = fresh_db.execute("SELECT assigned, completed, tokens, tasks FROM task_archive").fetchone()
+    assert (row["assigned"], row["completed"], row["tokens"]) == (2, 2, 4)
+    assert len(json.loads(row["tasks"])) == 2
+
+
+# ─────────────────────────────────────────────
+# REBUILDS ACROSS TIERS
+# ─────────────────────────────────────────────
+
+def test_streak_rebuild_survives_archiving(fresh_db, profile, keys):
+    for offset in (0, 1, 2, 3):
+        _assign(fresh_db, _day(offset), keys[0], completed=1)
+    fresh_db.commit()
+    before = _streak(fresh_db)
+
+    retention.archive_history(before=_day(2))
+
+    assert _count(fresh_db, "task_archive") == 2
+    assert _streak(fresh_db) == before == (4, _day(3))
+
+
+def test_rollups_survive_archiving(fresh_db, profile, keys):
+    cur = fresh_db.cursor()
+    for offset in (0, 1):
+        _assign(fresh_db, _day(offset), keys[0], completed=1)
+        stats.record_completion(cur, profile, _day(offset), "required", 2)
+    fresh_db.commit()
+    daily = [tuple(r) for r in fresh_db.execute("SELECT * FROM daily_stats ORDER BY date")]
+
+    retention.archive_all()
+    stats.backfill_rollups()
+
+    assert [tuple(r) for r in fresh_db.execute("SELECT * FROM daily_stats ORDER BY date")] == daily
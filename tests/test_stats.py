@@ -0,0 +1,132 @@
+import pytest
+
+from core import stats
+from core.task_catalog import CATEGORY_CODES
+
+
+@pytest.fixture
+def profile(fresh_db, add_profile):
+    add_profile(fresh_db, 1)
+    return 1
+
+
+def _rows(cur, sql):
+    cur.execute(sql)
+    return [tuple(r) for r in cur.fetchall()]
+
+
+# ─────────────────────────────────────────────
+# WEEK KEYS
+# ─────────────────────────────────────────────
+
+@pytest.mark.parametrize(
+    "day, key",
+    [
+        ("2026-10-18", 202642),
+        # 2026 has 53 ISO weeks; 1 Jan 2027 is a Friday in week 53
+        ("2026-12-31", 202653),
+        ("2027-01-01", 202653),
+        ("2027-01-04", 202701),
+        # 30 Dec 2024 is a Monday in week 1 of 2025
+        ("2024-12-29", 202452),
+        ("2024-12-30", 202501),
+    ],
+)
+def test_week_key_uses_iso_year(day, key):
+    assert stats.week_key(day) == key
+
+
+def test_week_keys_order_across_years():
+    assert stats.week_key("2026-12-31") < stats.week_key("2027-01-04")
+
+
+# ─────────────────────────────────────────────
+# COMPLETION PATH
+# ─────────────────────────────────────────────
+
+def test_record_completion_counts_both_rollups(cur, profile):
+    stats.record_completion(cur, profile, "2026-10-18", "basic", 1)
+    stats.record_completion(cur, profile, "2026-10-18", "basic", 2)
+    stats.record_completion(cur, profile, "2026-10-18", None, 1)
+
+    assert _rows(cur, "SELECT category, completed, tokens FROM daily_stats ORDER BY category") == [
+        ("basic", 2, 3),
+        (stats.UNCATEGORIZED, 1, 1),
+    ]
+    assert _rows(cur, "SELECT week, tasks_completed FROM weekly") == [(202642, 3)]
+
+
+def test_week_boundary_splits_weekly_rows(cur, profile):
+    stats.record_completion(cur, profile, "2027-01-03", "fun", 1)  # Sunday, week 53
+    stats.record_completion(cur, profile, "2027-01-04", "fun", 1)  # Monday, week 1
+
+    assert _rows(cur, "SELECT week, tasks_completed FROM weekly ORDER BY week") == [
+        (202653, 1),
+        (202701, 1),
+    ]
+
+
+# ─────────────────────────────────────────────
+# BACKFILL
+# ─────────────────────────────────────────────
+
+def _history(cur, day, category, task_id, tokens=1, completed=1):
+    cur.execute(
+        """
+        INSERT INTO task_history (profile_id, date, task_id, category_id, completed, points_awarded)
+        VALUES (1, ?, ?, ?, ?, ?)
+        """,
+        (day, task_id, CATEGORY_CODES.get(category), completed, tokens),
+    )
+
+
+def test_backfill_matches_incremental(cur, profile):
+    done = [
+        ("2026-12-31", "basic", 1, 1),
+        ("2026-12-31", "required", 2, 2),
+        ("2027-01-04", "basic", 1, 1),
+    ]
+    for day, category, task_id, tokens in done:
+        _history(cur, day, category, task_id, tokens)
+        stats.record_completion(cur, profile, day, category, tokens)
+    _history(cur, "2027-01-04", "fun", 3, completed=0)
+
+    daily = _rows(cur, "SELECT * FROM daily_stats ORDER BY date, category")
+    weekly = _rows(cur, "SELECT * FROM weekly ORDER BY week")
+
+    stats.backfill_rollups_with(cur)
+
+    assert _rows(cur, "SELECT * FROM daily_stats ORDER BY date, category") == daily
+    assert _rows(cur, "SELECT * FROM weekly ORDER BY week") == weekly
+
+
+def test_backfill_is_idempotent_and_keeps_bonus(cur, profile):
+    _history(cur, "2026-10-18", "basic", 1)
+    cur.execute("INSERT INTO weekly (profile_id, week, bonus_awarded) VALUES (1, 202642, 1)")
+    cur.execute("INSERT INTO boss_history (profile_id, boss_name, defeated_at) VALUES (1, 'b', '2026-10-18 12:00:00')")
+
+    stats.backfill_rollups_with(cur)
+    first = _rows(cur, "SELECT * FROM weekly")
+    stats.backfill_rollups_with(cur)
+
+    assert _rows(cur, "SELECT * FROM weekly") == first
+    cur.execute("SELECT tasks_completed, bosses_defeated, bonus_awarded FROM weekly")
+    assert tuple(cur.fetchone()) == (1, 1, 1)
+
+
+def test_backfill_keeps_days_no_longer_in_history(cur, profile):
+    stats.record_completion(cur, profile, "2025-01-01", "basic", 1)
+
+    stats.backfill_rollups_with(cur)
+
+    assert _rows(cur, "SELECT date, completed FROM daily_stats") == [("2025-01-01", 1)]
+
+
+def test_backfill_counts_bosses_in_the_owners_week(cur, profile):
+    cur.execute("UPDATE users SET timezone = 'Pacific/Auckland'")
+    # Sunday 12:00 UTC is already Monday (week 11) in Auckland
+    cur.execute("INSERT INTO boss_history (profile_id, boss_name, defeated_at) VALUES (1, 'b', '2026-03-08 12:00:00')")
+
+    stats.backfill_rollups_with(cur)
+
+    assert _rows(cur, "SELECT week, bosses_defeated FROM weekly") == [(202611, 1)]
@@ -0,0 +1,182 @@
+from datetime import date, timedelta
+
+import pytest
+
+from core import streaks
+from core.task_catalog import CATEGORY_CODES
+
+
+def _day(offset: int) -> str:
+    return (date(2026, 3, 1) + timedelta(days=offset)).isoformat()
+
+
+def _complete(cur, day: str, category: str = "basic", is_required: bool = False, profile_id: int = 1):
+    streaks.update_streaks(cur, profile_id, category, is_required, day)
+
+
+def _history(cur, day: str, category: str, task_id: int = 1, profile_id: int = 1):
+    cur.execute(
+        """
+        INSERT INTO task_history (profile_id, date, task_id, category_id, completed, points_awarded)
+        VALUES (?, ?, ?, ?, 1, 1)
+        """,
+        (profile_id, day, task_id, CATEGORY_CODES[category]),
+    )
+
+
+@pytest.fixture
+def profile(fresh_db, add_profile):
+    add_profile(fresh_db, 1)
+    return 1
+
+
+@pytest.fixture
+def grace_one(monkeypatch):
+    monkeypatch.setattr(streaks, "GRACE_DAYS", 1)
+
+
+# ─────────────────────────────────────────────
+# POLICY
+# ─────────────────────────────────────────────
+
+def test_grace_from_allows_grace_days_of_gap(grace_one):
+    # Last counted two days ago: one missed day in between is forgiven
+    assert streaks._grace_from("2026-03-10") == "2026-03-08"
+
+
+@pytest.mark.parametrize(
+    "grace, today, oldest",
+    [
+        (0, "2024-01-01", "2023-12-31"),
+        (1, "2024-01-01", "2023-12-30"),
+        (0, "2024-03-01", "2024-02-29"),  # leap day
+        (1, "2023-03-01", "2023-02-27"),
+    ],
+)
+def test_grace_from_crosses_month_and_year(monkeypatch, grace, today, oldest):
+    monkeypatch.setattr(streaks, "GRACE_DAYS", grace)
+
+    assert streaks._grace_from(today) == oldest
+
+
+# ─────────────────────────────────────────────
+# COMPLETION PATH
+# ─────────────────────────────────────────────
+
+def test_first_completion_starts_at_one(cur, profile):
+    _complete(cur, _day(0), is_required=True)
+
+    assert streaks.current_streaks_with(cur, profile, _day(0))["required"] == 1
+
+
+def test_same_day_counts_once(cur, profile):
+    for _ in range(3):
+        _complete(cur, _day(0), is_required=True)
+
+    assert streaks.current_streaks_with(cur, profile, _day(0))["required"] == 1
+
+
+def test_consecutive_days_grow(cur, profile):
+    for offset in range(4):
+        _complete(cur, _day(offset), is_required=True)
+
+    assert streaks.current_streaks_with(cur, profile, _day(3))["required"] == 4
+
+
+def test_gap_within_grace_keeps_streak(cur, profile, grace_one):
+    _complete(cur, _day(0), is_required=True)
+    _complete(cur, _day(1), is_required=True)
+    _complete(cur, _day(3), is_required=True)  # day 2 missed
+
+    assert streaks.current_streaks_with(cur, profile, _day(3))["required"] == 3
+
+
+def test_gap_beyond_grace_resets(cur, profile, grace_one):
+    _complete(cur, _day(0), is_required=True)
+    _complete(cur, _day(1), is_required=True)
+    _complete(cur, _day(4), is_required=True)  # days 2 and 3 missed
+
+    assert streaks.current_streaks_with(cur, profile, _day(4))["required"] == 1
+
+
+def test_late_completion_never_rewinds(cur, profile):
+    _complete(cur, _day(5), is_required=True)
+    _complete(cur, _day(4), is_required=True)
+
+    cur.execute("SELECT required_streak, last_required_day FROM profile_streaks")
+    row = cur.fetchone()
+    assert (row["required_streak"], row["last_required_day"]) == (1, _day(5))
+
+
+def test_lapsed_streak_reads_zero(cur, profile, grace_one):
+    _complete(cur, _day(0), is_required=True)
+
+    assert streaks.current_streaks_with(cur, profile, _day(2))["required"] == 1
+    assert streaks.current_streaks_with(cur, profile, _day(3))["required"] == 0
+
+
+def test_category_feeds_only_its_streak(cur, profile):
+    _complete(cur, _day(0), category="regressive")
+
+    current = streaks.current_streaks_with(cur, profile, _day(0))
+    assert current["regression"] == 1
+    assert current["required"] == 0
+    assert current["intimacy"] == 0
+
+
+def test_required_category_counts_without_flag(cur, profile):
+    _complete(cur, _day(0), category="required")
+
+    assert streaks.current_streaks_with(cur, profile, _day(0))["required"] == 1
+
+
+def test_unknown_profile_reads_all_zero(cur):
+    assert streaks.current_streaks_with(cur, 999, _day(0)) == {name: 0 for name in streaks.STREAKS}
+
+
+# ─────────────────────────────────────────────
+# REBUILD
+# ─────────────────────────────────────────────
+
+def test_rebuild_takes_latest_run(cur, profile, grace_one):
+    for offset in (0, 1, 2, 6, 7, 9):  # run of 3, gap of 3, run of 3 (one forgiven gap)
+        _history(cur, _day(offset), "required")
+
+    streaks.rebuild_streaks_with(cur)
+
+    cur.execute("SELECT required_streak, last_required_day FROM profile_streaks WHERE profile_id = 1")
+    row = cur.fetchone()
+    assert (row["required_streak"], row["last_required_day"]) == (3, _day(9))
+
+
+def test_rebuild_counts_days_not_tasks(cur, profile):
+    _history(cur, _day(0), "intimacy", task_id=1)
+    _history(cur, _day(0), "intimacy", task_id=2)
+    _history(cur, _day(1), "intimacy", task_id=1)
+
+    streaks.rebuild_streaks_with(cur)
+
+    assert streaks.current_streaks_with(cur, profile, _day(1))["intimacy"] == 2
+
+
+def test_rebuild_matches_incremental(cur, profile, grace_one):
+    days = [0, 1, 3, 4, 8, 9, 10, 12]
+    for offset in days:
+        _complete(cur, _day(offset), category="kink")
+        _history(cur, _day(offset), "kink")
+
+    cur.execute("SELECT kink_streak, last_kink_day FROM profile_streaks WHERE profile_id = 1")
+    incremental = tuple(cur.fetchone())
+
+    streaks.rebuild_streaks_with(cur)
+
+    cur.execute("SELECT kink_streak, last_kink_day FROM profile_streaks WHERE profile_id = 1")
+    assert tuple(cur.fetchone()) == incremental == (4, _day(12))
+
+
+def test_rebuild_resets_profiles_without_history(cur, profile):
+    _complete(cur, _day(0), is_required=True)
+
+    streaks.rebuild_streaks_with(cur)
+
+    assert streaks.current_streaks_with(cur, profile, _day(0))["required"] == 0
@@ -0,0 +1,171 @@
+import pytest
+
+from core import boss_engine, task_catalog, task_rewards, token_ledger
+from core.task_catalog import CATEGORY_CODES
+
+DAY = "2026-03-02"
+
+
+@pytest.fixture
+def user(fresh_db, add_profile):
+    return add_profile(fresh_db, 1)
+
+
+@pytest.fixture
+def keys(fresh_db):
+    """
+    One catalogued task key per category: {"required": key, ...}.
+    """
+    rows = fresh_db.execute(
+        "SELECT category_id, MIN(task_key) AS task_key FROM task_catalog GROUP BY category_id"
+    ).fetchall()
+    return {task_catalog.category_name(r["category_id"]): r["task_key"] for r in rows}
+
+
+@pytest.fixture
+def no_bosses(monkeypatch):
+    monkeypatch.setattr(boss_engine, "_bosses", ())
+
+
+def _assign(conn, key, category, is_required=False, day=DAY):
+    conn.execute(
+        """
+        INSERT INTO assigned_tasks (profile_id, date, task_id, category_id, is_required)
+        VALUES (1, ?, ?, ?, ?)
+        """,
+        (day, task_catalog.task_id(key), CATEGORY_CODES[category], int(is_required)),
+    )
+    conn.commit()
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _tokens(conn, user_id):
+    return conn.execute("SELECT tokens FROM users WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+# ─────────────────────────────────────────────
+# OUTCOMES
+# ─────────────────────────────────────────────
+
+def test_completion_pays_and_records(fresh_db, user, keys, no_bosses):
+    _assign(fresh_db, keys["required"], "required", is_required=True)
+
+    result = task_rewards.complete_task(1, keys["required"], DAY)
+
+    assert result.status == task_rewards.COMPLETED
+    assert (result.category, result.is_required, result.tokens) == ("required", True, 2)
+    assert _tokens(fresh_db, user) == 2
+    assert token_ledger.get_balance(user) == 2
+    assert fresh_db.execute("SELECT completed FROM task_history").fetchone()[0] == 1
+    assert fresh_db.execute("SELECT required_streak FROM profile_streaks").fetchone()[0] == 1
+    assert tuple(fresh_db.execute("SELECT completed, tokens FROM daily_stats").fetchone()) == (1, 2)
+
+
+def test_completing_twice_pays_once(fresh_db, user, keys, no_bosses):
+    _assign(fresh_db, keys["basic"], "basic")
+
+    first = task_rewards.complete_task(1, keys["basic"], DAY)
+    second = task_rewards.complete_task(1, keys["basic"], DAY)
+
+    assert first.status == task_rewards.COMPLETED
+    assert second.status == task_rewards.ALREADY_COMPLETED
+    assert second.tokens == 0
+    assert _tokens(fresh_db, user) == 1
+    assert _count(fresh_db, "token_ledger") == 1
+    assert fresh_db.execute("SELECT completed FROM daily_stats").fetchone()[0] == 1
+
+
+def test_history_row_without_completion_can_still_complete(fresh_db, user, keys, no_bosses):
+    _assign(fresh_db, keys["basic"], "basic")
+    fresh_db.execute(
+        """
+        INSERT INTO task_history (profile_id, date, task_id, category_id, completed)
+        VALUES (1, ?, ?, ?, 0)
+        """,
+        (DAY, task_catalog.task_id(keys["basic"]), CATEGORY_CODES["basic"]),
+    )
+    fresh_db.commit()
+
+    assert task_rewards.complete_task(1, keys["basic"], DAY).status == task_rewards.COMPLETED
+    assert _tokens(fresh_db, user) == 1
+
+
+def test_unassigned_task_is_not_assigned(fresh_db, user, keys, no_bosses):
+    _assign(fresh_db, keys["basic"], "basic")
+
+    for key, day in (
+        ("never_catalogued", DAY),
+        (keys["fun"], DAY),               # catalogued, not assigned
+        (keys["basic"], "2026-03-01"),    # assigned on another day
+    ):
+        assert task_rewards.complete_task(1, key, day).status == task_rewards.NOT_ASSIGNED
+
+    assert _count(fresh_db, "task_history") == 0
+    assert _tokens(fresh_db, user) == 0
+
+
+def test_already_completed_is_not_not_assigned(fresh_db, user, keys, no_bosses):
+    _assign(fresh_db, keys["basic"], "basic")
+    _assign(fresh_db, keys["fun"], "fun")
+    task_rewards.complete_task(1, keys["basic"], DAY)
+
+    assert task_rewards.complete_task(1, keys["basic"], DAY).status == task_rewards.ALREADY_COMPLETED
+    assert task_rewards.complete_task(1, keys["kink"], DAY).status == task_rewards.NOT_ASSIGNED
+
+
+# ─────────────────────────────────────────────
+# BOSSES
+# ─────────────────────────────────────────────
+
+def test_boss_defeat_pays_in_the_same_transaction(fresh_db, user, keys, monkeypatch):
+    boss = {
+        "key": "test_boss",
+        "name": "Test Boss",
+        "window": "day",
+        "requirements": {"basic": 1},
+        "reward_tokens": 10,
+        "message": "Beaten.",
+    }
+    monkeypatch.setattr(boss_engine, "_bosses", (boss,))
+    _assign(fresh_db, keys["basic"], "basic")
+
+    result = task_rewards.complete_task(1, keys["basic"], DAY)
+
+    assert [b["key"] for b in result.bosses] == ["test_boss"]
+    assert _tokens(fresh_db, user) == 11
+    assert token_ledger.get_balance(user) == 11
+    assert _count(fresh_db, "boss_history") == 1
+    assert _count(fresh_db, "message_queue") == 1
+
+
+# ─────────────────────────────────────────────
+# ATOMICITY
+# ─────────────────────────────────────────────
+
+def test_failure_rolls_back_every_side_effect(fresh_db, user, keys, no_bosses, monkeypatch):
+    _assign(fresh_db, keys["required"], "required", is_required=True)
+
+    def broken(cur, profile_id, category, today):
+        raise RuntimeError("boom")
+
+    # Last step of the transaction: history, ledger, streak and stats
+    # writes have all happened by then
+    with monkeypatch.context() as patch:
+        patch.setattr(task_rewards, "record_progress", broken)
+        with pytest.raises(RuntimeError):
+            task_rewards.complete_task(1, keys["required"], DAY)
+
+    assert not fresh_db.in_transaction
+    assert _count(fresh_db, "task_history") == 0
+    assert _count(fresh_db, "token_ledger") == 0
+    assert _count(fresh_db, "daily_stats") == 0
+    assert _count(fresh_db, "weekly") == 0
+    assert _count(fresh_db, "profile_streaks WHERE required_streak > 0") == 0
+    assert _tokens(fresh_db, user) == 0
+    assert token_ledger.get_balance(user) == 0
+
+    # The task is still completable afterwards
+    assert task_rewards.complete_task(1, keys["required"], DAY).status == task_rewards.COMPLETED
@@ -0,0 +1,163 @@
+import random
+from collections import Counter
+
+import pytest
+
+from core import task_pools
+from core.task_selection import TaskSelector, rng_for, seed_for, select_tasks
+
+LIMIT = 10
+REQUIRED = {t["key"] for t in task_pools.get_required_tasks()}
+ADULT_ONLY = {"medium_clean", "heavy_clean", "intimacy", "kink", "explicit"}
+
+
+def _profile(age_context="adult", intimacy=1, kink=1, explicit=1, profile_id=1):
+    return {
+        "profile_id": profile_id,
+        "age_context": age_context,
+        "intimacy_opt_in": intimacy,
+        "kink_opt_in": kink,
+        "explicit_opt_in": explicit,
+    }
+
+
+def _keys(tasks):
+    return [t["key"] for t in tasks]
+
+
+def _pool(category, size):
+    return [{"key": f"{category}_{i}", "category": category} for i in range(size)]
+
+
+PROFILES = [
+    _profile(),
+    _profile(intimacy=0, kink=0, explicit=0),
+    _profile(age_context="cloudy"),
+    _profile(age_context="regressive"),
+]
+
+
+# ─────────────────────────────────────────────
+# SEEDING
+# ─────────────────────────────────────────────
+
+def test_seed_is_stable_across_processes():
+    # Fixed values: a salted hash() or a changed derivation breaks these
+    assert seed_for(1, "2026-03-02") == 11316094495461053215
+    assert seed_for(2, "2026-03-02") == 10930064879371862181
+
+
+def test_seed_depends_on_profile_and_date():
+    seeds = {seed_for(p, d) for p in (1, 2) for d in ("2026-03-02", "2026-03-03")}
+
+    assert len(seeds) == 4
+
+
+def test_same_profile_and_day_gives_same_tasks():
+    selector = TaskSelector(LIMIT)
+
+    first = selector.select_for_day(_profile(), {}, "2026-03-02")
+    second = selector.select_for_day(_profile(), {}, "2026-03-02")
+
+    assert first == second
+    assert _keys(first) == _keys(select_tasks(_profile(), {}, rng_for(1, "2026-03-02"), LIMIT))
+
+
+def test_different_days_vary():
+    selector = TaskSelector(LIMIT)
+    days = [f"2026-03-{d:02d}" for d in range(1, 15)]
+
+    picks = {tuple(sorted(_keys(selector.select_for_day(_profile(), {}, day)))) for day in days}
+
+    assert len(picks) > 1
+
+
+# ─────────────────────────────────────────────
+# BOUNDS
+# ─────────────────────────────────────────────
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_fills_to_limit_without_duplicates(profile):
+    for seed in range(200):
+        tasks = select_tasks(profile, {}, random.Random(seed), LIMIT)
+        keys = _keys(tasks)
+
+        assert len(keys) == LIMIT
+        assert len(set(keys)) == LIMIT
+        assert REQUIRED <= set(keys)
+
+
+def test_existing_tasks_count_towards_limit():
+    existing = {"eat_meal": "required", "drink_water": "required"}
+    existing.update({t["key"]: "basic" for t in task_pools.CATEGORY_TASKS["basic"][:3]})
+
+    for seed in range(100):
+        keys = _keys(select_tasks(_profile(), existing, random.Random(seed), LIMIT))
+
+        assert len(existing) + len(keys) == LIMIT
+        assert not set(keys) & set(existing)
+        assert len(set(keys)) == len(keys)
+
+
+def test_full_day_adds_nothing():
+    existing = {f"task_{i}": "basic" for i in range(LIMIT)}
+    existing.update({key: "required" for key in REQUIRED})
+
+    assert select_tasks(_profile(), existing, random.Random(0), LIMIT) == []
+
+
+def test_limit_below_required_only_adds_required():
+    tasks = select_tasks(_profile(), {}, random.Random(0), 2)
+
+    assert set(_keys(tasks)) == REQUIRED
+
+
+def test_small_pools_return_what_exists():
+    pools = {"basic": _pool("basic", 2), "fun": _pool("fun", 1)}
+
+    for seed in range(50):
+        tasks = select_tasks(_profile(age_context="cloudy"), {}, random.Random(seed), LIMIT, pools)
+        optional = [k for k in _keys(tasks) if k not in REQUIRED]
+
+        assert sorted(optional) == ["basic_0", "basic_1", "fun_0"]
+
+
+def test_empty_pools_terminate():
+    tasks = select_tasks(_profile(), {}, random.Random(0), LIMIT, pools={})
+
+    assert set(_keys(tasks)) == REQUIRED
+
+
+# ─────────────────────────────────────────────
+# OPT-INS
+# ─────────────────────────────────────────────
+
+@pytest.mark.parametrize("age_context", ["cloudy", "regressive"])
+def test_soft_profiles_never_get_adult_tasks(age_context):
+    for seed in range(200):
+        tasks = select_tasks(_profile(age_context=age_context), {}, random.Random(seed), LIMIT)
+
+        assert not {t["category"] for t in tasks} & ADULT_ONLY
+
+
+def test_opted_out_profiles_get_no_opt_in_tasks():
+    profile = _profile(intimacy=0, kink=0, explicit=0)
+
+    for seed in range(200):
+        tasks = select_tasks(profile, {}, random.Random(seed), LIMIT)
+
+        assert not {t["category"] for t in tasks} & {"intimacy", "kink", "explicit"}
+
+
+def test_at_most_one_explicit_task_per_day():
+    counts = Counter()
+    for seed in range(300):
+        tasks = select_tasks(_profile(), {}, random.Random(seed), LIMIT)
+        counts[sum(t["category"] == "explicit" for t in tasks)] += 1
+
+    assert set(counts) == {0, 1}
+
+    existing = {task_pools.CATEGORY_TASKS["explicit"][0]["key"]: "explicit"}
+    for seed in range(300):
+        tasks = select_tasks(_profile(), existing, random.Random(seed), LIMIT)
+        assert all(t["category"] != "explicit" for t in tasks)
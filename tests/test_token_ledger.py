@@ -0,0 +1,136 @@
+import pytest
+
+from core import token_ledger
+
+
+@pytest.fixture
+def user(fresh_db, add_profile):
+    return add_profile(fresh_db, 1, tokens=0)
+
+
+def _ledger(conn, user_id):
+    rows = conn.execute(
+        "SELECT delta, reason, balance FROM token_ledger WHERE user_id = ? ORDER BY id",
+        (user_id,),
+    ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def _stored(conn, user_id):
+    return conn.execute("SELECT tokens FROM users WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+# ─────────────────────────────────────────────
+# MUTATIONS
+# ─────────────────────────────────────────────
+
+def test_credit_and_debit_write_ledger_rows(fresh_db, user):
+    assert token_ledger.credit(user, 10, token_ledger.TASK, ref="task:1") == 10
+    assert token_ledger.debit(user, 4, token_ledger.REDEEM) == 6
+
+    assert _ledger(fresh_db, user) == [
+        (10, token_ledger.TASK, 10),
+        (-4, token_ledger.REDEEM, 6),
+    ]
+
+
+def test_insufficient_debit_takes_nothing(fresh_db, user):
+    token_ledger.credit(user, 3)
+
+    assert token_ledger.debit(user, 5) is None
+    assert _stored(fresh_db, user) == 3
+    assert len(_ledger(fresh_db, user)) == 1
+
+
+def test_clamped_debit_floors_at_zero(fresh_db, user):
+    token_ledger.credit(user, 3)
+
+    assert token_ledger.debit(user, 5, token_ledger.ADMIN_REMOVE, clamp=True) == 0
+    assert _ledger(fresh_db, user)[-1] == (-3, token_ledger.ADMIN_REMOVE, 0)
+
+
+def test_unknown_user_writes_nothing(fresh_db, user):
+    assert token_ledger.credit("nobody", 5) is None
+    assert token_ledger.debit("nobody", 5) is None
+    assert fresh_db.execute("SELECT COUNT(*) FROM token_ledger").fetchone()[0] == 0
+
+
+def test_credit_profile_with_pays_the_owner(fresh_db, user):
+    cur = fresh_db.cursor()
+
+    assert token_ledger.credit_profile_with(cur, 1, 7, token_ledger.BOSS) == (user, 7)
+    assert token_ledger.credit_profile_with(cur, 999, 7, token_ledger.BOSS) == (None, None)
+    fresh_db.commit()
+
+    assert _ledger(fresh_db, user) == [(7, token_ledger.BOSS, 7)]
+
+
+def test_balance_equals_ledger_sum(fresh_db, user):
+    for amount in (5, 8, 2):
+        token_ledger.credit(user, amount)
+    token_ledger.debit(user, 9)
+    token_ledger.debit(user, 20, clamp=True)
+    token_ledger.credit(user, 1)
+
+    rows = _ledger(fresh_db, user)
+    assert sum(delta for delta, _, _ in rows) == _stored(fresh_db, user) == 1
+    # Every row's balance is the running sum up to it
+    running = 0
+    for delta, _, balance in rows:
+        running += delta
+        assert balance == running
+
+
+# ─────────────────────────────────────────────
+# BALANCE CACHE
+# ─────────────────────────────────────────────
+
+def test_get_balance_follows_committed_writes(fresh_db, user):
+    assert token_ledger.get_balance(user) == 0
+    token_ledger.credit(user, 4)
+
+    assert token_ledger.get_balance(user) == 4
+
+
+def test_rolled_back_write_never_reaches_cache(fresh_db, user):
+    token_ledger.credit(user, 4)
+    cur = fresh_db.cursor()
+    balance = token_ledger.credit_with(cur, user, 100, token_ledger.GRANT)
+    assert balance == 104
+    fresh_db.rollback()
+
+    assert token_ledger.get_balance(user) == 4
+    assert _stored(fresh_db, user) == 4
+
+
+def test_write_during_read_through_is_not_cached(fresh_db, user, monkeypatch):
+    token_ledger.credit(user, 4)
+    token_ledger.forget(user)
+    read = token_ledger.balance_with
+
+    def racing_read(cur, user_id):
+        balance = read(cur, user_id)
+        token_ledger.remember(user_id, 9)  # a writer commits meanwhile
+        return balance
+
+    with monkeypatch.context() as patch:
+        patch.setattr(token_ledger, "balance_with", racing_read)
+        # The stale read is served once but never replaces the newer value
+        assert token_ledger.get_balance(user) == 4
+
+    assert token_ledger.get_balance(user) == 9
+
+
+def test_forget_drops_cached_balances(fresh_db, user):
+    token_ledger.credit(user, 4)
+    fresh_db.execute("UPDATE users SET tokens = 50 WHERE user_id = ?", (user,))
+    fresh_db.commit()
+    assert token_ledger.get_balance(user) == 4
+
+    token_ledger.forget()
+
+    assert token_ledger.get_balance(user) == 50
+
+
+def test_get_balance_of_unknown_user_is_zero(fresh_db):
+    assert token_ledger.get_balance("nobody") == 0